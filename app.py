@@ -1,4 +1,5 @@
 # app.py
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -7,6 +8,18 @@ from fastapi.exceptions import RequestValidationError
 from sqlalchemy import create_engine
 from config.database import Base, engine
 from config.settings import settings
+from crud.pagination import InvalidCursorError
+from services.ingestion_buffer import write_buffer
+from services.vitals_rollup_refresher import vitals_rollup_refresher
+from services.latest_vitals import latest_vitals_cache
+from services.live_vitals import live_vitals_broker
+from services.device_stats import device_stats_engine
+from services.measurement_partitions import check_measurement_partitioning
+from services.alert_coalescing import open_alerts
+from services.mail_dispatcher import mail_dispatcher
+from services.anomaly_detection import anomaly_scoring
+from services.risk_inference import risk_inference
+from services.serialization import FastJSONResponse
 from routes import (
     person,
     user,
@@ -15,17 +28,51 @@ from routes import (
     health_profile,
     smartwatch,
     heart_measurement,
+    heart_measurement_stream,
+    heart_measurement_live,
     physical_activity,
     alert,
+    risk,
     auth,  # Autenticacion normal
     google_auth  # Autenticacion con Google
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Arranque
+    latest_vitals_cache.attach()
+    live_vitals_broker.attach()
+    check_measurement_partitioning(engine)
+    if settings.ALERT_ENGINE_ENABLED:
+        open_alerts.load_from_db()
+    if settings.DEVICE_STATS_ENABLED:
+        device_stats_engine.rebuild_from_db()
+        device_stats_engine.attach()
+    if settings.VITALS_ROLLUP_SYNC_ENABLED:
+        vitals_rollup_refresher.start()
+    if settings.HEART_MEASUREMENT_BUFFER_ENABLED:
+        write_buffer.start()
+    mail_dispatcher.start()
+    anomaly_scoring.load()
+    risk_inference.load()
+    await risk_inference.start()
+    yield
+    # Apagado: guardar las mediciones que sigan en el buffer, refrescar sus resumenes y enviar los correos encolados
+    write_buffer.stop()
+    vitals_rollup_refresher.stop()
+    mail_dispatcher.stop()
+    await risk_inference.stop()
+    latest_vitals_cache.detach()
+    live_vitals_broker.detach()
+    device_stats_engine.detach()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="API para monitoreo de salud y predicción de riesgos cardíacos con autenticación JWT y Google",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON_ENABLED else JSONResponse
 )
 
 # Crear todas las tablas
@@ -58,6 +105,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
+# Cursor de paginacion invalido o de otro listado
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_exception_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"error": "Cursor de paginacion invalido", "detail": str(exc)}
+    )
+
 # Manejo global de errores HTTP
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -86,8 +141,11 @@ app.include_router(user_role.router, prefix=settings.API_V1_STR)
 app.include_router(health_profile.router, prefix=settings.API_V1_STR)
 app.include_router(smartwatch.router, prefix=settings.API_V1_STR)
 app.include_router(heart_measurement.router, prefix=settings.API_V1_STR)
+app.include_router(heart_measurement_stream.router, prefix=settings.API_V1_STR)
+app.include_router(heart_measurement_live.router, prefix=settings.API_V1_STR)
 app.include_router(physical_activity.router, prefix=settings.API_V1_STR)
 app.include_router(alert.router, prefix=settings.API_V1_STR)
+app.include_router(risk.router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+"""
+Benchmarks de rendimiento que se ejecutan fuera del API.
+Cada modulo se ejecuta desde la raíz del proyecto con: python -m benchmarks.<nombre>
+"""
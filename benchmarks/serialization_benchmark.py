@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Compara el tiempo de serializacion de los listados paginados:
+
+  fastapi   ruta por defecto (validar response_model + jsonable + json.dumps)
+  adapter   TypeAdapter: validar y serializar directo a bytes en pydantic_core
+  trusted   sin re-validar (datos de la base de datos) + orjson
+
+No usa la base de datos: arma objetos ORM en memoria, asi que solo mide serializacion.
+
+Uso: python -m benchmarks.serialization_benchmark [--rows 500] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from config.settings import settings
+from models.alert import Alert, AlertTypeEnum, PriorityEnum
+from models.heart_measurement import HeartMeasurement
+from models.physical_activity import PhysicalActivity
+from schemas.alert import AlertResponse
+from schemas.heart_measurement import HeartMeasurementResponse
+from schemas.pagination import Page
+from schemas.physical_activity import PhysicalActivityResponse
+from services.serialization import page_response
+
+def build_measurements(rows: int) -> list:
+    now = datetime.now()
+    return [
+        HeartMeasurement(
+            ID=i, Usuario_ID=1, Smartwatch_ID=1, Timestamp_medicion=now - timedelta(minutes=i),
+            Frecuencia_cardiaca=60 + i % 40, Presion_sistolica=120, Presion_diastolica=80,
+            Saturacion_oxigeno=Decimal("97.5"), Temperatura=Decimal("36.6"), Nivel_estres=i % 100,
+            Variabilidad_ritmo=Decimal("42.10"), Estatus=True, Fecha_Registro=now, Fecha_Actualizacion=None
+        )
+        for i in range(rows)
+    ]
+
+def build_alerts(rows: int) -> list:
+    now = datetime.now()
+    return [
+        Alert(
+            ID=i, Usuario_ID=1, Smartwatch_ID=1, Tipo_alerta=AlertTypeEnum.FRECUENCIA_ALTA, Mensaje="Frecuencia cardiaca alta",
+            Valor_detectado=Decimal("120.00"), Valor_umbral=Decimal("100.00"), Prioridad=PriorityEnum.ALTA,
+            Timestamp_alerta=now - timedelta(minutes=i), Conteo_disparos=1, Timestamp_ultimo_disparo=now - timedelta(minutes=i),
+            Estatus=True, Fecha_Registro=now, Fecha_Actualizacion=None
+        )
+        for i in range(rows)
+    ]
+
+def build_activities(rows: int) -> list:
+    now = datetime.now()
+    return [
+        PhysicalActivity(
+            ID=i, Usuario_ID=1, Smartwatch_ID=1, Pasos=8000 + i, Distancia_km=Decimal("6.20"), Calorias_quemadas=350,
+            Minutos_actividad=45, Pisos_subidos=10, Estatus=True, Fecha_Registro=now - timedelta(days=i), Fecha_Actualizacion=None
+        )
+        for i in range(rows)
+    ]
+
+ENDPOINTS = [
+    ("GET /heart-measurements/user/{id}", HeartMeasurementResponse, build_measurements),
+    ("GET /alerts/user/{id}", AlertResponse, build_alerts),
+    ("GET /physical-activities/user/{id}", PhysicalActivityResponse, build_activities)
+]
+
+def time_it(function, repeat: int) -> float:
+    function()  # calentamiento (caches de esquemas y adaptadores)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serializacion de listados")
+    parser.add_argument("--rows", type=int, default=500, help="Filas por pagina")
+    parser.add_argument("--repeat", type=int, default=50, help="Repeticiones por medicion")
+    args = parser.parse_args()
+
+    settings.FAST_JSON_ENABLED = True
+    loop = asyncio.new_event_loop()
+    print(f"{'endpoint':38} {'fastapi ms':>11} {'adapter ms':>11} {'trusted ms':>11} {'speedup':>8}")
+    for name, model, builder in ENDPOINTS:
+        page = {"items": builder(args.rows), "next_cursor": "abc", "limit": args.rows}
+        field = create_model_field(name="Response", type_=Page[model], mode="serialization")
+
+        def default_path():
+            content = loop.run_until_complete(serialize_response(field=field, response_content=page))
+            return JSONResponse(content).body
+
+        baseline = time_it(default_path, args.repeat)
+        adapter = time_it(lambda: page_response(page, model, trusted=False).body, args.repeat)
+        trusted = time_it(lambda: page_response(page, model).body, args.repeat)
+        print(f"{name:38} {baseline:11.2f} {adapter:11.2f} {trusted:11.2f} {baseline / trusted:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,17 @@ class Settings(BaseSettings):
     EMAIL_PASSWORD: str = os.getenv("EMAIL_PASSWORD", "")
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
     SMTP_PORT: int = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_USE_TLS: bool = os.getenv("SMTP_USE_TLS", "True").lower() == "true"
+    SMTP_TIMEOUT_SECONDS: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "10"))
+    
+    # Despachador de correos: hilos con conexion SMTP persistente, cola acotada y reintentos con backoff
+    MAIL_DISPATCHER_WORKERS: int = int(os.getenv("MAIL_DISPATCHER_WORKERS", "2"))
+    MAIL_QUEUE_SIZE: int = int(os.getenv("MAIL_QUEUE_SIZE", "1000"))
+    MAIL_BATCH_SIZE: int = int(os.getenv("MAIL_BATCH_SIZE", "20"))
+    MAIL_BATCH_MAX_WAIT_MS: int = int(os.getenv("MAIL_BATCH_MAX_WAIT_MS", "200"))
+    MAIL_MAX_RETRIES: int = int(os.getenv("MAIL_MAX_RETRIES", "3"))
+    MAIL_RETRY_BACKOFF_SECONDS: float = float(os.getenv("MAIL_RETRY_BACKOFF_SECONDS", "1"))
+    MAIL_CONNECTION_IDLE_SECONDS: float = float(os.getenv("MAIL_CONNECTION_IDLE_SECONDS", "60"))
     
     # CORS
     ALLOWED_ORIGINS: list = ["http://localhost:3000", "http://localhost:8080"]
@@ -31,6 +42,102 @@ class Settings(BaseSettings):
     # Token Verification
     VERIFICATION_TOKEN_EXPIRE_HOURS: int = 24
     
+    # Paginacion por cursor
+    PAGINATION_MAX_LIMIT: int = int(os.getenv("PAGINATION_MAX_LIMIT", "500"))
+    
+    # Serializacion rapida: orjson para todas las respuestas y listados sin re-validar el response_model
+    FAST_JSON_ENABLED: bool = os.getenv("FAST_JSON_ENABLED", "False").lower() == "true"
+    
+    # Heart measurement ingestion
+    HEART_MEASUREMENT_BATCH_MAX_ITEMS: int = int(os.getenv("HEART_MEASUREMENT_BATCH_MAX_ITEMS", "10000"))
+    HEART_MEASUREMENT_BATCH_CHUNK_SIZE: int = int(os.getenv("HEART_MEASUREMENT_BATCH_CHUNK_SIZE", "1000"))
+    HEART_MEASUREMENT_STREAM_MAX_LINE_BYTES: int = int(os.getenv("HEART_MEASUREMENT_STREAM_MAX_LINE_BYTES", "65536"))
+    HEART_MEASUREMENT_STREAM_MAX_ERRORS: int = int(os.getenv("HEART_MEASUREMENT_STREAM_MAX_ERRORS", "100"))
+    
+    # Series agregadas para graficas (/heart-measurements/user/{id}/series)
+    HEART_MEASUREMENT_SERIES_DEFAULT_DAYS: int = int(os.getenv("HEART_MEASUREMENT_SERIES_DEFAULT_DAYS", "30"))
+    HEART_MEASUREMENT_SERIES_MAX_POINTS: int = int(os.getenv("HEART_MEASUREMENT_SERIES_MAX_POINTS", "10000"))
+    
+    # Exportacion CSV/NDJSON: maximo de usuarios por cohorte en /heart-measurements/export
+    HEART_MEASUREMENT_EXPORT_MAX_USERS: int = int(os.getenv("HEART_MEASUREMENT_EXPORT_MAX_USERS", "1000"))
+    
+    # Exportacion incremental a Parquet (python -m jobs.export_parquet)
+    PARQUET_EXPORT_DIR: str = os.getenv("PARQUET_EXPORT_DIR", "data/parquet")
+    PARQUET_EXPORT_SAFETY_LAG_SECONDS: int = int(os.getenv("PARQUET_EXPORT_SAFETY_LAG_SECONDS", "300"))
+    PARQUET_EXPORT_BLOCK_ROWS: int = int(os.getenv("PARQUET_EXPORT_BLOCK_ROWS", "100000"))
+    
+    # Archivo frio: las mediciones con mas de MEASUREMENT_HOT_DAYS dias se mueven a Parquet por usuario/mes
+    # (python -m jobs.archive_measurements) y las lecturas de rangos anteriores las leen de ahi
+    MEASUREMENT_HOT_DAYS: int = int(os.getenv("MEASUREMENT_HOT_DAYS", "90"))
+    MEASUREMENT_ARCHIVE_DIR: str = os.getenv("MEASUREMENT_ARCHIVE_DIR", "data/archive")
+    
+    # Particiones mensuales de tbb_mediciones_cardiacas (MySQL, python -m jobs.manage_measurement_partitions)
+    # Con MEASUREMENT_PARTITIONING_ENABLED el arranque revisa que la tabla este convertida y sin diferencias
+    MEASUREMENT_PARTITIONING_ENABLED: bool = os.getenv("MEASUREMENT_PARTITIONING_ENABLED", "False").lower() == "true"
+    MEASUREMENT_PARTITION_MONTHS_AHEAD: int = int(os.getenv("MEASUREMENT_PARTITION_MONTHS_AHEAD", "3"))
+    MEASUREMENT_RETENTION_MONTHS: int = int(os.getenv("MEASUREMENT_RETENTION_MONTHS", "24"))
+    
+    # Resumenes por hora/dia: la aplicacion los recalcula en segundo plano cada VITALS_ROLLUP_REFRESH_INTERVAL_MS
+    # con los periodos tocados por la ingesta (jobs y scripts, en la misma transaccion).
+    # Con False se dejan al job de actualizacion incremental (python -m jobs.rebuild_vitals_rollups --since-minutes N)
+    VITALS_ROLLUP_SYNC_ENABLED: bool = os.getenv("VITALS_ROLLUP_SYNC_ENABLED", "True").lower() == "true"
+    VITALS_ROLLUP_REFRESH_INTERVAL_MS: int = int(os.getenv("VITALS_ROLLUP_REFRESH_INTERVAL_MS", "1000"))
+    
+    # Cache en memoria de los ultimos signos vitales (/users/{id}/vitals/latest), LRU por usuario.
+    # El TTL acota lo desactualizado si varios procesos escriben mediciones (0 = sin expiracion)
+    LATEST_VITALS_CACHE_MAX_USERS: int = int(os.getenv("LATEST_VITALS_CACHE_MAX_USERS", "10000"))
+    LATEST_VITALS_CACHE_TTL_SECONDS: int = int(os.getenv("LATEST_VITALS_CACHE_TTL_SECONDS", "300"))
+    
+    # Mediciones en vivo por Server-Sent Events (/heart-measurements/user/{id}/live).
+    # Cada conexion tiene una cola acotada: si el cliente se atrasa se descartan las lecturas mas antiguas
+    LIVE_VITALS_MAX_SUBSCRIBERS: int = int(os.getenv("LIVE_VITALS_MAX_SUBSCRIBERS", "1000"))
+    LIVE_VITALS_QUEUE_SIZE: int = int(os.getenv("LIVE_VITALS_QUEUE_SIZE", "100"))
+    LIVE_VITALS_HEARTBEAT_SECONDS: int = int(os.getenv("LIVE_VITALS_HEARTBEAT_SECONDS", "15"))
+    
+    # Estadisticas moviles por smartwatch en memoria (/smartwatches/{id}/stats): anillos de minutos y de horas,
+    # reconstruidos desde la base de datos al arrancar
+    DEVICE_STATS_ENABLED: bool = os.getenv("DEVICE_STATS_ENABLED", "True").lower() == "true"
+    DEVICE_STATS_MINUTE_SLOTS: int = int(os.getenv("DEVICE_STATS_MINUTE_SLOTS", "60"))
+    DEVICE_STATS_HOUR_SLOTS: int = int(os.getenv("DEVICE_STATS_HOUR_SLOTS", "24"))
+    # Mediciones con timestamp posterior a ahora + este margen (reloj del dispositivo adelantado) no entran a los anillos
+    DEVICE_STATS_MAX_CLOCK_SKEW_SECONDS: int = int(os.getenv("DEVICE_STATS_MAX_CLOCK_SKEW_SECONDS", "300"))
+    
+    # Alertas automaticas por umbral, evaluadas sobre cada lote ingresado (misma transaccion)
+    ALERT_ENGINE_ENABLED: bool = os.getenv("ALERT_ENGINE_ENABLED", "True").lower() == "true"
+    ALERT_HEART_RATE_HIGH: float = float(os.getenv("ALERT_HEART_RATE_HIGH", "100"))
+    ALERT_HEART_RATE_LOW: float = float(os.getenv("ALERT_HEART_RATE_LOW", "60"))
+    ALERT_SYSTOLIC_HIGH: float = float(os.getenv("ALERT_SYSTOLIC_HIGH", "140"))
+    ALERT_SPO2_LOW: float = float(os.getenv("ALERT_SPO2_LOW", "95"))
+    
+    # Agrupacion de alertas repetidas por (usuario, tipo) dentro de la ventana (0 = una fila por disparo)
+    ALERT_COALESCE_WINDOW_MINUTES: int = int(os.getenv("ALERT_COALESCE_WINDOW_MINUTES", "30"))
+    
+    # Correo al usuario por cada alerta nueva (no por disparos agrupados) desde esta prioridad
+    ALERT_EMAIL_ENABLED: bool = os.getenv("ALERT_EMAIL_ENABLED", "False").lower() == "true"
+    ALERT_EMAIL_MIN_PRIORITY: str = os.getenv("ALERT_EMAIL_MIN_PRIORITY", "ALTA")
+    
+    # Deteccion de anomalias: artefacto de ml_algorithms.anomaly_detection.train, cargado al arrancar
+    ANOMALY_MODEL_PATH: str = os.getenv("ANOMALY_MODEL_PATH", "ml_algorithms/anomaly_detection/saved_models/anomaly_detector.joblib")
+    
+    # Inferencia de riesgo cardiovascular: artefactos de ml_algorithms.cardiovascular_risk.train y micro-batching
+    RISK_MODEL_PATH: str = os.getenv("RISK_MODEL_PATH", "ml_algorithms/cardiovascular_risk/saved_models/cardiovascular_risk_model.h5")
+    RISK_PREPROCESSOR_PATH: str = os.getenv("RISK_PREPROCESSOR_PATH", "ml_algorithms/cardiovascular_risk/saved_models/preprocessor.pkl")
+    RISK_BATCH_MAX_SIZE: int = int(os.getenv("RISK_BATCH_MAX_SIZE", "64"))
+    RISK_BATCH_MAX_WAIT_MS: int = int(os.getenv("RISK_BATCH_MAX_WAIT_MS", "5"))
+    RISK_BATCH_MAX_USERS: int = int(os.getenv("RISK_BATCH_MAX_USERS", "500"))
+    RISK_FEATURE_DAYS: int = int(os.getenv("RISK_FEATURE_DAYS", "30"))
+    
+    # Almacen de caracteristicas de riesgo (tbb_caracteristicas_riesgo, jobs.refresh_risk_features)
+    RISK_FEATURE_STORE_ENABLED: bool = os.getenv("RISK_FEATURE_STORE_ENABLED", "True").lower() == "true"
+    RISK_FEATURE_STORE_MAX_AGE_HOURS: int = int(os.getenv("RISK_FEATURE_STORE_MAX_AGE_HOURS", "24"))
+    
+    # Buffer de escritura diferida para POST individuales (durability: "commit" o "enqueue")
+    HEART_MEASUREMENT_BUFFER_ENABLED: bool = os.getenv("HEART_MEASUREMENT_BUFFER_ENABLED", "False").lower() == "true"
+    HEART_MEASUREMENT_BUFFER_MAX_ROWS: int = int(os.getenv("HEART_MEASUREMENT_BUFFER_MAX_ROWS", "500"))
+    HEART_MEASUREMENT_BUFFER_MAX_WAIT_MS: int = int(os.getenv("HEART_MEASUREMENT_BUFFER_MAX_WAIT_MS", "200"))
+    HEART_MEASUREMENT_BUFFER_QUEUE_SIZE: int = int(os.getenv("HEART_MEASUREMENT_BUFFER_QUEUE_SIZE", "50000"))
+    HEART_MEASUREMENT_BUFFER_DURABILITY: str = os.getenv("HEART_MEASUREMENT_BUFFER_DURABILITY", "commit")
+    
     class Config:
         env_file = ".env"
 
@@ -1,20 +1,50 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import bindparam, func, insert, update
 from sqlalchemy.orm import Session
+from crud.pagination import paginate
 from models.alert import Alert
+from services.alert_coalescing import open_alerts
+
+# Orden de los historiales: mas reciente primero, ID desempata alertas con el mismo timestamp
+TIMELINE_ORDER = [Alert.Timestamp_alerta, Alert.ID]
 
 def get_alert(db: Session, alert_id: int):
     return db.query(Alert).filter(Alert.ID == alert_id).first()
 
-def get_alerts(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Alert).filter(Alert.Estatus == True).offset(skip).limit(limit).all()
+def get_alerts(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(Alert).filter(Alert.Estatus == True)
+    return paginate(query, [Alert.ID], cursor=cursor, limit=limit)
+
+def _filter_time_range(query, start: Optional[datetime], end: Optional[datetime]):
+    if start is not None:
+        query = query.filter(Alert.Timestamp_alerta >= start)
+    if end is not None:
+        query = query.filter(Alert.Timestamp_alerta <= end)
+    return query
 
-def get_alerts_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Alert).filter(Alert.Usuario_ID == user_id, Alert.Estatus == True).offset(skip).limit(limit).all()
+def get_alerts_by_user(db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100,
+                       start: Optional[datetime] = None, end: Optional[datetime] = None):
+    query = db.query(Alert).filter(Alert.Usuario_ID == user_id, Alert.Estatus == True)
+    return paginate(_filter_time_range(query, start, end), TIMELINE_ORDER, cursor=cursor, limit=limit)
 
-def get_alerts_by_smartwatch(db: Session, smartwatch_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Alert).filter(Alert.Smartwatch_ID == smartwatch_id, Alert.Estatus == True).offset(skip).limit(limit).all()
+def get_alerts_by_smartwatch(db: Session, smartwatch_id: int, cursor: Optional[str] = None, limit: int = 100,
+                             start: Optional[datetime] = None, end: Optional[datetime] = None):
+    query = db.query(Alert).filter(Alert.Smartwatch_ID == smartwatch_id, Alert.Estatus == True)
+    return paginate(_filter_time_range(query, start, end), TIMELINE_ORDER, cursor=cursor, limit=limit)
 
-def get_alerts_by_priority(db: Session, priority: str, skip: int = 0, limit: int = 100):
-    return db.query(Alert).filter(Alert.Prioridad == priority, Alert.Estatus == True).offset(skip).limit(limit).all()
+def get_alerts_by_priority(db: Session, priority: str, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(Alert).filter(Alert.Prioridad == priority, Alert.Estatus == True)
+    return paginate(query, [Alert.ID], cursor=cursor, limit=limit)
+
+def get_user_ids_with_alerts(db: Session, since: datetime, message_prefix: str) -> set:
+    """Usuarios con alguna alerta activa desde since cuyo mensaje empieza con message_prefix"""
+    rows = db.query(Alert.Usuario_ID).filter(
+        Alert.Estatus == True,
+        Alert.Timestamp_alerta >= since,
+        Alert.Mensaje.startswith(message_prefix, autoescape=True)
+    ).distinct().all()
+    return {row[0] for row in rows}
 
 def create_alert(db: Session, alert_data: dict):
     db_alert = Alert(
@@ -33,6 +63,52 @@ def create_alert(db: Session, alert_data: dict):
     db.refresh(db_alert)
     return db_alert
 
+def insert_alerts(db: Session, alert_rows: list, chunk_size: int = 1000) -> int:
+    """
+    Inserta alertas generadas automaticamente con INSERT multi-fila.
+    No hace commit: se ejecuta dentro de la transaccion de la ingesta.
+    """
+    for start in range(0, len(alert_rows), chunk_size):
+        db.execute(insert(Alert), alert_rows[start:start + chunk_size])
+    return len(alert_rows)
+
+def add_alerts(db: Session, alert_rows: list) -> list:
+    """
+    Inserta alertas nuevas y regresa los objetos con su ID (flush, sin commit).
+    Se usa para las alertas que abren una ventana de agrupacion; son pocas por lote.
+    """
+    alerts = [Alert(**row) for row in alert_rows]
+    db.add_all(alerts)
+    db.flush()
+    return alerts
+
+def increment_alerts(db: Session, updates: list):
+    """
+    Suma disparos a alertas abiertas: conteo, ultimo disparo y Valor_detectado del disparo mas reciente.
+    Un solo UPDATE por clave primaria ejecutado como executemany, sin leer las alertas antes.
+    """
+    if not updates:
+        return
+    table = Alert.__table__
+    stmt = (
+        update(table)
+        .where(table.c.ID == bindparam("alert_id"))
+        .values(
+            Conteo_disparos=table.c.Conteo_disparos + bindparam("added"),
+            Timestamp_ultimo_disparo=bindparam("last_trigger"),
+            Valor_detectado=func.coalesce(bindparam("value", type_=table.c.Valor_detectado.type), table.c.Valor_detectado)
+        )
+    )
+    db.execute(stmt, [
+        {
+            "alert_id": row["alert_id"],
+            "added": row["added"],
+            "last_trigger": row["Timestamp_ultimo_disparo"],
+            "value": row["Valor_detectado"]
+        }
+        for row in updates
+    ])
+
 def update_alert(db: Session, alert_id: int, alert_data: dict):
     db_alert = db.query(Alert).filter(Alert.ID == alert_id).first()
     if db_alert:
@@ -40,6 +116,7 @@ def update_alert(db: Session, alert_id: int, alert_data: dict):
             setattr(db_alert, key, value)
         db.commit()
         db.refresh(db_alert)
+        open_alerts.forget(alert_id)
     return db_alert
 
 def delete_alert(db: Session, alert_id: int):
@@ -48,4 +125,5 @@ def delete_alert(db: Session, alert_id: int):
         db_alert.Estatus = False
         db.commit()
         db.refresh(db_alert)
+        open_alerts.forget(alert_id)
     return db_alert
\ No newline at end of file
@@ -1,4 +1,6 @@
+from typing import Optional
 from sqlalchemy.orm import Session
+from crud.pagination import paginate
 from models.health_profile import HealthProfile
 
 def get_health_profile(db: Session, profile_id: int):
@@ -7,8 +9,9 @@ def get_health_profile(db: Session, profile_id: int):
 def get_health_profile_by_user(db: Session, user_id: int):
     return db.query(HealthProfile).filter(HealthProfile.Usuario_ID == user_id).first()
 
-def get_health_profiles(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(HealthProfile).filter(HealthProfile.Estatus == True).offset(skip).limit(limit).all()
+def get_health_profiles(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(HealthProfile).filter(HealthProfile.Estatus == True)
+    return paginate(query, [HealthProfile.ID], cursor=cursor, limit=limit, descending=False)
 
 def create_health_profile(db: Session, profile_data: dict):
     db_profile = HealthProfile(
@@ -1,50 +1,531 @@
+import logging
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from sqlalchemy import DateTime, Numeric, insert, func
 from sqlalchemy.orm import Session
+from config.settings import settings
+from crud.pagination import decode_cursor, encode_cursor, paginate
+from crud import alert as crud_alert
+from crud import vitals_rollup as crud_vitals_rollup
+from crud.time_bucket import INTERVALS, bucket_start, epoch_to_datetime, floor_datetime
 from models.heart_measurement import HeartMeasurement
+from services import alert_engine, alert_notifications, measurement_archive, measurement_events
+from services.alert_coalescing import open_alerts
+from services.vitals_rollup_refresher import vitals_rollup_refresher
+
+logger = logging.getLogger(__name__)
+
+# Orden de los historiales: mas reciente primero, ID desempata mediciones con el mismo timestamp
+TIMELINE_ORDER = [HeartMeasurement.Timestamp_medicion, HeartMeasurement.ID]
+
+ON_CONFLICT_IGNORE = "ignore"
+ON_CONFLICT_UPDATE = "update"
+
+# Columnas que se sobrescriben cuando una medicion repetida llega en modo upsert
+UPSERT_COLUMNS = [
+    "Usuario_ID",
+    "Frecuencia_cardiaca",
+    "Presion_sistolica",
+    "Presion_diastolica",
+    "Saturacion_oxigeno",
+    "Temperatura",
+    "Nivel_estres",
+    "Variabilidad_ritmo",
+    "Estatus"
+]
+
+# Campos del formato columnar (?format=columnar): un arreglo por campo en lugar de un objeto por fila
+COLUMNAR_FIELDS = [
+    HeartMeasurement.ID,
+    HeartMeasurement.Usuario_ID,
+    HeartMeasurement.Smartwatch_ID,
+    HeartMeasurement.Timestamp_medicion,
+    HeartMeasurement.Frecuencia_cardiaca,
+    HeartMeasurement.Presion_sistolica,
+    HeartMeasurement.Presion_diastolica,
+    HeartMeasurement.Saturacion_oxigeno,
+    HeartMeasurement.Temperatura,
+    HeartMeasurement.Nivel_estres,
+    HeartMeasurement.Variabilidad_ritmo
+]
+COLUMNAR_KEYS = [column.key for column in COLUMNAR_FIELDS]
+
+def _columnar_values(column, values) -> list:
+    if isinstance(column.type, Numeric):
+        return [None if value is None else float(value) for value in values]
+    if isinstance(column.type, DateTime):
+        return [None if value is None else value.isoformat() for value in values]
+    return list(values)
+
+def _columnar_page(page: dict) -> dict:
+    """Transpone las tuplas de la pagina a un arreglo por campo"""
+    rows = page.pop("items")
+    values = list(zip(*rows)) if rows else [()] * len(COLUMNAR_FIELDS)
+    page["count"] = len(rows)
+    page["columns"] = {column.key: _columnar_values(column, column_values) for column, column_values in zip(COLUMNAR_FIELDS, values)}
+    return page
+
+def _reaches_archive(start: Optional[datetime], user_id: Optional[int] = None, smartwatch_id: Optional[int] = None) -> bool:
+    """El rango empieza antes de la ventana caliente y hay mediciones archivadas que leer"""
+    if start is not None and start >= measurement_archive.hot_window_start():
+        return False
+    return measurement_archive.has_archive(user_id, smartwatch_id=smartwatch_id)
+
+def _timeline_key(columnar: bool):
+    if columnar:
+        timestamp_index, id_index = COLUMNAR_KEYS.index("Timestamp_medicion"), COLUMNAR_KEYS.index("ID")
+        return lambda row: (row[timestamp_index], row[id_index])
+    return lambda row: (row.Timestamp_medicion, row.ID)
+
+def _merge_archive_page(page: dict, cursor: Optional[str], columnar: bool, archive: dict) -> dict:
+    """
+    Completa una pagina del historial con el archivo frio: se leen hasta limit+1 filas archivadas
+    despues del mismo cursor y se mezclan con las de la tabla en orden (Timestamp_medicion, ID)
+    descendente. Un ID presente en ambos lados (archivado a medias) se toma de la tabla.
+    El archivo solo tiene mediciones anteriores a la ventana caliente: si la pagina de la tabla
+    esta completa y termina dentro de la ventana no se lee.
+    """
+    limit = page["limit"]
+    key = _timeline_key(columnar)
+    if len(page["items"]) >= limit and key(page["items"][-1])[0] >= measurement_archive.hot_window_start():
+        return page
+    before = decode_cursor(cursor, TIMELINE_ORDER) if cursor else None
+    table = measurement_archive.read_archived_measurements(
+        **archive, before=before, limit=limit + 1, columns=COLUMNAR_KEYS if columnar else None
+    )
+    if table.num_rows == 0:
+        return page
+
+    records = measurement_archive.archived_records(table)
+    archived = [tuple(record[field] for field in COLUMNAR_KEYS) for record in records] if columnar else [HeartMeasurement(**record) for record in records]
+    hot_ids = {key(row)[1] for row in page["items"]}
+    rows = page["items"] + [row for row in archived if key(row)[1] not in hot_ids]
+    rows.sort(key=key, reverse=True)
+    has_more = page["next_cursor"] is not None or len(rows) > limit
+    page["items"] = rows[:limit]
+    page["next_cursor"] = encode_cursor(list(key(page["items"][-1]))) if has_more else None
+    return page
+
+def _measurement_list(db: Session, order_columns: list, cursor: Optional[str], limit: int, columnar: bool, *filters,
+                      archive: Optional[dict] = None):
+    """
+    Lista paginada de mediciones activas. Con columnar=True se seleccionan solo tuplas
+    (sin objetos ORM) y se regresan como un arreglo por campo.
+    Con archive (filtros del archivo frio) la pagina se completa con las mediciones archivadas.
+    """
+    entities = COLUMNAR_FIELDS if columnar else [HeartMeasurement]
+    query = db.query(*entities).filter(HeartMeasurement.Estatus == True, *filters)
+    page = paginate(query, order_columns, cursor=cursor, limit=limit)
+    if archive is not None:
+        page = _merge_archive_page(page, cursor, columnar, archive)
+    return _columnar_page(page) if columnar else page
 
 def get_heart_measurement(db: Session, measurement_id: int):
     return db.query(HeartMeasurement).filter(HeartMeasurement.ID == measurement_id).first()
 
-def get_heart_measurements(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(HeartMeasurement).filter(HeartMeasurement.Estatus == True).offset(skip).limit(limit).all()
-
-def get_heart_measurements_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(HeartMeasurement).filter(HeartMeasurement.Usuario_ID == user_id, HeartMeasurement.Estatus == True).offset(skip).limit(limit).all()
-
-def get_heart_measurements_by_smartwatch(db: Session, smartwatch_id: int, skip: int = 0, limit: int = 100):
-    return db.query(HeartMeasurement).filter(HeartMeasurement.Smartwatch_ID == smartwatch_id, HeartMeasurement.Estatus == True).offset(skip).limit(limit).all()
-
-def create_heart_measurement(db: Session, measurement_data: dict):
-    db_measurement = HeartMeasurement(
-        Usuario_ID=measurement_data["Usuario_ID"],
-        Smartwatch_ID=measurement_data["Smartwatch_ID"],
-        Timestamp_medicion=measurement_data["Timestamp_medicion"],
-        Frecuencia_cardiaca=measurement_data["Frecuencia_cardiaca"],
-        Presion_sistolica=measurement_data.get("Presion_sistolica"),
-        Presion_diastolica=measurement_data.get("Presion_diastolica"),
-        Saturacion_oxigeno=measurement_data.get("Saturacion_oxigeno"),
-        Temperatura=measurement_data.get("Temperatura"),
-        Nivel_estres=measurement_data.get("Nivel_estres"),
-        Variabilidad_ritmo=measurement_data.get("Variabilidad_ritmo"),
-        Estatus=measurement_data.get("Estatus", True)
+def get_heart_measurements(db: Session, cursor: Optional[str] = None, limit: int = 100, columnar: bool = False):
+    return _measurement_list(db, [HeartMeasurement.ID], cursor, limit, columnar)
+
+def _time_range_filters(start: Optional[datetime], end: Optional[datetime]) -> list:
+    filters = []
+    if start is not None:
+        filters.append(HeartMeasurement.Timestamp_medicion >= start)
+    if end is not None:
+        filters.append(HeartMeasurement.Timestamp_medicion <= end)
+    return filters
+
+def get_heart_measurements_by_user(db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100,
+                                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                   columnar: bool = False):
+    archive = {"user_id": user_id, "start": start, "end": end} if _reaches_archive(start, user_id) else None
+    return _measurement_list(db, TIMELINE_ORDER, cursor, limit, columnar,
+                             HeartMeasurement.Usuario_ID == user_id, *_time_range_filters(start, end), archive=archive)
+
+def get_heart_measurements_by_smartwatch(db: Session, smartwatch_id: int, cursor: Optional[str] = None, limit: int = 100,
+                                         start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                         columnar: bool = False):
+    archive = {"smartwatch_id": smartwatch_id, "start": start, "end": end} if _reaches_archive(start, smartwatch_id=smartwatch_id) else None
+    return _measurement_list(db, TIMELINE_ORDER, cursor, limit, columnar,
+                             HeartMeasurement.Smartwatch_ID == smartwatch_id, *_time_range_filters(start, end), archive=archive)
+
+# Promedios de la serie: campo de respuesta -> columna
+SERIES_AVERAGES = {
+    "heart_rate_avg": HeartMeasurement.Frecuencia_cardiaca,
+    "systolic_avg": HeartMeasurement.Presion_sistolica,
+    "diastolic_avg": HeartMeasurement.Presion_diastolica,
+    "spo2_avg": HeartMeasurement.Saturacion_oxigeno,
+    "stress_avg": HeartMeasurement.Nivel_estres
+}
+
+def _average(total, count, digits: int = 2):
+    return round(float(total) / count, digits) if count else None
+
+def _series_partials(db: Session, user_id: int, seconds: int, start: datetime, end: datetime) -> dict:
+    """
+    Agregados parciales por intervalo (conteo, min, max y suma/conteo por promedio) para poder
+    sumarlos con los del archivo. Un solo GROUP BY resuelto con el indice (Usuario_ID, Timestamp_medicion).
+    """
+    bucket = bucket_start(db, HeartMeasurement.Timestamp_medicion, seconds).label("bucket")
+    aggregates = [
+        bucket,
+        func.count(HeartMeasurement.ID),
+        func.min(HeartMeasurement.Frecuencia_cardiaca),
+        func.max(HeartMeasurement.Frecuencia_cardiaca)
+    ]
+    for column in SERIES_AVERAGES.values():
+        aggregates += [func.sum(column), func.count(column)]
+    rows = db.query(*aggregates).filter(
+        HeartMeasurement.Usuario_ID == user_id,
+        HeartMeasurement.Estatus == True,
+        HeartMeasurement.Timestamp_medicion >= start,
+        HeartMeasurement.Timestamp_medicion <= end
+    ).group_by(bucket).all()
+    return {int(row[0]): [float(value) if value is not None else None for value in row[1:]] for row in rows}
+
+def _archived_series_partials(user_id: int, seconds: int, start: datetime, end: datetime) -> dict:
+    """Los mismos agregados parciales de _series_partials calculados con numpy sobre el archivo"""
+    columns = [column.key for column in SERIES_AVERAGES.values()]
+    table = measurement_archive.read_archived_measurements(
+        user_id=user_id, start=start, end=end, columns=["Timestamp_medicion", *columns]
     )
-    db.add(db_measurement)
-    db.commit()
-    db.refresh(db_measurement)
+    if table.num_rows == 0:
+        return {}
+    epochs = table.column("Timestamp_medicion").to_numpy().astype("datetime64[s]").astype(np.int64)
+    buckets, inverse = np.unique(epochs - epochs % seconds, return_inverse=True)
+    heart_rate = table.column(HeartMeasurement.Frecuencia_cardiaca.key).to_numpy(zero_copy_only=False).astype(float)
+    minimums = np.full(len(buckets), np.inf)
+    maximums = np.full(len(buckets), -np.inf)
+    np.minimum.at(minimums, inverse, heart_rate)
+    np.maximum.at(maximums, inverse, heart_rate)
+    partials = [np.bincount(inverse, minlength=len(buckets)), minimums, maximums]
+    for key in columns:
+        values = table.column(key).to_numpy(zero_copy_only=False).astype(float)
+        present = ~np.isnan(values)
+        partials += [
+            np.bincount(inverse, weights=np.where(present, values, 0), minlength=len(buckets)),
+            np.bincount(inverse, weights=present, minlength=len(buckets))
+        ]
+    return {int(bucket): [float(values[i]) for values in partials] for i, bucket in enumerate(buckets)}
+
+def _merge_partials(current: list, other: list) -> list:
+    merged = [current[0] + other[0], min(current[1], other[1]), max(current[2], other[2])]
+    for total, count, other_total, other_count in zip(current[3::2], current[4::2], other[3::2], other[4::2]):
+        merged += [(total or 0) + (other_total or 0), count + other_count]
+    return merged
+
+def get_heart_measurement_series(db: Session, user_id: int, interval: str, start: datetime, end: datetime) -> list:
+    """
+    Serie agregada por intervalo (5m, 1h, 1d) para graficas.
+    Si el rango llega antes de la ventana caliente se suman los agregados del archivo frio.
+    """
+    seconds = INTERVALS[interval]
+    partials = _series_partials(db, user_id, seconds, start, end)
+    if _reaches_archive(start, user_id):
+        for bucket, archived in _archived_series_partials(user_id, seconds, start, end).items():
+            partials[bucket] = _merge_partials(partials[bucket], archived) if bucket in partials else archived
+
+    points = []
+    for bucket in sorted(partials):
+        values = partials[bucket]
+        point = {
+            "bucket": epoch_to_datetime(bucket),
+            "count": int(values[0]),
+            "heart_rate_min": int(values[1]),
+            "heart_rate_max": int(values[2])
+        }
+        for position, field in enumerate(SERIES_AVERAGES):
+            point[field] = _average(values[3 + 2 * position], values[4 + 2 * position])
+        points.append(point)
+    return points
+
+def build_heart_measurement_row(measurement_data: dict) -> dict:
+    """Normaliza los datos de una medicion a las columnas de tbb_mediciones_cardiacas"""
+    return {
+        "Usuario_ID": measurement_data["Usuario_ID"],
+        "Smartwatch_ID": measurement_data["Smartwatch_ID"],
+        "Timestamp_medicion": measurement_data["Timestamp_medicion"],
+        "Frecuencia_cardiaca": measurement_data["Frecuencia_cardiaca"],
+        "Presion_sistolica": measurement_data.get("Presion_sistolica"),
+        "Presion_diastolica": measurement_data.get("Presion_diastolica"),
+        "Saturacion_oxigeno": measurement_data.get("Saturacion_oxigeno"),
+        "Temperatura": measurement_data.get("Temperatura"),
+        "Nivel_estres": measurement_data.get("Nivel_estres"),
+        "Variabilidad_ritmo": measurement_data.get("Variabilidad_ritmo"),
+        "Estatus": True if measurement_data.get("Estatus") is None else measurement_data["Estatus"]
+    }
+
+def _insert_statement(db: Session, on_conflict: str = ON_CONFLICT_IGNORE):
+    """
+    INSERT que respeta la clave natural (Smartwatch_ID, Timestamp_medicion).
+    Una medicion repetida se ignora (ON_CONFLICT_IGNORE) o actualiza la existente (ON_CONFLICT_UPDATE).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(HeartMeasurement)
+        if on_conflict == ON_CONFLICT_UPDATE:
+            values = {column: stmt.inserted[column] for column in UPSERT_COLUMNS}
+            values["Fecha_Actualizacion"] = func.now()
+            return stmt.on_duplicate_key_update(values)
+        # Asignacion sin efecto: MySQL no cuenta la fila como afectada
+        return stmt.on_duplicate_key_update(ID=HeartMeasurement.__table__.c.ID)
+
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(HeartMeasurement)
+        index_elements = [HeartMeasurement.Smartwatch_ID, HeartMeasurement.Timestamp_medicion]
+        if on_conflict == ON_CONFLICT_UPDATE:
+            values = {column: stmt.excluded[column] for column in UPSERT_COLUMNS}
+            values["Fecha_Actualizacion"] = func.now()
+            return stmt.on_conflict_do_update(index_elements=index_elements, set_=values)
+        return stmt.on_conflict_do_nothing(index_elements=index_elements)
+
+    return insert(HeartMeasurement)
+
+def get_latest_heart_measurements_by_user(db: Session, user_id: int, smartwatch_ids: list) -> list:
+    """
+    Ultima medicion activa de cada smartwatch del usuario.
+    Una consulta LIMIT 1 por smartwatch que recorre el indice (Smartwatch_ID, Timestamp_medicion)
+    desde el final: sin ordenar ni recorrer la tabla.
+    """
+    latest = []
+    for smartwatch_id in smartwatch_ids:
+        measurement = db.query(HeartMeasurement).filter(
+            HeartMeasurement.Smartwatch_ID == smartwatch_id,
+            HeartMeasurement.Usuario_ID == user_id,
+            HeartMeasurement.Estatus == True
+        ).order_by(HeartMeasurement.Timestamp_medicion.desc()).first()
+        if measurement is not None:
+            latest.append(measurement)
+    return latest
+
+def get_heart_measurement_by_natural_key(db: Session, smartwatch_id: int, timestamp: datetime):
+    return db.query(HeartMeasurement).filter(
+        HeartMeasurement.Smartwatch_ID == smartwatch_id,
+        HeartMeasurement.Timestamp_medicion == timestamp
+    ).first()
+
+def get_existing_natural_keys(db: Session, measurements_data: list) -> set:
+    """
+    Regresa las claves (Smartwatch_ID, Timestamp_medicion) del lote que ya existen.
+    Una sola consulta acotada por smartwatch y rango de tiempo, resuelta con el indice unico.
+    """
+    if not measurements_data:
+        return set()
+    smartwatch_ids = {data["Smartwatch_ID"] for data in measurements_data}
+    timestamps = [data["Timestamp_medicion"] for data in measurements_data]
+    rows = db.query(HeartMeasurement.Smartwatch_ID, HeartMeasurement.Timestamp_medicion).filter(
+        HeartMeasurement.Smartwatch_ID.in_(smartwatch_ids),
+        HeartMeasurement.Timestamp_medicion >= min(timestamps),
+        HeartMeasurement.Timestamp_medicion <= max(timestamps)
+    ).all()
+    return {(row[0], row[1]) for row in rows}
+
+def get_heart_measurements_by_natural_keys(db: Session, keys: list) -> list:
+    """Mediciones guardadas con esas claves (Smartwatch_ID, Timestamp_medicion), en el orden de keys"""
+    if not keys:
+        return []
+    wanted = set(keys)
+    measurements = db.query(HeartMeasurement).filter(
+        HeartMeasurement.Smartwatch_ID.in_({key[0] for key in wanted}),
+        HeartMeasurement.Timestamp_medicion >= min(key[1] for key in wanted),
+        HeartMeasurement.Timestamp_medicion <= max(key[1] for key in wanted)
+    ).all()
+    by_key = {(m.Smartwatch_ID, m.Timestamp_medicion): m for m in measurements if (m.Smartwatch_ID, m.Timestamp_medicion) in wanted}
+    return [by_key[key] for key in keys if key in by_key]
+
+def _natural_key(row: dict) -> tuple:
+    return row["Smartwatch_ID"], row["Timestamp_medicion"]
+
+def _rows_to_write(db: Session, rows: list, on_conflict: str, existing: Optional[set] = None) -> list:
+    """
+    Filas que el INSERT realmente escribe: una por clave natural y, en modo ignore, sin las que
+    ya estan guardadas (reintentos). Se consulta antes del INSERT dentro de la misma transaccion,
+    salvo que quien llama ya tenga las claves existentes (existing).
+    """
+    if on_conflict == ON_CONFLICT_UPDATE:
+        existing = set()
+    elif existing is None:
+        existing = get_existing_natural_keys(db, rows)
+    written = {}
+    for row in rows:
+        key = _natural_key(row)
+        if key in existing or (key in written and on_conflict != ON_CONFLICT_UPDATE):
+            continue
+        # En modo update la ultima version de una clave repetida es la que queda guardada
+        written[key] = row
+    return list(written.values())
+
+def _refresh_rollups(db: Session, ranges: dict):
+    """
+    Dentro de la transaccion solo si no corre el refresco en segundo plano (jobs, scripts);
+    en la aplicacion los rangos se marcan despues del commit con _mark_rollups.
+    """
+    if settings.VITALS_ROLLUP_SYNC_ENABLED and ranges and not vitals_rollup_refresher.is_running:
+        crud_vitals_rollup.refresh_vitals_rollups(db, ranges)
+
+def _mark_rollups(ranges: dict):
+    """Despues del commit: el refresco en segundo plano recalcula los periodos, agrupados con los de otras escrituras"""
+    if settings.VITALS_ROLLUP_SYNC_ENABLED and ranges and vitals_rollup_refresher.is_running:
+        vitals_rollup_refresher.mark(ranges)
+
+def _rollup_period_changed(previous: dict, measurement) -> bool:
+    hour = INTERVALS["1h"]
+    return (
+        previous["Smartwatch_ID"] != measurement.Smartwatch_ID
+        or floor_datetime(previous["Timestamp_medicion"], hour) != floor_datetime(measurement.Timestamp_medicion, hour)
+    )
+
+def _create_alerts(db: Session, rows: list):
+    """
+    Evalua las reglas de umbral sobre las mediciones escritas y guarda las alertas en la misma transaccion.
+    Con agrupacion, los disparos repetidos de un (usuario, tipo) suman a la alerta abierta; el
+    resultado se registra en el indice y se notifica con _remember_alerts despues del commit.
+    """
+    if not (settings.ALERT_ENGINE_ENABLED and rows):
+        return None
+    plan = open_alerts.plan(alert_engine.evaluate_measurements(rows))
+    if not open_alerts.enabled:
+        crud_alert.insert_alerts(db, plan.new_alerts)
+        return plan, []
+    try:
+        created = crud_alert.add_alerts(db, plan.new_alerts)
+        crud_alert.increment_alerts(db, plan.updates)
+    except Exception:
+        open_alerts.release(plan)
+        raise
+    return plan, created
+
+def _release_alerts(result):
+    """Rollback despues de _create_alerts: libera las claves reservadas por el plan"""
+    if result is not None:
+        open_alerts.release(result[0])
+
+def _remember_alerts(db: Session, result):
+    """
+    Despues del commit: registra las alertas abiertas y notifica por correo las alertas nuevas.
+    Las mediciones y alertas ya estan guardadas, un error aqui se registra y no afecta la respuesta.
+    """
+    if result is None:
+        return
+    plan, created = result
+    try:
+        open_alerts.remember(plan, created)
+    except Exception as e:
+        logger.error(f"Error registrando alertas abiertas: {e}")
+    try:
+        alert_notifications.notify_new_alerts(db, plan.new_alerts)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error notificando {len(plan.new_alerts)} alertas nuevas: {e}")
+
+def create_heart_measurement(db: Session, measurement_data: dict, on_conflict: str = ON_CONFLICT_IGNORE):
+    """
+    Crea una medicion de forma idempotente.
+    Si el smartwatch ya reporto ese timestamp se regresa la medicion existente, sin volver a
+    calcular resumenes ni alertas.
+    """
+    row = build_heart_measurement_row(measurement_data)
+    alerts = None
+    try:
+        written = _rows_to_write(db, [row], on_conflict)
+        if written:
+            result = db.connection().execute(_insert_statement(db, on_conflict), row)
+            # Carrera con otra peticion igual: el INSERT ignorado reporta 0 filas afectadas
+            if on_conflict != ON_CONFLICT_UPDATE and result.rowcount == 0:
+                written = []
+        ranges = crud_vitals_rollup.measurement_ranges(written)
+        _refresh_rollups(db, ranges)
+        alerts = _create_alerts(db, written)
+        db.commit()
+    except Exception:
+        db.rollback()
+        _release_alerts(alerts)
+        raise
+    _mark_rollups(ranges)
+    _remember_alerts(db, alerts)
+    db_measurement = get_heart_measurement_by_natural_key(db, row["Smartwatch_ID"], row["Timestamp_medicion"])
+    # Un reintento ignorado no es una medicion nueva
+    if written:
+        measurement_events.publish(measurement_events.EVENT_SAVED, [db_measurement])
     return db_measurement
 
+def create_heart_measurements_batch(db: Session, measurements_data: list, chunk_size: int = 1000,
+                                    on_conflict: str = ON_CONFLICT_IGNORE, existing: Optional[set] = None) -> int:
+    """
+    Inserta varias mediciones en una sola transaccion y regresa cuantas se escribieron.
+    Cada bloque de chunk_size filas se envia como un INSERT multi-fila, sin refresh por fila.
+    Las mediciones repetidas (misma clave natural) se ignoran o actualizan segun on_conflict;
+    existing son las claves ya guardadas si quien llama ya las consulto (get_existing_natural_keys).
+    Los resumenes por hora/dia de los periodos afectados y las alertas de umbral se calculan solo
+    con las filas escritas (un reintento ignorado no vuelve a disparar alertas).
+    """
+    # Fecha_Registro explicita: sin defaults SQL en linea el driver puede agrupar el executemany en un solo INSERT
+    registered_at = datetime.now()
+    rows = [{**build_heart_measurement_row(data), "Fecha_Registro": registered_at} for data in measurements_data]
+    stmt = _insert_statement(db, on_conflict)
+    alerts = None
+    try:
+        written = _rows_to_write(db, rows, on_conflict, existing)
+        for start in range(0, len(written), chunk_size):
+            db.execute(stmt, written[start:start + chunk_size])
+        ranges = crud_vitals_rollup.measurement_ranges(written)
+        _refresh_rollups(db, ranges)
+        alerts = _create_alerts(db, written)
+        db.commit()
+    except Exception:
+        db.rollback()
+        _release_alerts(alerts)
+        raise
+    _mark_rollups(ranges)
+    _remember_alerts(db, alerts)
+    _publish_saved(db, written)
+    return len(written)
+
+def _publish_saved(db: Session, written: list):
+    """Publica las mediciones escritas tal como quedaron guardadas (con ID), solo si hay listeners"""
+    if written and measurement_events.has_listeners(measurement_events.EVENT_SAVED):
+        measurement_events.publish(
+            measurement_events.EVENT_SAVED,
+            get_heart_measurements_by_natural_keys(db, [_natural_key(row) for row in written])
+        )
+
 def update_heart_measurement(db: Session, measurement_id: int, measurement_data: dict):
     db_measurement = db.query(HeartMeasurement).filter(HeartMeasurement.ID == measurement_id).first()
     if db_measurement:
+        # El cambio puede mover la medicion de periodo o de smartwatch: se refrescan ambos lados
+        previous = {
+            "Usuario_ID": db_measurement.Usuario_ID,
+            "Smartwatch_ID": db_measurement.Smartwatch_ID,
+            "Timestamp_medicion": db_measurement.Timestamp_medicion
+        }
         for key, value in measurement_data.items():
             setattr(db_measurement, key, value)
+        db.flush()
+        # El job incremental solo ve los valores actuales de la fila: el periodo que dejo se refresca aqui
+        if _rollup_period_changed(previous, db_measurement):
+            crud_vitals_rollup.refresh_vitals_rollups(db, crud_vitals_rollup.measurement_ranges([previous]))
+        ranges = crud_vitals_rollup.measurement_ranges([db_measurement])
+        _refresh_rollups(db, ranges)
         db.commit()
+        _mark_rollups(ranges)
         db.refresh(db_measurement)
+        measurement_events.publish(measurement_events.EVENT_CHANGED, [previous, db_measurement])
     return db_measurement
 
 def delete_heart_measurement(db: Session, measurement_id: int):
     db_measurement = db.query(HeartMeasurement).filter(HeartMeasurement.ID == measurement_id).first()
     if db_measurement:
         db_measurement.Estatus = False
+        db.flush()
+        ranges = crud_vitals_rollup.measurement_ranges([db_measurement])
+        _refresh_rollups(db, ranges)
         db.commit()
+        _mark_rollups(ranges)
         db.refresh(db_measurement)
+        measurement_events.publish(measurement_events.EVENT_CHANGED, [db_measurement])
     return db_measurement
\ No newline at end of file
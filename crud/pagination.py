@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime, date
+from typing import Optional
+from sqlalchemy import and_, or_
+from config.settings import settings
+
+class InvalidCursorError(ValueError):
+    """El cursor de paginacion no corresponde al listado solicitado"""
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _decode_value(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+def encode_cursor(values: list) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, order_columns: list) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(order_columns):
+            raise ValueError("longitud incorrecta")
+        return [_decode_value(column, value) for column, value in zip(order_columns, values)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Cursor de paginacion invalido: {e}")
+
+def _seek_predicate(order_columns: list, values: list, descending: bool):
+    """
+    Predicado de busqueda (keyset) equivalente a (c1, c2, ...) < (v1, v2, ...).
+    Se expande en OR/AND para que el optimizador use el indice compuesto como rango.
+    """
+    clauses = []
+    for position, column in enumerate(order_columns):
+        equals = [order_columns[i] == values[i] for i in range(position)]
+        beyond = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equals, beyond))
+    return or_(*clauses)
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, settings.PAGINATION_MAX_LIMIT))
+
+def paginate(query, order_columns: list, cursor: Optional[str] = None, limit: int = 100,
+             descending: bool = True) -> dict:
+    """
+    Paginacion por cursor: ordena por order_columns (la ultima debe ser unica, normalmente ID)
+    y continua despues de la ultima fila de la pagina anterior en lugar de usar OFFSET.
+    Cualquier pagina cuesta lo mismo que la primera.
+    """
+    limit = clamp_limit(limit)
+    if cursor:
+        query = query.filter(_seek_predicate(order_columns, decode_cursor(cursor, order_columns), descending))
+    ordering = [column.desc() if descending else column.asc() for column in order_columns]
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in order_columns])
+    return {"items": rows, "next_cursor": next_cursor, "limit": limit}
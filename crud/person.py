@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from models.person import Person, GenderEnum
 from typing import Optional
 from datetime import datetime
+from crud.pagination import paginate
 
 def create_empty_person(db: Session) -> Person:
     """
@@ -69,6 +70,11 @@ def get_person(db: Session, person_id: int) -> Optional[Person]:
     """Obtiene una persona por ID"""
     return db.query(Person).filter(Person.ID == person_id).first()
 
+def get_persons(db: Session, cursor: Optional[str] = None, limit: int = 100) -> dict:
+    """Obtiene una pagina de personas (paginacion por cursor sobre ID)"""
+    query = db.query(Person).filter(Person.Estatus == True)
+    return paginate(query, [Person.ID], cursor=cursor, limit=limit, descending=False)
+
 def update_person(db: Session, person_id: int, person_data: dict) -> Optional[Person]:
     """Actualiza los datos de una persona"""
     db_person = db.query(Person).filter(Person.ID == person_id).first()
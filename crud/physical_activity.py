@@ -1,17 +1,25 @@
+from typing import Optional
 from sqlalchemy.orm import Session
+from crud.pagination import paginate
 from models.physical_activity import PhysicalActivity
 
+# Orden de los historiales: mas reciente primero, ID desempata registros con la misma fecha
+TIMELINE_ORDER = [PhysicalActivity.Fecha_Registro, PhysicalActivity.ID]
+
 def get_physical_activity(db: Session, activity_id: int):
     return db.query(PhysicalActivity).filter(PhysicalActivity.ID == activity_id).first()
 
-def get_physical_activities(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(PhysicalActivity).filter(PhysicalActivity.Estatus == True).offset(skip).limit(limit).all()
+def get_physical_activities(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(PhysicalActivity).filter(PhysicalActivity.Estatus == True)
+    return paginate(query, [PhysicalActivity.ID], cursor=cursor, limit=limit)
 
-def get_physical_activities_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(PhysicalActivity).filter(PhysicalActivity.Usuario_ID == user_id, PhysicalActivity.Estatus == True).offset(skip).limit(limit).all()
+def get_physical_activities_by_user(db: Session, user_id: int, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(PhysicalActivity).filter(PhysicalActivity.Usuario_ID == user_id, PhysicalActivity.Estatus == True)
+    return paginate(query, TIMELINE_ORDER, cursor=cursor, limit=limit)
 
-def get_physical_activities_by_smartwatch(db: Session, smartwatch_id: int, skip: int = 0, limit: int = 100):
-    return db.query(PhysicalActivity).filter(PhysicalActivity.Smartwatch_ID == smartwatch_id, PhysicalActivity.Estatus == True).offset(skip).limit(limit).all()
+def get_physical_activities_by_smartwatch(db: Session, smartwatch_id: int, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(PhysicalActivity).filter(PhysicalActivity.Smartwatch_ID == smartwatch_id, PhysicalActivity.Estatus == True)
+    return paginate(query, TIMELINE_ORDER, cursor=cursor, limit=limit)
 
 def create_physical_activity(db: Session, activity_data: dict):
     db_activity = PhysicalActivity(
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from crud.time_bucket import INTERVALS, floor_datetime
+from models.health_profile import HealthProfile
+from models.heart_measurement import HeartMeasurement
+from models.person import Person
+from models.physical_activity import PhysicalActivity
+from models.risk_features import RiskFeatureVector
+from models.user import User
+from models.vitals_rollup import VitalsDailyRollup
+
+def get_last_refresh(db: Session, window_days: int) -> Optional[datetime]:
+    """Inicio de la ultima corrida que escribio en la ventana (None si nunca se ha llenado)"""
+    return db.execute(
+        select(func.max(RiskFeatureVector.Fecha_calculo)).where(RiskFeatureVector.Ventana_dias == window_days)
+    ).scalar()
+
+def get_feature_vectors(db: Session, user_ids: List[int], window_days: int,
+                        computed_since: Optional[datetime] = None) -> Dict[int, RiskFeatureVector]:
+    """Vectores guardados de los usuarios (usuario -> fila); opcionalmente solo los calculados desde computed_since"""
+    if not user_ids:
+        return {}
+    query = select(RiskFeatureVector).where(
+        RiskFeatureVector.Ventana_dias == window_days,
+        RiskFeatureVector.Usuario_ID.in_(set(user_ids))
+    )
+    if computed_since is not None:
+        query = query.where(RiskFeatureVector.Fecha_calculo >= computed_since)
+    return {row.Usuario_ID: row for row in db.execute(query).scalars()}
+
+def get_feature_rows(db: Session, window_days: int, columns: List[str], user_ids: Optional[List[int]] = None) -> list:
+    """Filas (Usuario_ID, *columns) de la ventana ordenadas por usuario, para armar datasets"""
+    query = select(
+        RiskFeatureVector.Usuario_ID, *[getattr(RiskFeatureVector, column) for column in columns]
+    ).where(RiskFeatureVector.Ventana_dias == window_days).order_by(RiskFeatureVector.Usuario_ID)
+    if user_ids is not None:
+        query = query.where(RiskFeatureVector.Usuario_ID.in_(set(user_ids)))
+    return db.execute(query).all()
+
+def changed_user_ids(db: Session, window_days: int, since: datetime, until: datetime,
+                     stale_before: Optional[datetime] = None) -> set:
+    """
+    Usuarios cuyo vector cambio entre since y until:
+    mediciones registradas o resumenes diarios recalculados; actividad, perfil o persona registrados o
+    actualizados; dias de resumen y actividad que salieron de la ventana; perfiles sin vector y vectores
+    sin perfil. Con stale_before tambien los vectores calculados antes de esa fecha (edad, etc.).
+    """
+    old_cutoff = since - timedelta(days=window_days)
+    new_cutoff = until - timedelta(days=window_days)
+    day = INTERVALS["1d"]
+    store = RiskFeatureVector
+    queries = [
+        select(HeartMeasurement.Usuario_ID).where(HeartMeasurement.Fecha_Registro >= since),
+        select(VitalsDailyRollup.Usuario_ID).where(or_(
+            VitalsDailyRollup.Fecha_Actualizacion >= since,
+            (VitalsDailyRollup.Periodo_inicio >= floor_datetime(old_cutoff, day))
+            & (VitalsDailyRollup.Periodo_inicio < floor_datetime(new_cutoff, day))
+        )),
+        select(PhysicalActivity.Usuario_ID).where(or_(
+            PhysicalActivity.Fecha_Registro >= since,
+            PhysicalActivity.Fecha_Actualizacion >= since,
+            (PhysicalActivity.Fecha_Registro >= old_cutoff) & (PhysicalActivity.Fecha_Registro < new_cutoff)
+        )),
+        select(HealthProfile.Usuario_ID).where(or_(
+            HealthProfile.Fecha_Registro >= since,
+            HealthProfile.Fecha_Actualizacion >= since
+        )),
+        select(User.ID).join(Person, Person.ID == User.Persona_Id).where(Person.Fecha_Actualizacion >= since),
+        select(HealthProfile.Usuario_ID).outerjoin(
+            store, (store.Usuario_ID == HealthProfile.Usuario_ID) & (store.Ventana_dias == window_days)
+        ).where(store.Usuario_ID.is_(None)),
+        select(store.Usuario_ID).outerjoin(
+            HealthProfile, HealthProfile.Usuario_ID == store.Usuario_ID
+        ).where(store.Ventana_dias == window_days, HealthProfile.ID.is_(None))
+    ]
+    if stale_before is not None:
+        queries.append(select(store.Usuario_ID).where(store.Ventana_dias == window_days, store.Fecha_calculo < stale_before))
+    user_ids = set()
+    for query in queries:
+        user_ids.update(db.execute(query.distinct()).scalars())
+    return user_ids
+
+def replace_feature_vectors(db: Session, window_days: int, rows: list, user_ids: Optional[List[int]] = None,
+                            chunk_size: int = 1000) -> int:
+    """
+    Borra los vectores de los usuarios (todos los de la ventana si user_ids es None) e inserta las filas
+    nuevas con INSERT multi-fila. Los usuarios sin fila nueva (por ejemplo sin perfil) quedan sin vector.
+    No hace commit.
+    """
+    stmt = delete(RiskFeatureVector).where(RiskFeatureVector.Ventana_dias == window_days)
+    if user_ids is None:
+        db.execute(stmt)
+    else:
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), chunk_size):
+            db.execute(stmt.where(RiskFeatureVector.Usuario_ID.in_(user_ids[start:start + chunk_size])))
+    for start in range(0, len(rows), chunk_size):
+        db.execute(insert(RiskFeatureVector), rows[start:start + chunk_size])
+    return len(rows)
@@ -1,4 +1,6 @@
+from typing import Optional
 from sqlalchemy.orm import Session
+from crud.pagination import paginate
 from models.role import Role
 
 def get_role(db: Session, role_id: int):
@@ -7,8 +9,9 @@ def get_role(db: Session, role_id: int):
 def get_role_by_name(db: Session, name: str):
     return db.query(Role).filter(Role.Nombre == name).first()
 
-def get_roles(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Role).filter(Role.Estatus == True).offset(skip).limit(limit).all()
+def get_roles(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(Role).filter(Role.Estatus == True)
+    return paginate(query, [Role.ID], cursor=cursor, limit=limit, descending=False)
 
 def create_role(db: Session, role_data: dict):
     db_role = Role(
@@ -1,4 +1,6 @@
+from typing import Optional
 from sqlalchemy.orm import Session
+from crud.pagination import paginate
 from models.smartwatch import Smartwatch
 
 def get_smartwatch(db: Session, smartwatch_id: int):
@@ -7,8 +9,9 @@ def get_smartwatch(db: Session, smartwatch_id: int):
 def get_smartwatch_by_serial(db: Session, serial: str):
     return db.query(Smartwatch).filter(Smartwatch.Numero_serie == serial).first()
 
-def get_smartwatches(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Smartwatch).filter(Smartwatch.Estatus == True).offset(skip).limit(limit).all()
+def get_smartwatches(db: Session, cursor: Optional[str] = None, limit: int = 100):
+    query = db.query(Smartwatch).filter(Smartwatch.Estatus == True)
+    return paginate(query, [Smartwatch.ID], cursor=cursor, limit=limit, descending=False)
 
 def get_smartwatches_by_user(db: Session, user_id: int):
     return db.query(Smartwatch).filter(Smartwatch.Usuario_ID == user_id, Smartwatch.Estatus == True).all()
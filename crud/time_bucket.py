@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import BigInteger, DateTime, Integer, cast, func, literal_column, type_coerce
+from sqlalchemy.orm import Session
+
+EPOCH = datetime(1970, 1, 1)
+
+# Intervalos soportados para series agregadas, en segundos
+INTERVALS = {
+    "5m": 5 * 60,
+    "1h": 60 * 60,
+    "1d": 24 * 60 * 60
+}
+
+# Formatos para truncar un DATETIME a la hora o al dia (MySQL DATE_FORMAT / SQLite strftime)
+_TRUNCATE_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00"
+}
+
+# Las constantes se escriben como literales y no como parametros: la misma expresion
+# aparece en SELECT y GROUP BY y algunos motores no reconocen dos parametros como iguales
+
+def epoch_seconds(db: Session, column):
+    """
+    Segundos desde 1970-01-01 de una columna DATETIME, calculados en la base de datos.
+    Las fechas se guardan sin zona horaria, por lo que no se aplica ninguna conversion.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        return func.timestampdiff(literal_column("SECOND"), literal_column("'1970-01-01 00:00:00'"), column)
+    if dialect == "postgresql":
+        return cast(func.floor(func.extract("epoch", column)), BigInteger)
+    return cast(func.strftime(literal_column("'%s'"), column), Integer)
+
+def bucket_start(db: Session, column, seconds: int):
+    """Inicio del intervalo (en segundos epoch) al que pertenece cada fila"""
+    epoch = epoch_seconds(db, column)
+    return epoch - (epoch % literal_column(str(int(seconds))))
+
+def truncate_datetime(db: Session, column, unit: str):
+    """Trunca una columna DATETIME a la hora o al dia, conservando el tipo DATETIME"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        expression = cast(func.date_format(column, literal_column(f"'{_TRUNCATE_FORMATS[unit]}'")), DateTime)
+    elif dialect == "postgresql":
+        expression = func.date_trunc(literal_column(f"'{unit}'"), column)
+    else:
+        # SQLAlchemy guarda los DATETIME de SQLite como texto con microsegundos
+        expression = func.strftime(literal_column(f"'{_TRUNCATE_FORMATS[unit]}.000000'"), column)
+    return type_coerce(expression, DateTime)
+
+def to_naive_local(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Las columnas DATETIME no guardan zona horaria y el servidor compara con datetime.now() (hora
+    local): una fecha con zona (por ejemplo ...Z o -06:00) se convierte a la hora local del
+    servidor y se le quita la zona; las fechas sin zona no cambian.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+def epoch_to_datetime(seconds) -> datetime:
+    return EPOCH + timedelta(seconds=int(seconds))
+
+def floor_datetime(value: datetime, seconds: int) -> datetime:
+    """Equivalente en Python de bucket_start, para alinear rangos con los intervalos"""
+    epoch = int((value - EPOCH).total_seconds())
+    return epoch_to_datetime(epoch - epoch % seconds)
@@ -5,6 +5,7 @@ from models.user_role import UserRole
 from models.role import Role
 from typing import Optional, List
 import crud.person as person_crud
+from crud.pagination import paginate
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     """Obtiene un usuario por ID"""
@@ -18,9 +19,10 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """Obtiene un usuario por nombre de usuario"""
     return db.query(User).filter(User.Nombre_Usuario == username).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    """Obtiene una lista de usuarios"""
-    return db.query(User).filter(User.Estatus == True).offset(skip).limit(limit).all()
+def get_users(db: Session, cursor: Optional[str] = None, limit: int = 100) -> dict:
+    """Obtiene una pagina de usuarios (paginacion por cursor sobre ID)"""
+    query = db.query(User).filter(User.Estatus == True)
+    return paginate(query, [User.ID], cursor=cursor, limit=limit, descending=False)
 
 def create_user(db: Session, user_data: dict) -> User:
     """
@@ -0,0 +1,194 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from crud.time_bucket import INTERVALS, floor_datetime, truncate_datetime
+from models.heart_measurement import HeartMeasurement
+from models.vitals_rollup import ROLLUP_VITALS, VitalsDailyRollup, VitalsHourlyRollup
+from services import measurement_archive
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+# Umbrales de episodios, los mismos que usa el modelo de riesgo cardiovascular
+HIGH_HEART_RATE = 100
+LOW_HEART_RATE = 60
+
+# Smartwatches refrescados por sentencia, limita el tamano del OR de rangos
+REFRESH_SMARTWATCH_CHUNK = 200
+
+# Intervalos de /series que se leen de los resumenes en lugar de las mediciones
+ROLLUP_TABLES = {
+    "1h": VitalsHourlyRollup,
+    "1d": VitalsDailyRollup
+}
+
+def rollup_columns() -> list:
+    """Columnas de los resumenes en el orden en que se calculan los agregados"""
+    columns = ["Usuario_ID", "Smartwatch_ID", "Periodo_inicio", "Conteo"]
+    for prefix in ROLLUP_VITALS:
+        columns += [f"{prefix}_conteo", f"{prefix}_suma", f"{prefix}_suma_cuadrados", f"{prefix}_min", f"{prefix}_max"]
+    return columns + ["Episodios_taquicardia", "Episodios_bradicardia"]
+
+def measurement_ranges(measurements: Iterable) -> Dict[int, Tuple[datetime, datetime]]:
+    """Rango de timestamps por smartwatch de un conjunto de mediciones (dicts u objetos)"""
+    ranges = {}
+    for measurement in measurements:
+        if isinstance(measurement, dict):
+            smartwatch_id, timestamp = measurement["Smartwatch_ID"], measurement["Timestamp_medicion"]
+        else:
+            smartwatch_id, timestamp = measurement.Smartwatch_ID, measurement.Timestamp_medicion
+        current = ranges.get(smartwatch_id)
+        ranges[smartwatch_id] = (timestamp, timestamp) if current is None else (min(current[0], timestamp), max(current[1], timestamp))
+    return ranges
+
+def _hourly_aggregates(db: Session, conditions: list):
+    """SELECT ... GROUP BY (usuario, smartwatch, hora) sobre las mediciones activas"""
+    hour = truncate_datetime(db, HeartMeasurement.Timestamp_medicion, "hour")
+    heart_rate = HeartMeasurement.Frecuencia_cardiaca
+    aggregates = [HeartMeasurement.Usuario_ID, HeartMeasurement.Smartwatch_ID, hour, func.count(HeartMeasurement.ID)]
+    for source in ROLLUP_VITALS.values():
+        value = getattr(HeartMeasurement, source)
+        aggregates += [
+            func.count(value),
+            func.coalesce(func.sum(value), 0),
+            func.coalesce(func.sum(value * value), 0),
+            func.min(value),
+            func.max(value)
+        ]
+    aggregates += [
+        func.sum(case((heart_rate > HIGH_HEART_RATE, 1), else_=0)),
+        func.sum(case((heart_rate < LOW_HEART_RATE, 1), else_=0))
+    ]
+    return (
+        select(*aggregates)
+        .where(HeartMeasurement.Estatus == True, or_(*conditions))
+        .group_by(HeartMeasurement.Usuario_ID, HeartMeasurement.Smartwatch_ID, hour)
+    )
+
+def _daily_aggregates(db: Session, conditions: list):
+    """SELECT ... GROUP BY (usuario, smartwatch, dia) sobre los resumenes por hora"""
+    day = truncate_datetime(db, VitalsHourlyRollup.Periodo_inicio, "day")
+    aggregates = [VitalsHourlyRollup.Usuario_ID, VitalsHourlyRollup.Smartwatch_ID, day, func.sum(VitalsHourlyRollup.Conteo)]
+    for prefix in ROLLUP_VITALS:
+        aggregates += [
+            func.sum(getattr(VitalsHourlyRollup, f"{prefix}_conteo")),
+            func.sum(getattr(VitalsHourlyRollup, f"{prefix}_suma")),
+            func.sum(getattr(VitalsHourlyRollup, f"{prefix}_suma_cuadrados")),
+            func.min(getattr(VitalsHourlyRollup, f"{prefix}_min")),
+            func.max(getattr(VitalsHourlyRollup, f"{prefix}_max"))
+        ]
+    aggregates += [
+        func.sum(VitalsHourlyRollup.Episodios_taquicardia),
+        func.sum(VitalsHourlyRollup.Episodios_bradicardia)
+    ]
+    return (
+        select(*aggregates)
+        .where(or_(*conditions))
+        .group_by(VitalsHourlyRollup.Usuario_ID, VitalsHourlyRollup.Smartwatch_ID, day)
+    )
+
+def _range_conditions(smartwatch_column, time_column, ranges: dict, step: timedelta) -> list:
+    seconds = int(step.total_seconds())
+    return [
+        and_(
+            smartwatch_column == smartwatch_id,
+            time_column >= floor_datetime(start, seconds),
+            time_column < floor_datetime(end, seconds) + step
+        )
+        for smartwatch_id, (start, end) in ranges.items()
+    ]
+
+def _refresh_chunk(db: Session, ranges: dict):
+    columns = rollup_columns()
+
+    db.execute(delete(VitalsHourlyRollup).where(or_(
+        *_range_conditions(VitalsHourlyRollup.Smartwatch_ID, VitalsHourlyRollup.Periodo_inicio, ranges, HOUR)
+    )))
+    db.execute(insert(VitalsHourlyRollup).from_select(columns, _hourly_aggregates(
+        db, _range_conditions(HeartMeasurement.Smartwatch_ID, HeartMeasurement.Timestamp_medicion, ranges, HOUR)
+    )))
+
+    db.execute(delete(VitalsDailyRollup).where(or_(
+        *_range_conditions(VitalsDailyRollup.Smartwatch_ID, VitalsDailyRollup.Periodo_inicio, ranges, DAY)
+    )))
+    db.execute(insert(VitalsDailyRollup).from_select(columns, _daily_aggregates(
+        db, _range_conditions(VitalsHourlyRollup.Smartwatch_ID, VitalsHourlyRollup.Periodo_inicio, ranges, DAY)
+    )))
+
+def hot_ranges(ranges: Dict[int, Tuple[datetime, datetime]]) -> Dict[int, Tuple[datetime, datetime]]:
+    """
+    Recorta los rangos a la ventana caliente cuando hay mediciones archivadas: esos periodos ya no
+    estan completos en la tabla y recalcularlos borraria del resumen las filas archivadas.
+    """
+    if not measurement_archive.has_archive():
+        return ranges
+    hot_start = measurement_archive.hot_window_start()
+    return {
+        smartwatch_id: (max(start, hot_start), end)
+        for smartwatch_id, (start, end) in ranges.items()
+        if end >= hot_start
+    }
+
+def refresh_vitals_rollups(db: Session, ranges: Dict[int, Tuple[datetime, datetime]]):
+    """
+    Recalcula los resumenes por hora y por dia que cubren los rangos (smartwatch -> (inicio, fin)).
+    Cada periodo afectado se borra y se vuelve a calcular desde las mediciones con INSERT ... SELECT,
+    por lo que el resultado es exacto aun con mediciones repetidas, actualizadas o desactivadas.
+    Los periodos anteriores a la ventana caliente no se tocan si hay archivo frio.
+    No hace commit: se ejecuta dentro de la transaccion de quien escribe las mediciones.
+    """
+    items = list(hot_ranges(ranges).items())
+    for start in range(0, len(items), REFRESH_SMARTWATCH_CHUNK):
+        _refresh_chunk(db, dict(items[start:start + REFRESH_SMARTWATCH_CHUNK]))
+
+def _average(total, count, digits: int = 2):
+    return round(float(total) / count, digits) if count else None
+
+def get_vitals_series(db: Session, user_id: int, interval: str, start: datetime, end: datetime) -> list:
+    """
+    Serie agregada por hora o por dia leida de los resumenes (suma los smartwatches del usuario).
+    Los periodos de los extremos se regresan completos.
+    """
+    table = ROLLUP_TABLES[interval]
+    rows = db.query(
+        table.Periodo_inicio,
+        func.sum(table.Conteo),
+        func.min(table.FC_min),
+        func.sum(table.FC_suma),
+        func.sum(table.FC_conteo),
+        func.max(table.FC_max),
+        func.sum(table.Sistolica_suma),
+        func.sum(table.Sistolica_conteo),
+        func.sum(table.Diastolica_suma),
+        func.sum(table.Diastolica_conteo),
+        func.sum(table.SpO2_suma),
+        func.sum(table.SpO2_conteo),
+        func.sum(table.Estres_suma),
+        func.sum(table.Estres_conteo)
+    ).filter(
+        table.Usuario_ID == user_id,
+        table.Periodo_inicio >= floor_datetime(start, INTERVALS[interval]),
+        table.Periodo_inicio <= end
+    ).group_by(table.Periodo_inicio).order_by(table.Periodo_inicio).all()
+
+    return [
+        {
+            "bucket": row[0],
+            "count": row[1],
+            "heart_rate_min": row[2],
+            "heart_rate_avg": _average(row[3], row[4]),
+            "heart_rate_max": row[5],
+            "systolic_avg": _average(row[6], row[7]),
+            "diastolic_avg": _average(row[8], row[9]),
+            "spo2_avg": _average(row[10], row[11]),
+            "stress_avg": _average(row[12], row[13])
+        }
+        for row in rows
+    ]
+
+def get_daily_rollups_by_user(db: Session, user_id: int, start: Optional[datetime] = None):
+    query = db.query(VitalsDailyRollup).filter(VitalsDailyRollup.Usuario_ID == user_id)
+    if start is not None:
+        query = query.filter(VitalsDailyRollup.Periodo_inicio >= floor_datetime(start, INTERVALS["1d"]))
+    return query.order_by(VitalsDailyRollup.Periodo_inicio).all()
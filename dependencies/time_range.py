@@ -0,0 +1,27 @@
+# dependencies/time_range.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, status
+from crud.time_bucket import to_naive_local
+
+@dataclass
+class TimeRange:
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+def get_time_range(
+    start: Optional[datetime] = Query(None, alias="from", description="Inicio del rango (inclusivo)"),
+    end: Optional[datetime] = Query(None, alias="to", description="Fin del rango (inclusivo)")
+) -> TimeRange:
+    """
+    Dependencia para filtrar historiales por rango de tiempo con ?from=...&to=...
+    Las fechas con zona horaria se convierten a la hora local sin zona, como se comparan con la base de datos.
+    """
+    start, end = to_naive_local(start), to_naive_local(end)
+    if start and end and start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El inicio del rango (from) debe ser anterior al fin (to)"
+        )
+    return TimeRange(start=start, end=end)
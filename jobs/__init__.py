@@ -0,0 +1,5 @@
+# jobs/__init__.py
+"""
+Trabajos de mantenimiento que se ejecutan fuera del API.
+Cada modulo se ejecuta desde la raíz del proyecto con: python -m jobs.<nombre>
+"""
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Agrega a las tablas existentes las columnas declaradas en los modelos que aun no existen.
+
+Base.metadata.create_all solo crea tablas nuevas, por lo que las tablas que ya existian
+no reciben las columnas agregadas despues (por ejemplo Conteo_disparos y
+Timestamp_ultimo_disparo de tbb_alertas). Solo se agregan columnas nulas o con
+server_default; despues correr jobs.create_indexes para sus indices.
+
+Uso: python -m jobs.add_missing_columns [--dry-run]
+"""
+
+import argparse
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+from config.database import Base, engine
+import models  # noqa: F401  registra todas las tablas en Base.metadata
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def add_missing_columns(dry_run: bool = False) -> list:
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                logger.warning(f"Columna {table.name}.{column.name} omitida: NOT NULL sin server_default")
+                continue
+            definition = CreateColumn(column).compile(dialect=engine.dialect)
+            statement = f"ALTER TABLE {table.name} ADD COLUMN {definition}"
+            if not dry_run:
+                with engine.begin() as connection:
+                    connection.execute(text(statement))
+            added.append(f"{table.name}.{column.name}")
+            logger.info(f"{statement} {'(pendiente)' if dry_run else ''}".strip())
+    logger.info(f"{len(added)} columnas {'pendientes' if dry_run else 'agregadas'}")
+    return added
+
+def main():
+    parser = argparse.ArgumentParser(description="Agrega las columnas faltantes declaradas en los modelos")
+    parser.add_argument("--dry-run", action="store_true", help="Solo listar las columnas faltantes")
+    args = parser.parse_args()
+    add_missing_columns(args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Barrido de anomalias por usuario: una alerta consolidada por usuario en tbb_alertas.
+
+Reemplaza el ciclo por usuario del notebook modeloDeteccionAnomalias.ipynb. Las mediciones se
+leen en una sola pasada ordenada por usuario (de la base de datos o de la exportacion Parquet),
+se cortan en bloques de usuarios completos y cada bloque se analiza en un pool de procesos con
+una sola llamada vectorizada al modelo (ANOMALY_MODEL_PATH). Las alertas se insertan al final
+con INSERT multi-fila en una sola transaccion; los usuarios que ya tienen una alerta activa del
+barrido dentro de la ventana (--days) se omiten, asi que repetir el job no duplica alertas.
+Reporta usuarios y mediciones por segundo.
+
+Uso: python -m jobs.anomaly_sweep [--days 30] [--source db|parquet] [--workers 4] [--chunk-rows 200000] [--dry-run]
+"""
+
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Iterator
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from config.database import SessionLocal
+from config.settings import settings
+from crud import alert as crud_alert
+from ml_algorithms.anomaly_detection.model import FEATURE_COLUMNS
+from models.heart_measurement import HeartMeasurement
+from services.anomaly_sweep import SWEEP_MESSAGE_PREFIX, UserChunk, analyze_chunk, init_worker
+from services.parquet_export import load_parquet_table
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["Usuario_ID", "Smartwatch_ID", "Timestamp_medicion", *FEATURE_COLUMNS]
+READ_BLOCK_ROWS = 50000
+
+def to_chunk(frame: pd.DataFrame) -> UserChunk:
+    """Bloque de usuarios completos (frame ordenado por Usuario_ID)"""
+    users = frame["Usuario_ID"].to_numpy(dtype=np.int64)
+    boundaries = np.flatnonzero(np.diff(users)) + 1
+    starts = np.concatenate([[0], boundaries, [len(users)]])
+    timestamps = pd.to_datetime(frame["Timestamp_medicion"]).to_numpy(dtype="datetime64[D]")
+    return UserChunk(
+        user_ids=users[starts[:-1]],
+        starts=starts,
+        smartwatch_ids=frame["Smartwatch_ID"].to_numpy(dtype=np.int64),
+        days=timestamps.astype(np.int64),
+        features=frame[FEATURE_COLUMNS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    )
+
+def iter_db_frames(since: datetime) -> Iterator[pd.DataFrame]:
+    """Una sola consulta ordenada por usuario (indice Usuario_ID, Timestamp_medicion), leida por bloques"""
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            select(*[getattr(HeartMeasurement, column) for column in COLUMNS])
+            .where(HeartMeasurement.Estatus == True, HeartMeasurement.Timestamp_medicion >= since)
+            .order_by(HeartMeasurement.Usuario_ID, HeartMeasurement.Timestamp_medicion)
+            .execution_options(stream_results=True, yield_per=READ_BLOCK_ROWS)
+        )
+        for block in result.partitions(READ_BLOCK_ROWS):
+            yield pd.DataFrame(block, columns=COLUMNS)
+    finally:
+        db.close()
+
+def iter_parquet_frames(since: datetime) -> Iterator[pd.DataFrame]:
+    """Snapshot de jobs.export_parquet; se ordena por usuario en memoria"""
+    frame = load_parquet_table("mediciones_cardiacas", start=since.date(), columns=COLUMNS)
+    frame = frame[frame["Timestamp_medicion"] >= since].sort_values(["Usuario_ID", "Timestamp_medicion"], kind="stable")
+    for start in range(0, len(frame), READ_BLOCK_ROWS):
+        yield frame.iloc[start:start + READ_BLOCK_ROWS]
+
+def iter_user_chunks(frames: Iterator[pd.DataFrame], chunk_rows: int) -> Iterator[UserChunk]:
+    """
+    Agrupa los bloques leidos en bloques de ~chunk_rows filas sin partir a ningun usuario:
+    las filas del ultimo usuario de cada corte pasan al siguiente bloque.
+    """
+    pending = []
+    pending_rows = 0
+    for frame in frames:
+        if frame.empty:
+            continue
+        pending.append(frame)
+        pending_rows += len(frame)
+        if pending_rows < chunk_rows:
+            continue
+        buffered = pd.concat(pending, ignore_index=True)
+        users = buffered["Usuario_ID"].to_numpy()
+        cut = int(np.searchsorted(users, users[-1], side="left"))
+        if cut == 0:
+            continue  # un solo usuario en el bloque: seguir leyendo
+        yield to_chunk(buffered.iloc[:cut])
+        pending = [buffered.iloc[cut:]]
+        pending_rows = len(pending[0])
+    if pending_rows:
+        yield to_chunk(pd.concat(pending, ignore_index=True))
+
+def run_sweep(frames: Iterator[pd.DataFrame], workers: int, chunk_rows: int, registered_at: datetime) -> tuple:
+    """Analiza los bloques (en un pool si workers > 1); regresa (alertas, usuarios, mediciones)"""
+    alerts, users, rows = [], 0, 0
+    chunks = iter_user_chunks(frames, chunk_rows)
+    if workers <= 1:
+        init_worker(settings.ANOMALY_MODEL_PATH)
+        for chunk in chunks:
+            alerts.extend(analyze_chunk(chunk, registered_at))
+            users += len(chunk.user_ids)
+            rows += chunk.rows
+        return alerts, users, rows
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(settings.ANOMALY_MODEL_PATH,)) as pool:
+        in_flight = {}
+        for chunk in chunks:
+            # A lo mas 2 bloques por proceso en vuelo: la lectura no llena la memoria
+            while len(in_flight) >= 2 * workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    alerts.extend(future.result())
+                    del in_flight[future]
+            in_flight[pool.submit(analyze_chunk, chunk, registered_at)] = chunk
+            users += len(chunk.user_ids)
+            rows += chunk.rows
+        for future in in_flight:
+            alerts.extend(future.result())
+    return alerts, users, rows
+
+def save_alerts(alerts: list, since: datetime, dry_run: bool) -> tuple:
+    """
+    Inserta las alertas de los usuarios sin una alerta activa del barrido desde since.
+    Regresa (alertas nuevas, usuarios omitidos); con dry_run solo cuenta.
+    """
+    db = SessionLocal()
+    try:
+        alerted = crud_alert.get_user_ids_with_alerts(db, since, SWEEP_MESSAGE_PREFIX)
+        new_alerts = [alert for alert in alerts if alert["Usuario_ID"] not in alerted]
+        if new_alerts and not dry_run:
+            crud_alert.insert_alerts(db, new_alerts)
+            db.commit()
+        return new_alerts, len(alerts) - len(new_alerts)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error insertando alertas de anomalias: {e}")
+        raise
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Barrido de anomalias por usuario con alertas consolidadas")
+    parser.add_argument("--days", type=int, default=30, help="Dias de mediciones a analizar")
+    parser.add_argument("--source", choices=["db", "parquet"], default="db", help="Leer de la base de datos o de PARQUET_EXPORT_DIR")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos del pool (1 = en el proceso actual)")
+    parser.add_argument("--chunk-rows", type=int, default=200000, help="Mediciones aproximadas por bloque de usuarios")
+    parser.add_argument("--dry-run", action="store_true", help="Analizar sin insertar alertas")
+    args = parser.parse_args()
+
+    if not os.path.exists(settings.ANOMALY_MODEL_PATH):
+        parser.error(f"No existe el modelo {settings.ANOMALY_MODEL_PATH}; entrenar con python -m ml_algorithms.anomaly_detection.train")
+
+    since = datetime.now() - timedelta(days=args.days)
+    registered_at = datetime.now()
+    frames = iter_db_frames(since) if args.source == "db" else iter_parquet_frames(since)
+    start_time = time.time()
+    alerts, users, rows = run_sweep(frames, args.workers, args.chunk_rows, registered_at)
+    analyzed = time.time() - start_time
+
+    skipped = 0
+    if alerts:
+        alerts, skipped = save_alerts(alerts, since, args.dry_run)
+
+    elapsed = time.time() - start_time
+    logger.info(
+        f"{users} usuarios y {rows} mediciones analizados en {analyzed:.2f} s "
+        f"({users / max(analyzed, 1e-9):.0f} usuarios/s, {rows / max(analyzed, 1e-9):.0f} mediciones/s); "
+        f"{len(alerts)} alertas {'detectadas (dry-run)' if args.dry_run else 'insertadas'}, "
+        f"{skipped} usuarios con alerta del barrido en la ventana omitidos, total {elapsed:.2f} s"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Mueve al archivo frio las mediciones cardiacas anteriores a la ventana caliente (MEASUREMENT_HOT_DAYS).
+
+Las filas se escriben en MEASUREMENT_ARCHIVE_DIR/mediciones_cardiacas/usuario={id}/mes=YYYY-MM.parquet
+(zstd) y se borran de tbb_mediciones_cardiacas, un usuario y un mes por transaccion. Los listados y
+series de crud.heart_measurement leen el archivo cuando el rango llega antes de la ventana caliente;
+los resumenes por hora/dia se conservan. Repetir una corrida interrumpida no duplica filas.
+
+El indice smartwatch -> usuarios del archivo (para los listados por smartwatch) se actualiza al
+escribir cada mes; --rebuild-index lo crea para un archivo escrito antes del indice.
+
+Uso: python -m jobs.archive_measurements [--user-id 1 --user-id 2] [--rebuild-index]
+"""
+
+import argparse
+import logging
+import time
+from config.database import SessionLocal
+from config.settings import settings
+from services.measurement_archive import (
+    archive_user_measurements,
+    hot_window_start,
+    rebuild_smartwatch_index,
+    users_with_measurements_before
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiva a Parquet las mediciones fuera de la ventana caliente")
+    parser.add_argument("--user-id", type=int, action="append", help="Usuario a archivar (repetible, por defecto todos)")
+    parser.add_argument("--rebuild-index", action="store_true", help="Solo reconstruir el indice smartwatch -> usuarios del archivo")
+    args = parser.parse_args()
+
+    if args.rebuild_index:
+        start_time = time.time()
+        files = rebuild_smartwatch_index()
+        logger.info(f"Indice de smartwatches reconstruido desde {files} archivos en {time.time() - start_time:.2f} segundos")
+        return
+
+    before = hot_window_start()
+    start_time = time.time()
+    db = SessionLocal()
+    archived = 0
+    try:
+        user_ids = args.user_id or users_with_measurements_before(db, before)
+        logger.info(f"Archivando mediciones anteriores a {before:%Y-%m-%d} ({settings.MEASUREMENT_HOT_DAYS} dias) de {len(user_ids)} usuarios")
+        for user_id in user_ids:
+            rows = archive_user_measurements(db, user_id, before)
+            if rows:
+                logger.info(f"Usuario {user_id}: {rows} mediciones archivadas")
+            archived += rows
+    except Exception as e:
+        logger.error(f"Error archivando mediciones: {e}")
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Archivo terminado en {time.time() - start_time:.2f} segundos, {archived} mediciones archivadas")
+
+if __name__ == "__main__":
+    main()
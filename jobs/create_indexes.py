@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Crea los indices declarados en los modelos que aun no existen en la base de datos.
+
+Base.metadata.create_all solo crea tablas nuevas, por lo que las tablas que ya existian
+no reciben los indices agregados despues (por ejemplo los indices compuestos por
+usuario/smartwatch y timestamp que usan las consultas por rango de tiempo).
+Los indices unicos se omiten; esos requieren compactar duplicados antes
+(ver jobs.dedupe_heart_measurements --create-index).
+
+Uso: python -m jobs.create_indexes [--dry-run]
+"""
+
+import argparse
+import logging
+from sqlalchemy import inspect
+from config.database import Base, engine
+import models  # noqa: F401  registra todas las tablas en Base.metadata
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def create_missing_indexes(dry_run: bool = False) -> list:
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in existing:
+                continue
+            if index.unique:
+                logger.warning(f"Indice unico {index.name} omitido, crearlo despues de compactar duplicados")
+                continue
+            if not dry_run:
+                index.create(bind=engine)
+            created.append(index.name)
+            logger.info(f"Indice {index.name} {'pendiente' if dry_run else 'creado'} en {table.name}")
+    logger.info(f"{len(created)} indices {'pendientes' if dry_run else 'creados'}")
+    return created
+
+def main():
+    parser = argparse.ArgumentParser(description="Crea los indices faltantes declarados en los modelos")
+    parser.add_argument("--dry-run", action="store_true", help="Solo listar los indices faltantes")
+    args = parser.parse_args()
+    create_missing_indexes(args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compacta mediciones cardiacas duplicadas por (Smartwatch_ID, Timestamp_medicion).
+
+Se conserva la medicion con el ID mas bajo (la primera que llego) y el resto se borra
+por bloques pequenos, con un commit por bloque, para no bloquear la tabla por mucho tiempo.
+Con --create-index se crea despues el indice unico uq_medicion_smartwatch_timestamp en
+bases de datos que ya existian antes de declararlo en el modelo.
+
+Uso: python -m jobs.dedupe_heart_measurements [--smartwatch-chunk 200] [--delete-batch 1000] [--create-index]
+"""
+
+import argparse
+import logging
+import time
+from sqlalchemy import and_, delete, func, inspect, select
+from config.database import SessionLocal, engine
+from models.heart_measurement import HeartMeasurement
+from models.smartwatch import Smartwatch
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NATURAL_KEY_INDEX = "uq_medicion_smartwatch_timestamp"
+
+def find_duplicate_ids(db, smartwatch_ids: list) -> list:
+    """IDs que sobran en los grupos duplicados de los smartwatches indicados"""
+    groups = (
+        select(
+            HeartMeasurement.Smartwatch_ID.label("smartwatch_id"),
+            HeartMeasurement.Timestamp_medicion.label("timestamp"),
+            func.min(HeartMeasurement.ID).label("keep_id")
+        )
+        .where(HeartMeasurement.Smartwatch_ID.in_(smartwatch_ids))
+        .group_by(HeartMeasurement.Smartwatch_ID, HeartMeasurement.Timestamp_medicion)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    query = select(HeartMeasurement.ID).join(
+        groups,
+        and_(
+            HeartMeasurement.Smartwatch_ID == groups.c.smartwatch_id,
+            HeartMeasurement.Timestamp_medicion == groups.c.timestamp,
+            HeartMeasurement.ID != groups.c.keep_id
+        )
+    )
+    return list(db.execute(query).scalars())
+
+def dedupe_heart_measurements(smartwatch_chunk: int = 200, delete_batch: int = 1000, pause_seconds: float = 0.0) -> int:
+    db = SessionLocal()
+    deleted = 0
+    start_time = time.time()
+    try:
+        smartwatch_ids = list(db.execute(select(Smartwatch.ID).order_by(Smartwatch.ID)).scalars())
+        logger.info(f"Revisando duplicados en {len(smartwatch_ids)} smartwatches")
+
+        for start in range(0, len(smartwatch_ids), smartwatch_chunk):
+            chunk = smartwatch_ids[start:start + smartwatch_chunk]
+            duplicate_ids = find_duplicate_ids(db, chunk)
+            db.commit()  # liberar el snapshot de lectura antes de borrar
+
+            for batch_start in range(0, len(duplicate_ids), delete_batch):
+                batch = duplicate_ids[batch_start:batch_start + delete_batch]
+                db.execute(delete(HeartMeasurement).where(HeartMeasurement.ID.in_(batch)))
+                db.commit()
+                deleted += len(batch)
+                if pause_seconds:
+                    time.sleep(pause_seconds)
+
+            logger.info(
+                f"Smartwatches {start + len(chunk)}/{len(smartwatch_ids)} revisados, "
+                f"{deleted} duplicados eliminados"
+            )
+    except Exception as e:
+        logger.error(f"Error compactando duplicados: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Compactacion terminada en {time.time() - start_time:.2f} segundos: {deleted} filas eliminadas")
+    return deleted
+
+def create_natural_key_index():
+    """Crea el indice unico de la clave natural si la tabla aun no lo tiene"""
+    existing = {index["name"] for index in inspect(engine).get_indexes(HeartMeasurement.__tablename__)}
+    if NATURAL_KEY_INDEX in existing:
+        logger.info(f"El indice {NATURAL_KEY_INDEX} ya existe")
+        return
+    index = next(i for i in HeartMeasurement.__table__.indexes if i.name == NATURAL_KEY_INDEX)
+    index.create(bind=engine)
+    logger.info(f"Indice {NATURAL_KEY_INDEX} creado")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compacta mediciones cardiacas duplicadas")
+    parser.add_argument("--smartwatch-chunk", type=int, default=200, help="Smartwatches revisados por consulta")
+    parser.add_argument("--delete-batch", type=int, default=1000, help="Filas borradas por transaccion")
+    parser.add_argument("--pause", type=float, default=0.0, help="Segundos de espera entre bloques de borrado")
+    parser.add_argument("--create-index", action="store_true", help="Crear el indice unico al terminar")
+    args = parser.parse_args()
+
+    dedupe_heart_measurements(args.smartwatch_chunk, args.delete_batch, args.pause)
+    if args.create_index:
+        create_natural_key_index()
+
+if __name__ == "__main__":
+    main()
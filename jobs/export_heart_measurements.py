@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Exporta el historial de mediciones cardiacas de un usuario, una cohorte o todos los usuarios
+en CSV o NDJSON, incluidas las mediciones ya movidas al archivo frio (jobs.archive_measurements).
+Lee con cursor del lado del servidor y un archivo mensual a la vez, por lo que la memoria es acotada.
+
+Uso: python -m jobs.export_heart_measurements (--user-id 1 [--user-id 2 ...] | --all)
+         [--format csv|ndjson] [--from 2024-01-01] [--to 2024-02-01] [--output mediciones.csv]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime
+from services.measurement_export import FORMAT_CSV, FORMAT_NDJSON, iter_measurement_export
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def export_heart_measurements(output, export_format: str, user_ids=None, start=None, end=None) -> int:
+    written = 0
+    start_time = time.time()
+    for block in iter_measurement_export(export_format, user_ids, start, end):
+        output.write(block)
+        written += len(block)
+    logger.info(f"Exportacion terminada en {time.time() - start_time:.2f} segundos ({written} bytes)")
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta mediciones cardiacas en CSV o NDJSON")
+    users = parser.add_mutually_exclusive_group(required=True)
+    users.add_argument("--user-id", type=int, action="append", help="Usuario a exportar (repetible)")
+    users.add_argument("--all", action="store_true", help="Exportar todos los usuarios")
+    parser.add_argument("--format", choices=[FORMAT_CSV, FORMAT_NDJSON], default=FORMAT_CSV)
+    parser.add_argument("--from", dest="start", type=datetime.fromisoformat, help="Inicio del rango (inclusivo)")
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, help="Fin del rango (inclusivo)")
+    parser.add_argument("--output", help="Archivo de salida (por defecto la salida estandar)")
+    args = parser.parse_args()
+
+    user_ids = None if args.all else args.user_id
+    if args.output:
+        with open(args.output, "wb") as output:
+            export_heart_measurements(output, args.format, user_ids, args.start, args.end)
+    else:
+        export_heart_measurements(sys.stdout.buffer, args.format, user_ids, args.start, args.end)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Exportacion incremental de mediciones cardiacas y actividad fisica a Parquet.
+
+Cada tabla se escribe en PARQUET_EXPORT_DIR/<tabla>/fecha=YYYY-MM-DD/*.parquet y el avance se guarda
+en PARQUET_EXPORT_DIR/_watermark.json por (Fecha_Registro, ID), de modo que cada corrida solo agrega
+las filas nuevas. Para leer los datos: services.parquet_export.load_parquet_table.
+
+Las filas ya exportadas que despues se actualizan o desactivan no se vuelven a escribir;
+para refrescarlas borre la carpeta de la tabla y su entrada del watermark.
+
+Uso: python -m jobs.export_parquet [--table mediciones_cardiacas] [--output-dir data/parquet] [--safety-lag 300]
+"""
+
+import argparse
+import logging
+import time
+from services.parquet_export import EXPORT_TABLES, export_incremental
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportacion incremental a Parquet particionado por fecha")
+    parser.add_argument("--table", choices=list(EXPORT_TABLES), action="append", help="Tabla a exportar (repetible, por defecto todas)")
+    parser.add_argument("--output-dir", help="Directorio de salida (por defecto PARQUET_EXPORT_DIR)")
+    parser.add_argument("--safety-lag", type=int, help="Segundos recientes que se dejan para la siguiente corrida")
+    parser.add_argument("--block-rows", type=int, help="Filas por bloque escrito")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    watermarks = export_incremental(args.table, args.output_dir, args.safety_lag, args.block_rows)
+    logger.info(f"Exportacion terminada en {time.time() - start_time:.2f} segundos, watermark: {watermarks}")
+
+if __name__ == "__main__":
+    main()
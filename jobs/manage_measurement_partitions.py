@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Particionado mensual de tbb_mediciones_cardiacas por Timestamp_medicion (solo MySQL).
+
+  --convert   Convierte la tabla a PARTITION BY RANGE COLUMNS(Timestamp_medicion), una particion
+              por mes desde la medicion mas antigua mas la particion pmax. MySQL exige que toda llave
+              unica incluya la columna de particion y no admite llaves foraneas en tablas particionadas,
+              por lo que la llave primaria pasa a ser (ID, Timestamp_medicion) y se eliminan las FK
+              (las relaciones del ORM se conservan; el borrado en cascada lo hace el ORM).
+              Reconstruye la tabla completa: ejecutar en ventana de mantenimiento.
+  (default)   Crea por adelantado las particiones de los proximos MEASUREMENT_PARTITION_MONTHS_AHEAD
+              meses dividiendo pmax (vacia, operacion de metadatos) y aplica la retencion:
+              las particiones con mas de MEASUREMENT_RETENTION_MONTHS meses se eliminan con
+              DROP PARTITION, opcionalmente copiandolas antes al archivo frio por usuario/mes (--archive).
+
+Los resumenes por hora/dia no se tocan: el historial agregado se conserva despues de la retencion.
+
+Uso: python -m jobs.manage_measurement_partitions [--convert] [--months-ahead 3] [--retention-months 24] [--archive] [--dry-run]
+"""
+
+import argparse
+import logging
+from datetime import date, datetime
+from sqlalchemy import text
+from config.database import engine
+from config.settings import settings
+from services.measurement_archive import add_months, archive_partition
+from services.measurement_partitions import MAX_PARTITION, TABLE, existing_partitions, partitioned_schema_problems
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+def partition_month(name: str) -> date:
+    return date(int(name[1:5]), int(name[5:7]), 1)
+
+def partition_definition(month: date) -> str:
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1):%Y-%m-%d}')"
+
+def execute(connection, statement: str, dry_run: bool):
+    logger.info(statement)
+    if not dry_run:
+        connection.execute(text(statement))
+
+def convert_to_partitioned(connection, months_ahead: int, dry_run: bool = False):
+    if existing_partitions(connection):
+        logger.info(f"{TABLE} ya esta particionada")
+        return
+
+    foreign_keys = connection.execute(text(
+        "SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS "
+        "WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+    ), {"table": TABLE}).scalars().all()
+    for name in foreign_keys:
+        execute(connection, f"ALTER TABLE {TABLE} DROP FOREIGN KEY `{name}`", dry_run)
+
+    execute(connection, f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (ID, Timestamp_medicion)", dry_run)
+
+    oldest = connection.execute(text(f"SELECT MIN(Timestamp_medicion) FROM {TABLE}")).scalar()
+    current = date.today().replace(day=1)
+    first = date(oldest.year, oldest.month, 1) if oldest else current
+    months = []
+    month = first
+    while month <= add_months(current, months_ahead):
+        months.append(month)
+        month = add_months(month, 1)
+
+    definitions = [partition_definition(month) for month in months]
+    definitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    execute(
+        connection,
+        f"ALTER TABLE {TABLE} PARTITION BY RANGE COLUMNS(Timestamp_medicion) ({', '.join(definitions)})",
+        dry_run
+    )
+    logger.info(f"{TABLE} particionada en {len(months)} meses mas {MAX_PARTITION}")
+
+def ensure_future_partitions(connection, months_ahead: int, dry_run: bool = False) -> list:
+    """Divide pmax para que existan las particiones hasta months_ahead meses adelante"""
+    partitions = existing_partitions(connection)
+    if not partitions:
+        raise RuntimeError(f"{TABLE} no esta particionada, ejecute primero con --convert")
+    # El modelo declara otro esquema (ver HeartMeasurement): no seguir si la tabla se desvio del convertido
+    problems = partitioned_schema_problems(connection)
+    if problems:
+        raise RuntimeError(f"Esquema de {TABLE} particionada distinto al esperado: {'; '.join(problems)}")
+
+    last = partition_month(partitions[-1])
+    target = add_months(date.today().replace(day=1), months_ahead)
+    months = []
+    month = add_months(last, 1)
+    while month <= target:
+        months.append(month)
+        month = add_months(month, 1)
+    if not months:
+        logger.info("Las particiones futuras ya existen")
+        return []
+
+    definitions = [partition_definition(month) for month in months]
+    definitions.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    execute(connection, f"ALTER TABLE {TABLE} REORGANIZE PARTITION {MAX_PARTITION} INTO ({', '.join(definitions)})", dry_run)
+    return [partition_name(month) for month in months]
+
+def apply_retention(connection, retention_months: int, archive: bool, dry_run: bool = False) -> list:
+    """Elimina (y opcionalmente archiva) las particiones completas anteriores a la ventana de retencion"""
+    cutoff = add_months(date.today().replace(day=1), -retention_months)
+    expired = [name for name in existing_partitions(connection) if partition_month(name) < cutoff]
+    for name in expired:
+        if archive and not dry_run:
+            archive_partition(connection, name, partition_month(name))
+        execute(connection, f"ALTER TABLE {TABLE} DROP PARTITION {name}", dry_run)
+    if not expired:
+        logger.info(f"Sin particiones anteriores a {cutoff:%Y-%m}")
+    return expired
+
+def main():
+    parser = argparse.ArgumentParser(description="Particiones mensuales y retencion de mediciones cardiacas (MySQL)")
+    parser.add_argument("--convert", action="store_true", help="Convertir la tabla a particionada")
+    parser.add_argument("--months-ahead", type=int, default=settings.MEASUREMENT_PARTITION_MONTHS_AHEAD, help="Meses futuros con particion creada")
+    parser.add_argument("--retention-months", type=int, default=settings.MEASUREMENT_RETENTION_MONTHS, help="Meses de historial en la tabla (0 = sin retencion)")
+    parser.add_argument("--archive", action="store_true", help="Archivar a Parquet las particiones antes de eliminarlas")
+    parser.add_argument("--dry-run", action="store_true", help="Mostrar las sentencias sin ejecutarlas")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "mysql":
+        logger.error(f"El particionado solo esta soportado en MySQL (dialecto actual: {engine.dialect.name})")
+        return
+
+    started = datetime.now()
+    with engine.connect() as connection:
+        if args.convert:
+            convert_to_partitioned(connection, args.months_ahead, args.dry_run)
+            if args.dry_run:
+                return
+        created = ensure_future_partitions(connection, args.months_ahead, args.dry_run)
+        dropped = apply_retention(connection, args.retention_months, args.archive, args.dry_run) if args.retention_months > 0 else []
+    logger.info(
+        f"Particiones listas en {(datetime.now() - started).total_seconds():.2f} segundos: "
+        f"{len(created)} creadas, {len(dropped)} eliminadas"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Recalcula los resumenes de signos vitales por hora y por dia.
+
+Modos:
+  --since-minutes N   Actualizacion incremental: refresca los periodos de las mediciones
+                      registradas o actualizadas en los ultimos N minutos (por Fecha_Registro /
+                      Fecha_Actualizacion). Pensado para cron cuando VITALS_ROLLUP_SYNC_ENABLED=False,
+                      o para recuperar los periodos que el refresco en segundo plano no alcanzo a
+                      procesar (reinicio). Una edicion que mueve la medicion de smartwatch u hora
+                      refresca el periodo anterior en su propia transaccion, ya que aqui solo se
+                      ven los valores actuales de la fila.
+  --from/--to         Reconstruccion completa de un rango de fechas (backfills), por ventanas de dias
+                      con un commit por ventana.
+  --all               Reconstruccion completa de todo el historial.
+
+Uso: python -m jobs.rebuild_vitals_rollups (--since-minutes 90 | --from 2024-01-01 --to 2024-02-01 | --all) [--window-days 7]
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_, select
+from config.database import SessionLocal
+from crud.vitals_rollup import refresh_vitals_rollups
+from models.heart_measurement import HeartMeasurement
+from models.smartwatch import Smartwatch
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def catch_up_vitals_rollups(since: datetime) -> int:
+    """Refresca los periodos tocados por mediciones nuevas o modificadas desde `since`"""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                HeartMeasurement.Smartwatch_ID,
+                func.min(HeartMeasurement.Timestamp_medicion),
+                func.max(HeartMeasurement.Timestamp_medicion)
+            )
+            .where(or_(HeartMeasurement.Fecha_Registro >= since, HeartMeasurement.Fecha_Actualizacion >= since))
+            .group_by(HeartMeasurement.Smartwatch_ID)
+        ).all()
+        ranges = {row[0]: (row[1], row[2]) for row in rows}
+        refresh_vitals_rollups(db, ranges)
+        db.commit()
+        logger.info(f"Resumenes actualizados para {len(ranges)} smartwatches con cambios desde {since}")
+        return len(ranges)
+    except Exception as e:
+        logger.error(f"Error actualizando resumenes: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def rebuild_vitals_rollups(start: datetime, end: datetime, window_days: int = 7) -> int:
+    """Reconstruye los resumenes de [start, end) por ventanas de window_days dias"""
+    db = SessionLocal()
+    windows = 0
+    start_time = time.time()
+    try:
+        smartwatch_ids = list(db.execute(select(Smartwatch.ID).order_by(Smartwatch.ID)).scalars())
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + timedelta(days=window_days), end)
+            # Fin inclusivo: el ultimo periodo refrescado es el que contiene window_end - 1s
+            last = window_end - timedelta(seconds=1)
+            refresh_vitals_rollups(db, {smartwatch_id: (window_start, last) for smartwatch_id in smartwatch_ids})
+            db.commit()
+            windows += 1
+            logger.info(f"Resumenes reconstruidos de {window_start:%Y-%m-%d} a {window_end:%Y-%m-%d}")
+            window_start = window_end
+    except Exception as e:
+        logger.error(f"Error reconstruyendo resumenes: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Reconstruccion terminada en {time.time() - start_time:.2f} segundos ({windows} ventanas)")
+    return windows
+
+def measurement_time_span():
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(func.min(HeartMeasurement.Timestamp_medicion), func.max(HeartMeasurement.Timestamp_medicion))
+        ).one()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula los resumenes de signos vitales por hora y por dia")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--since-minutes", type=int, help="Actualizacion incremental de los ultimos N minutos")
+    mode.add_argument("--from", dest="start", type=datetime.fromisoformat, help="Inicio de la reconstruccion (YYYY-MM-DD)")
+    mode.add_argument("--all", action="store_true", help="Reconstruir todo el historial")
+    parser.add_argument("--to", dest="end", type=datetime.fromisoformat, help="Fin de la reconstruccion, exclusivo (YYYY-MM-DD)")
+    parser.add_argument("--window-days", type=int, default=7, help="Dias reconstruidos por transaccion")
+    args = parser.parse_args()
+
+    if args.since_minutes is not None:
+        catch_up_vitals_rollups(datetime.now() - timedelta(minutes=args.since_minutes))
+        return
+
+    if args.all:
+        first, last = measurement_time_span()
+        if first is None:
+            logger.info("No hay mediciones para resumir")
+            return
+        start = datetime(first.year, first.month, first.day)
+        end = datetime(last.year, last.month, last.day) + timedelta(days=1)
+    else:
+        start = args.start
+        end = args.end or datetime.now()
+    rebuild_vitals_rollups(start, end, args.window_days)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Actualiza el almacen de caracteristicas de riesgo cardiovascular (tbb_caracteristicas_riesgo).
+
+La primera corrida (o --full) calcula el vector de todos los usuarios con perfil de salud; las
+siguientes solo recalculan a los usuarios con mediciones, actividad, perfil o datos personales
+nuevos o modificados desde la corrida anterior, y a los que perdieron dias al recorrerse la
+ventana. Pensado para cron (por ejemplo cada hora); el entrenamiento
+(extraction_mode='store') y la inferencia de riesgo leen los vectores ya calculados.
+
+Uso: python -m jobs.refresh_risk_features [--days 30] [--full] [--max-age-hours 24]
+"""
+
+import argparse
+import logging
+from config.database import SessionLocal
+from config.settings import settings
+from services.risk_feature_store import refresh_risk_features
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualiza el almacen de caracteristicas de riesgo cardiovascular")
+    parser.add_argument("--days", type=int, default=settings.RISK_FEATURE_DAYS, help="Ventana de historia en dias")
+    parser.add_argument("--full", action="store_true", help="Recalcular a todos los usuarios")
+    parser.add_argument("--max-age-hours", type=int, default=settings.RISK_FEATURE_STORE_MAX_AGE_HOURS,
+                        help="Recalcular tambien los vectores con mas de N horas (edad, 0 = nunca)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = refresh_risk_features(db, args.days, full=args.full, max_age_hours=args.max_age_hours)
+    except Exception as e:
+        logger.error(f"Error actualizando caracteristicas de riesgo: {e}")
+        raise
+    finally:
+        db.close()
+    since = f" desde {stats['since']}" if stats["since"] else ""
+    logger.info(
+        f"Caracteristicas de riesgo ({stats['mode']}{since}, ventana {args.days} dias): "
+        f"{stats['users']} usuarios recalculados, {stats['vectors']} vectores escritos en {stats['seconds']:.2f} s"
+    )
+
+if __name__ == "__main__":
+    main()
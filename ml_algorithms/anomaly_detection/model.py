@@ -0,0 +1,127 @@
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from sklearn.neighbors import LocalOutlierFactor
+from sklearn.preprocessing import StandardScaler
+from typing import List, Optional
+import joblib
+import os
+
+# Same feature order as modeloDeteccionAnomalias.ipynb
+FEATURE_COLUMNS = [
+    'Frecuencia_cardiaca', 'Presion_sistolica', 'Presion_diastolica',
+    'Saturacion_oxigeno', 'Temperatura', 'Nivel_estres', 'Variabilidad_ritmo'
+]
+
+# Rangos normales medicos del notebook (criterio de referencia para evaluar el modelo)
+NORMAL_RANGES = {
+    'Frecuencia_cardiaca': (60, 100),
+    'Presion_sistolica': (90, 140),
+    'Presion_diastolica': (60, 90),
+    'Saturacion_oxigeno': (95, 100),
+    'Temperatura': (36.1, 37.2),
+    'Nivel_estres': (0, 30),
+    'Variabilidad_ritmo': (20, 50)
+}
+
+ALGORITHMS = ('isolation_forest', 'lof')
+
+class AnomalyDetector:
+    """
+    Scaler + IsolationForest (or novelty LOF) fitted on the vitals in FEATURE_COLUMNS.
+    Scores whole batches at once: score_batch takes an (n, 7) array and returns one
+    decision score per row (negative = anomalous). Missing values are filled with the
+    training medians before scaling.
+    """
+
+    def __init__(self, algorithm: str = 'isolation_forest', contamination: float = 0.1, random_state: int = 42):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.contamination = contamination
+        self.random_state = random_state
+        self.feature_names = list(FEATURE_COLUMNS)
+        self.scaler = StandardScaler()
+        self.fill_values: Optional[np.ndarray] = None
+        self.model = None
+
+    def _build_model(self):
+        if self.algorithm == 'lof':
+            return LocalOutlierFactor(contamination=self.contamination, novelty=True)
+        return IsolationForest(contamination=self.contamination, random_state=self.random_state)
+
+    def _fill_missing(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        missing = np.isnan(X)
+        if missing.any():
+            X[missing] = np.take(self.fill_values, np.nonzero(missing)[1])
+        return X
+
+    def fit(self, X: np.ndarray) -> 'AnomalyDetector':
+        """Fit scaler and model on an (n, 7) array of readings"""
+        X = np.asarray(X, dtype=np.float64)
+        self.fill_values = np.nan_to_num(np.nanmedian(X, axis=0))
+        X_scaled = self.scaler.fit_transform(self._fill_missing(X))
+        self.model = self._build_model()
+        self.model.fit(X_scaled)
+        return self
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        """Decision score per row; below 0 the row is an anomaly"""
+        if self.model is None:
+            raise ValueError("Model not trained. Call fit() first.")
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected an array of shape (n, {len(self.feature_names)})")
+        if len(X) == 0:
+            return np.empty(0)
+        return self.model.decision_function(self.scaler.transform(self._fill_missing(X)))
+
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        """Boolean mask of anomalous rows"""
+        return self.score_batch(X) < 0
+
+    @staticmethod
+    def range_violations(X: np.ndarray) -> np.ndarray:
+        """Boolean (n, 7) matrix of values outside NORMAL_RANGES; missing values never violate"""
+        X = np.asarray(X, dtype=np.float64)
+        low = np.array([NORMAL_RANGES[column][0] for column in FEATURE_COLUMNS])
+        high = np.array([NORMAL_RANGES[column][1] for column in FEATURE_COLUMNS])
+        with np.errstate(invalid='ignore'):
+            return (X < low) | (X > high)
+
+    def save(self, filepath: str):
+        """Persist scaler, fill values and model as a single joblib artifact"""
+        if self.model is None:
+            raise ValueError("Model not trained. Call fit() first.")
+        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+        joblib.dump(self, filepath)
+
+    @staticmethod
+    def load(filepath: str) -> 'AnomalyDetector':
+        detector = joblib.load(filepath)
+        if not isinstance(detector, AnomalyDetector):
+            raise ValueError(f"{filepath} is not an AnomalyDetector artifact")
+        return detector
+
+def rows_to_matrix(rows: List[dict]) -> np.ndarray:
+    """(n, 7) float array from dicts with the measurement columns; missing or invalid values become NaN"""
+    try:
+        return np.array(
+            [[row.get(column) for column in FEATURE_COLUMNS] for row in rows], dtype=np.float64
+        ).reshape(len(rows), len(FEATURE_COLUMNS))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    # Slow path: some row is not a dict or has a non-numeric value
+    X = np.full((len(rows), len(FEATURE_COLUMNS)), np.nan)
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            continue
+        for j, column in enumerate(FEATURE_COLUMNS):
+            value = row.get(column)
+            if value is None:
+                continue
+            try:
+                X[i, j] = float(value)
+            except (TypeError, ValueError):
+                pass
+    return X
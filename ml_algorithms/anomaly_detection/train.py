@@ -0,0 +1,90 @@
+import argparse
+import numpy as np
+import pandas as pd
+import sys
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ml_algorithms.anomaly_detection.model import AnomalyDetector, ALGORITHMS, FEATURE_COLUMNS
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CSV = os.path.join(ROOT_DIR, 'notebooks', 'preprocessing', 'data', 'processed', 'mediciones_cardiacas_clean.csv')
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'saved_models', 'anomaly_detector.joblib')
+
+def load_from_csv(path: str) -> np.ndarray:
+    """Readings from the cleaned CSV produced by the preprocessing notebook"""
+    return pd.read_csv(path, usecols=FEATURE_COLUMNS)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+def load_from_db(days: int, max_rows: int) -> np.ndarray:
+    """Active readings of the last `days` days from tbb_mediciones_cardiacas"""
+    from config.database import SessionLocal
+    from models.heart_measurement import HeartMeasurement
+
+    db = SessionLocal()
+    try:
+        rows = db.query(*[getattr(HeartMeasurement, column) for column in FEATURE_COLUMNS]).filter(
+            HeartMeasurement.Estatus == True,
+            HeartMeasurement.Timestamp_medicion >= datetime.now() - timedelta(days=days)
+        ).order_by(HeartMeasurement.Timestamp_medicion.desc()).limit(max_rows).all()
+    finally:
+        db.close()
+    return np.array([[np.nan if value is None else float(value) for value in row] for row in rows], dtype=np.float64)
+
+def train_anomaly_detector(X: np.ndarray, algorithm: str = 'isolation_forest', contamination: float = 0.1,
+                           output: Optional[str] = DEFAULT_OUTPUT) -> dict:
+    """
+    Fit the detector and evaluate it against the medical ranges, as in the notebook.
+
+    Returns:
+        Dictionary with the fitted detector and its metrics
+    """
+    from sklearn.metrics import precision_score, recall_score, f1_score
+
+    if len(X) == 0:
+        raise ValueError("No readings to train on.")
+
+    print(f"Training {algorithm} on {len(X)} readings...")
+    detector = AnomalyDetector(algorithm=algorithm, contamination=contamination).fit(X)
+
+    y_true = AnomalyDetector.range_violations(X).any(axis=1)
+    y_pred = detector.predict_batch(X)
+    metrics = {
+        'samples': len(X),
+        'anomalies': int(y_pred.sum()),
+        'precision': float(precision_score(y_true, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, zero_division=0)),
+        'f1_score': float(f1_score(y_true, y_pred, zero_division=0))
+    }
+
+    if output:
+        print(f"Saving detector to {output}")
+        detector.save(output)
+
+    return {'detector': detector, 'metrics': metrics}
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the heart measurement anomaly detector")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="Cleaned measurements CSV")
+    parser.add_argument("--from-db", action="store_true", help="Train on recent readings from the database instead of the CSV")
+    parser.add_argument("--days", type=int, default=90, help="Days of readings to use with --from-db")
+    parser.add_argument("--max-rows", type=int, default=500000, help="Maximum readings to use with --from-db")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default='isolation_forest')
+    parser.add_argument("--contamination", type=float, default=0.1)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Artifact path (ANOMALY_MODEL_PATH)")
+    args = parser.parse_args()
+
+    X = load_from_db(args.days, args.max_rows) if args.from_db else load_from_csv(args.csv)
+    results = train_anomaly_detector(X, args.algorithm, args.contamination, args.output)
+
+    print("\n" + "="*50)
+    print("TRAINING SUMMARY")
+    print("="*50)
+    for name, value in results['metrics'].items():
+        print(f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}")
+
+if __name__ == "__main__":
+    main()
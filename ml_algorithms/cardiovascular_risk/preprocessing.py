@@ -8,13 +8,30 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 from config.database import SessionLocal
 from models.user import User
 from models.person import Person
 from models.health_profile import HealthProfile
-from models.heart_measurement import HeartMeasurement
 from models.physical_activity import PhysicalActivity
+from models.vitals_rollup import VitalsDailyRollup
+from crud.risk_features import get_feature_rows
+from crud.time_bucket import INTERVALS, floor_datetime
+from crud.vitals_rollup import get_daily_rollups_by_user
+
+# Feature order produced by preprocess_user_data (and by the set-based extraction)
+FEATURE_COLUMNS = [
+    'age', 'gender_male', 'gender_female', 'weight_kg', 'height_cm', 'bmi',
+    'is_smoker', 'is_diabetic', 'is_hypertensive', 'has_cardiac_history',
+    'avg_heart_rate', 'max_heart_rate', 'min_heart_rate', 'heart_rate_variability',
+    'avg_systolic_bp', 'avg_diastolic_bp', 'avg_oxygen_saturation', 'avg_stress_level',
+    'high_heart_rate_episodes', 'low_heart_rate_episodes',
+    'avg_daily_steps', 'avg_distance_km', 'avg_calories_burned', 'avg_active_minutes', 'activity_consistency'
+]
+
+# Above this many user IDs the set-based query reads every user and filters in pandas instead of a huge IN list
+SQL_IN_LIMIT = 1000
 
 class CardiovascularRiskPreprocessor:
     def __init__(self):
@@ -35,9 +52,14 @@ class CardiovascularRiskPreprocessor:
         height_m = height_cm / 100
         return weight_kg / (height_m ** 2)
     
-    def extract_heart_features(self, heart_measurements: List[HeartMeasurement]) -> dict:
-        """Extract aggregated heart measurement features"""
-        if not heart_measurements:
+    def _rollup_mean(self, rollups: List[VitalsDailyRollup], prefix: str) -> float:
+        count = sum(getattr(r, f"{prefix}_conteo") for r in rollups)
+        return sum(getattr(r, f"{prefix}_suma") for r in rollups) / count if count else 0.0
+    
+    def extract_heart_features(self, heart_rollups: List[VitalsDailyRollup]) -> dict:
+        """Extract aggregated heart measurement features from the daily vitals rollups"""
+        heart_rollups = [r for r in heart_rollups if r.FC_conteo]
+        if not heart_rollups:
             return {
                 'avg_heart_rate': 0.0,  # Cambiar None por 0.0
                 'max_heart_rate': 0.0,
@@ -51,23 +73,22 @@ class CardiovascularRiskPreprocessor:
                 'low_heart_rate_episodes': 0
             }
         
-        heart_rates = [m.Frecuencia_cardiaca for m in heart_measurements if m.Frecuencia_cardiaca]
-        systolic_bp = [m.Presion_sistolica for m in heart_measurements if m.Presion_sistolica]
-        diastolic_bp = [m.Presion_diastolica for m in heart_measurements if m.Presion_diastolica]
-        oxygen_sat = [float(m.Saturacion_oxigeno) for m in heart_measurements if m.Saturacion_oxigeno]
-        stress_levels = [m.Nivel_estres for m in heart_measurements if m.Nivel_estres]
+        # Population std from count, sum and sum of squares (same as np.std over the raw readings)
+        hr_count = sum(r.FC_conteo for r in heart_rollups)
+        hr_mean = sum(r.FC_suma for r in heart_rollups) / hr_count
+        hr_variance = sum(r.FC_suma_cuadrados for r in heart_rollups) / hr_count - hr_mean ** 2
         
         return {
-            'avg_heart_rate': np.mean(heart_rates) if heart_rates else 0.0,
-            'max_heart_rate': np.max(heart_rates) if heart_rates else 0.0,
-            'min_heart_rate': np.min(heart_rates) if heart_rates else 0.0,
-            'heart_rate_variability': np.std(heart_rates) if heart_rates else 0.0,
-            'avg_systolic_bp': np.mean(systolic_bp) if systolic_bp else 0.0,
-            'avg_diastolic_bp': np.mean(diastolic_bp) if diastolic_bp else 0.0,
-            'avg_oxygen_saturation': np.mean(oxygen_sat) if oxygen_sat else 0.0,
-            'avg_stress_level': np.mean(stress_levels) if stress_levels else 0.0,
-            'high_heart_rate_episodes': sum(1 for hr in heart_rates if hr > 100),
-            'low_heart_rate_episodes': sum(1 for hr in heart_rates if hr < 60)
+            'avg_heart_rate': hr_mean,
+            'max_heart_rate': float(max(r.FC_max for r in heart_rollups)),
+            'min_heart_rate': float(min(r.FC_min for r in heart_rollups)),
+            'heart_rate_variability': float(np.sqrt(max(hr_variance, 0.0))),
+            'avg_systolic_bp': self._rollup_mean(heart_rollups, 'Sistolica'),
+            'avg_diastolic_bp': self._rollup_mean(heart_rollups, 'Diastolica'),
+            'avg_oxygen_saturation': self._rollup_mean(heart_rollups, 'SpO2'),
+            'avg_stress_level': self._rollup_mean(heart_rollups, 'Estres'),
+            'high_heart_rate_episodes': sum(r.Episodios_taquicardia for r in heart_rollups),
+            'low_heart_rate_episodes': sum(r.Episodios_bradicardia for r in heart_rollups)
         }
     
     def extract_activity_features(self, activities: List[PhysicalActivity]) -> dict:
@@ -142,12 +163,9 @@ class CardiovascularRiskPreprocessor:
             person = user.person
             health_profile = user.health_profile
             
-            # Get recent heart measurements
+            # Get recent heart measurements, already aggregated per day
             cutoff_date = datetime.now() - timedelta(days=days_back)
-            heart_measurements = db.query(HeartMeasurement).filter(
-                HeartMeasurement.Usuario_ID == user_id,
-                HeartMeasurement.Timestamp_medicion >= cutoff_date
-            ).all()
+            heart_rollups = get_daily_rollups_by_user(db, user_id, start=cutoff_date)
             
             # Get recent physical activities
             activities = db.query(PhysicalActivity).filter(
@@ -159,7 +177,7 @@ class CardiovascularRiskPreprocessor:
                 'user': user,
                 'person': person,
                 'health_profile': health_profile,
-                'heart_measurements': heart_measurements,
+                'heart_rollups': heart_rollups,
                 'activities': activities
             }
         finally:
@@ -169,11 +187,11 @@ class CardiovascularRiskPreprocessor:
         """Preprocess single user data"""
         person = user_data['person']
         health_profile = user_data['health_profile']
-        heart_measurements = user_data['heart_measurements']
+        heart_rollups = user_data['heart_rollups']
         activities = user_data['activities']
         
         # Extract features
-        heart_features = self.extract_heart_features(heart_measurements)
+        heart_features = self.extract_heart_features(heart_rollups)
         activity_features = self.extract_activity_features(activities)
         
         # Create feature vector
@@ -207,21 +225,175 @@ class CardiovascularRiskPreprocessor:
         
         return features, risk_label
     
-    def prepare_dataset(self, user_ids: List[int]) -> Tuple[pd.DataFrame, pd.Series]:
-        """Prepare dataset from multiple users"""
-        all_features = []
-        all_labels = []
-        
-        for user_id in user_ids:
-            user_data = self.fetch_user_data(user_id)
-            if user_data and user_data['health_profile']:
-                features, label = self.preprocess_user_data(user_data)
-                all_features.append(features)
-                all_labels.append(label)
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(all_features)
-        labels = pd.Series(all_labels)
+    def fetch_dataset_aggregates(self, user_ids: Optional[List[int]] = None, days_back: int = 30,
+                                 db: Optional[Session] = None) -> pd.DataFrame:
+        """
+        Raw per-user aggregates for every user with a health profile, in a single statement:
+        the daily rollups and the physical activity are aggregated in GROUP BY subqueries and
+        joined to users, persons and health profiles. One row per user, ordered by user ID.
+        """
+        cutoff = datetime.now() - timedelta(days=days_back)
+        rollup = VitalsDailyRollup
+        vitals = select(
+            rollup.Usuario_ID.label('user_id'),
+            func.sum(rollup.FC_conteo).label('hr_count'),
+            func.sum(rollup.FC_suma).label('hr_sum'),
+            func.sum(rollup.FC_suma_cuadrados).label('hr_sum_squares'),
+            func.max(rollup.FC_max).label('max_heart_rate'),
+            func.min(rollup.FC_min).label('min_heart_rate'),
+            *[
+                func.sum(getattr(rollup, f'{prefix}_{column}')).label(f'{prefix}_{column}')
+                for prefix in ('Sistolica', 'Diastolica', 'SpO2', 'Estres') for column in ('conteo', 'suma')
+            ],
+            func.sum(rollup.Episodios_taquicardia).label('high_heart_rate_episodes'),
+            func.sum(rollup.Episodios_bradicardia).label('low_heart_rate_episodes')
+        ).where(
+            rollup.Periodo_inicio >= floor_datetime(cutoff, INTERVALS['1d']),
+            rollup.FC_conteo > 0
+        ).group_by(rollup.Usuario_ID).subquery()
+
+        # Same as the per-user path: averages skip missing and zero values, consistency counts every record
+        activity = PhysicalActivity
+        activities = select(
+            activity.Usuario_ID.label('user_id'),
+            func.avg(case((activity.Pasos != 0, activity.Pasos))).label('avg_daily_steps'),
+            func.avg(case((activity.Distancia_km != 0, activity.Distancia_km))).label('avg_distance_km'),
+            func.avg(case((activity.Calorias_quemadas != 0, activity.Calorias_quemadas))).label('avg_calories_burned'),
+            func.avg(case((activity.Minutos_actividad != 0, activity.Minutos_actividad))).label('avg_active_minutes'),
+            func.count().label('activity_count')
+        ).where(activity.Fecha_Registro >= cutoff).group_by(activity.Usuario_ID).subquery()
+
+        query = select(
+            User.ID.label('user_id'),
+            Person.Fecha_Nacimiento, Person.Genero,
+            HealthProfile.Peso_kg, HealthProfile.Altura_cm, HealthProfile.Fumador,
+            HealthProfile.Diabetico, HealthProfile.Hipertenso, HealthProfile.Historial_cardiaco,
+            *[column for column in vitals.c if column.name != 'user_id'],
+            *[column for column in activities.c if column.name != 'user_id']
+        ).join(Person, Person.ID == User.Persona_Id).join(
+            HealthProfile, HealthProfile.Usuario_ID == User.ID
+        ).outerjoin(vitals, vitals.c.user_id == User.ID).outerjoin(
+            activities, activities.c.user_id == User.ID
+        ).order_by(User.ID)
+        if user_ids is not None and len(user_ids) <= SQL_IN_LIMIT:
+            query = query.where(User.ID.in_(user_ids))
+
+        session = db or SessionLocal()
+        try:
+            result = session.execute(query)
+            frame = pd.DataFrame(result.all(), columns=list(result.keys()))
+        finally:
+            if db is None:
+                session.close()
+        if user_ids is not None and len(user_ids) > SQL_IN_LIMIT:
+            frame = frame[frame['user_id'].isin(user_ids)].reset_index(drop=True)
+        return frame
+
+    def build_features(self, aggregates: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+        """Vectorized preprocess_user_data + create_risk_label over the output of fetch_dataset_aggregates"""
+        def numeric(column: str) -> pd.Series:
+            return pd.to_numeric(aggregates[column], errors='coerce').astype(float)
+
+        def ratio(total: str, count: str) -> pd.Series:
+            counts = numeric(count)
+            return (numeric(total) / counts.where(counts > 0)).fillna(0.0)
+
+        today = datetime.now()
+        birth = pd.to_datetime(aggregates['Fecha_Nacimiento'])
+        birthday_pending = (birth.dt.month > today.month) | ((birth.dt.month == today.month) & (birth.dt.day > today.day))
+        gender = aggregates['Genero'].map(lambda value: getattr(value, 'value', value))
+        weight = numeric('Peso_kg').fillna(0.0)
+        height = numeric('Altura_cm').fillna(0.0)
+        flags = {
+            column: aggregates[column].fillna(False).astype(bool).astype(int)
+            for column in ('Fumador', 'Diabetico', 'Hipertenso', 'Historial_cardiaco')
+        }
+        hr_mean = ratio('hr_sum', 'hr_count')
+        hr_variance = (ratio('hr_sum_squares', 'hr_count') - hr_mean ** 2).clip(lower=0.0)
+
+        features = pd.DataFrame({
+            'age': today.year - birth.dt.year - birthday_pending.astype(int),
+            'gender_male': (gender == 'H').astype(int),
+            'gender_female': (gender == 'M').astype(int),
+            'weight_kg': weight,
+            'height_cm': height,
+            'bmi': (weight / (height / 100) ** 2).where((weight > 0) & (height > 0), 0.0),
+            'is_smoker': flags['Fumador'],
+            'is_diabetic': flags['Diabetico'],
+            'is_hypertensive': flags['Hipertenso'],
+            'has_cardiac_history': flags['Historial_cardiaco'],
+            'avg_heart_rate': hr_mean,
+            'max_heart_rate': numeric('max_heart_rate').fillna(0.0),
+            'min_heart_rate': numeric('min_heart_rate').fillna(0.0),
+            'heart_rate_variability': np.sqrt(hr_variance),
+            'avg_systolic_bp': ratio('Sistolica_suma', 'Sistolica_conteo'),
+            'avg_diastolic_bp': ratio('Diastolica_suma', 'Diastolica_conteo'),
+            'avg_oxygen_saturation': ratio('SpO2_suma', 'SpO2_conteo'),
+            'avg_stress_level': ratio('Estres_suma', 'Estres_conteo'),
+            'high_heart_rate_episodes': numeric('high_heart_rate_episodes').fillna(0).astype(int),
+            'low_heart_rate_episodes': numeric('low_heart_rate_episodes').fillna(0).astype(int),
+            'avg_daily_steps': numeric('avg_daily_steps').fillna(0.0),
+            'avg_distance_km': numeric('avg_distance_km').fillna(0.0),
+            'avg_calories_burned': numeric('avg_calories_burned').fillna(0.0),
+            'avg_active_minutes': numeric('avg_active_minutes').fillna(0.0),
+            'activity_consistency': numeric('activity_count').fillna(0.0) / 30.0
+        })[FEATURE_COLUMNS]
+
+        # Same scoring as create_risk_label
+        risk_score = (
+            2 * features['is_diabetic'] + 2 * features['is_hypertensive'] + features['is_smoker']
+            + 3 * features['has_cardiac_history'] + (features['bmi'] >= 30).astype(int)
+            + 2 * (features['avg_systolic_bp'] >= 140).astype(int)
+            + 2 * (features['avg_diastolic_bp'] >= 90).astype(int)
+            + (features['high_heart_rate_episodes'] > 10).astype(int)
+        )
+        labels = pd.Series(np.select([risk_score >= 6, risk_score >= 3], ['HIGH', 'MEDIUM'], 'LOW'))
+        return features.reset_index(drop=True), labels
+
+    def fetch_store_dataset(self, user_ids: Optional[List[int]] = None, days_back: int = 30,
+                            db: Optional[Session] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """Precomputed vectors and labels from the feature store (jobs.refresh_risk_features)"""
+        session = db or SessionLocal()
+        try:
+            rows = get_feature_rows(session, days_back, FEATURE_COLUMNS + ['Etiqueta_riesgo'],
+                                    user_ids if user_ids is not None and len(user_ids) <= SQL_IN_LIMIT else None)
+        finally:
+            if db is None:
+                session.close()
+        frame = pd.DataFrame(rows, columns=['user_id'] + FEATURE_COLUMNS + ['Etiqueta_riesgo'])
+        if user_ids is not None and len(user_ids) > SQL_IN_LIMIT:
+            frame = frame[frame['user_id'].isin(user_ids)].reset_index(drop=True)
+        return frame[FEATURE_COLUMNS].astype(float), frame['Etiqueta_riesgo'].reset_index(drop=True)
+
+    def prepare_dataset(self, user_ids: Optional[List[int]] = None, mode: str = 'sql',
+                        days_back: int = 30) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Prepare dataset from multiple users (only users with a health profile).
+
+        mode='sql' builds every row from one set-based query (fetch_dataset_aggregates);
+        user_ids=None means all users. mode='store' reads the precomputed vectors of the
+        feature store. mode='per_user' runs fetch_user_data for each user.
+        """
+        if mode == 'sql':
+            df, labels = self.build_features(self.fetch_dataset_aggregates(user_ids, days_back))
+        elif mode == 'store':
+            df, labels = self.fetch_store_dataset(user_ids, days_back)
+        elif mode == 'per_user':
+            all_features = []
+            all_labels = []
+            
+            for user_id in user_ids:
+                user_data = self.fetch_user_data(user_id, days_back)
+                if user_data and user_data['health_profile']:
+                    features, label = self.preprocess_user_data(user_data)
+                    all_features.append(features)
+                    all_labels.append(label)
+            
+            # Convert to DataFrame
+            df = pd.DataFrame(all_features)
+            labels = pd.Series(all_labels)
+        else:
+            raise ValueError(f"Unsupported extraction mode: {mode}")
         
         print(f"DataFrame shape before imputation: {df.shape}")
         print(f"Columns with null values: {df.isnull().sum().sum()}")
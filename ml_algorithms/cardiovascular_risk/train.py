@@ -29,7 +29,8 @@ def train_cardiovascular_risk_model(user_ids: Optional[List[int]] = None,
                                    val_size: float = 0.2,
                                    epochs: int = 100,
                                    batch_size: int = 32,
-                                   save_model: bool = True) -> dict:
+                                   save_model: bool = True,
+                                   extraction_mode: str = 'sql') -> dict:
     """
     Train cardiovascular risk classification model
     
@@ -40,24 +41,26 @@ def train_cardiovascular_risk_model(user_ids: Optional[List[int]] = None,
         epochs: Number of training epochs
         batch_size: Training batch size
         save_model: Whether to save the trained model
+        extraction_mode: 'sql' (one set-based query), 'store' (feature store, refreshed by
+            jobs.refresh_risk_features) or 'per_user' (fetch_user_data per user)
     
     Returns:
         Dictionary containing training results and model performance
     """
     print("Starting cardiovascular risk model training...")
     
-    # Get user IDs
-    if user_ids is None:
+    # Get user IDs (the set-based extraction reads every user by itself)
+    if user_ids is None and extraction_mode == 'per_user':
         user_ids = get_all_user_ids()
     
-    print(f"Training on {len(user_ids)} users")
+    print(f"Training on {len(user_ids) if user_ids is not None else 'all'} users")
     
     # Initialize preprocessor
     preprocessor = CardiovascularRiskPreprocessor()
     
     # Prepare dataset
     print("Preparing dataset...")
-    X, y = preprocessor.prepare_dataset(user_ids)
+    X, y = preprocessor.prepare_dataset(user_ids, mode=extraction_mode)
     
     if len(X) == 0:
         raise ValueError("No valid data found. Check user IDs and database content.")
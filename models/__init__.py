@@ -8,6 +8,8 @@ from .heart_measurement import HeartMeasurement
 from .physical_activity import PhysicalActivity
 from .alert import Alert
 from .user_role import UserRole
+from .vitals_rollup import VitalsHourlyRollup, VitalsDailyRollup
+from .risk_features import RiskFeatureVector
 
 # Exporta todos los modelos para que estén disponibles
 __all__ = [
@@ -19,5 +21,8 @@ __all__ = [
     'HeartMeasurement', 
     'PhysicalActivity', 
     'Alert', 
-    'UserRole'
+    'UserRole',
+    'VitalsHourlyRollup',
+    'VitalsDailyRollup',
+    'RiskFeatureVector'
 ]
\ No newline at end of file
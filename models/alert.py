@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Text, Numeric, Enum, Boolean, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Numeric, Enum, Boolean, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 import enum
@@ -31,10 +31,20 @@ class Alert(Base):
     Valor_umbral = Column(Numeric(10, 2), nullable=True)
     Prioridad = Column(Enum(PriorityEnum), nullable=True, default=PriorityEnum.MEDIA)
     Timestamp_alerta = Column(DateTime, nullable=False, default=func.now())
+    # Disparos agrupados en la alerta (ventana ALERT_COALESCE_WINDOW_MINUTES) y momento del ultimo
+    Conteo_disparos = Column(Integer, nullable=False, default=1, server_default="1")
+    Timestamp_ultimo_disparo = Column(DateTime, nullable=True)
     Estatus = Column(Boolean, nullable=False, default=True)
     Fecha_Registro = Column(DateTime, nullable=False, default=func.now())
     Fecha_Actualizacion = Column(DateTime, nullable=True, onupdate=func.now())
     
+    # Historial y rangos de tiempo por usuario y por smartwatch
+    __table_args__ = (
+        Index('ix_alerta_usuario_timestamp', 'Usuario_ID', 'Timestamp_alerta'),
+        Index('ix_alerta_smartwatch_timestamp', 'Smartwatch_ID', 'Timestamp_alerta'),
+        Index('ix_alerta_ultimo_disparo', 'Timestamp_ultimo_disparo'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="alerts")
     smartwatch = relationship("Smartwatch", back_populates="alerts")
\ No newline at end of file
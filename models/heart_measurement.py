@@ -1,8 +1,19 @@
-from sqlalchemy import Column, Integer, BigInteger, Numeric, DateTime, func, ForeignKey, CheckConstraint, Boolean
+from sqlalchemy import Column, Integer, BigInteger, Numeric, DateTime, func, ForeignKey, CheckConstraint, Boolean, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 
+# Llave primaria de la tabla despues de python -m jobs.manage_measurement_partitions --convert (MySQL)
+PARTITIONED_PRIMARY_KEY = ["ID", "Timestamp_medicion"]
+
 class HeartMeasurement(Base):
+    """
+    Esquema portable (SQLite/PostgreSQL/MySQL sin particiones): llave primaria ID y FK a usuarios y
+    smartwatches. En MySQL particionado la tabla real difiere a proposito: llave primaria
+    PARTITIONED_PRIMARY_KEY y sin FK (requisitos de MySQL); ID sigue siendo unico por AUTO_INCREMENT
+    y el borrado en cascada lo hacen las relaciones del ORM. create_all no particiona: en una base
+    nueva hay que ejecutar --convert, y con MEASUREMENT_PARTITIONING_ENABLED el arranque y el job
+    revisan que el esquema convertido siga siendo el esperado (services.measurement_partitions).
+    """
     __tablename__ = "tbb_mediciones_cardiacas"
     
     ID = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
@@ -23,6 +34,13 @@ class HeartMeasurement(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint('Nivel_estres >= 0 AND Nivel_estres <= 100', name='check_nivel_estres'),
+        # Clave natural: un smartwatch no reporta dos mediciones con el mismo timestamp (reintentos idempotentes)
+        # Tambien resuelve las consultas por rango de tiempo de un smartwatch
+        Index('uq_medicion_smartwatch_timestamp', 'Smartwatch_ID', 'Timestamp_medicion', unique=True),
+        # Historial y rangos de tiempo por usuario
+        Index('ix_medicion_usuario_timestamp', 'Usuario_ID', 'Timestamp_medicion'),
+        # Lecturas incrementales por orden de registro (exportacion Parquet, actualizacion de resumenes)
+        Index('ix_medicion_fecha_registro', 'Fecha_Registro', 'ID'),
     )
     
     # Relationships
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, Numeric, Boolean, DateTime, func, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, Numeric, Boolean, DateTime, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from config.database import Base
 
@@ -17,6 +17,14 @@ class PhysicalActivity(Base):
     Fecha_Registro = Column(DateTime, nullable=False, default=func.now())
     Fecha_Actualizacion = Column(DateTime, nullable=True, onupdate=func.now())
     
+    # Indices para paginar historiales por (Fecha_Registro, ID)
+    __table_args__ = (
+        Index('ix_actividad_usuario_fecha', 'Usuario_ID', 'Fecha_Registro'),
+        Index('ix_actividad_smartwatch_fecha', 'Smartwatch_ID', 'Fecha_Registro'),
+        # Lecturas incrementales por orden de registro (exportacion Parquet)
+        Index('ix_actividad_fecha_registro', 'Fecha_Registro', 'ID'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="physical_activities")
     smartwatch = relationship("Smartwatch", back_populates="physical_activities")
\ No newline at end of file
@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
+from config.database import Base
+
+class RiskFeatureVector(Base):
+    """
+    Almacen de caracteristicas de riesgo cardiovascular: una fila por usuario y ventana (dias de
+    historia). Las columnas de caracteristicas se llaman igual que las que produce
+    CardiovascularRiskPreprocessor.preprocess_user_data, en el mismo orden.
+    La llena jobs.refresh_risk_features; la leen el entrenamiento y la inferencia.
+    """
+    __tablename__ = "tbb_caracteristicas_riesgo"
+
+    Usuario_ID = Column(Integer, ForeignKey("tbb_usuarios.ID", ondelete="CASCADE"), primary_key=True)
+    Ventana_dias = Column(Integer, primary_key=True)
+
+    age = Column(Float, nullable=False)
+    gender_male = Column(Float, nullable=False)
+    gender_female = Column(Float, nullable=False)
+    weight_kg = Column(Float, nullable=False)
+    height_cm = Column(Float, nullable=False)
+    bmi = Column(Float, nullable=False)
+    is_smoker = Column(Float, nullable=False)
+    is_diabetic = Column(Float, nullable=False)
+    is_hypertensive = Column(Float, nullable=False)
+    has_cardiac_history = Column(Float, nullable=False)
+
+    avg_heart_rate = Column(Float, nullable=False)
+    max_heart_rate = Column(Float, nullable=False)
+    min_heart_rate = Column(Float, nullable=False)
+    heart_rate_variability = Column(Float, nullable=False)
+    avg_systolic_bp = Column(Float, nullable=False)
+    avg_diastolic_bp = Column(Float, nullable=False)
+    avg_oxygen_saturation = Column(Float, nullable=False)
+    avg_stress_level = Column(Float, nullable=False)
+    high_heart_rate_episodes = Column(Float, nullable=False)
+    low_heart_rate_episodes = Column(Float, nullable=False)
+
+    avg_daily_steps = Column(Float, nullable=False)
+    avg_distance_km = Column(Float, nullable=False)
+    avg_calories_burned = Column(Float, nullable=False)
+    avg_active_minutes = Column(Float, nullable=False)
+    activity_consistency = Column(Float, nullable=False)
+
+    # Etiqueta de create_risk_label (HIGH/MEDIUM/LOW), usada como objetivo de entrenamiento
+    Etiqueta_riesgo = Column(String(10), nullable=False)
+    # Inicio de la corrida que calculo la fila; la siguiente corrida incremental parte de aqui
+    Fecha_calculo = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_caracteristicas_ventana_calculo', 'Ventana_dias', 'Fecha_calculo'),
+    )
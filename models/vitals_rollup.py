@@ -0,0 +1,98 @@
+from sqlalchemy import Column, Integer, Float, Numeric, DateTime, func, ForeignKey, Index
+from sqlalchemy.orm import declared_attr
+from config.database import Base
+
+# Signos vitales resumidos: prefijo de columnas en el resumen -> columna en tbb_mediciones_cardiacas
+ROLLUP_VITALS = {
+    "FC": "Frecuencia_cardiaca",
+    "Sistolica": "Presion_sistolica",
+    "Diastolica": "Presion_diastolica",
+    "SpO2": "Saturacion_oxigeno",
+    "Temperatura": "Temperatura",
+    "Estres": "Nivel_estres",
+    "VFC": "Variabilidad_ritmo"
+}
+
+class VitalsRollupMixin:
+    """
+    Columnas comunes de los resumenes por periodo.
+    Por cada signo vital se guarda conteo, suma, suma de cuadrados, minimo y maximo,
+    suficiente para obtener promedio y desviacion estandar de cualquier rango de periodos.
+    """
+
+    @declared_attr
+    def Usuario_ID(cls):
+        return Column(Integer, ForeignKey("tbb_usuarios.ID", ondelete="CASCADE"), primary_key=True)
+
+    @declared_attr
+    def Smartwatch_ID(cls):
+        return Column(Integer, ForeignKey("tbb_smartwatches.ID", ondelete="CASCADE"), primary_key=True)
+
+    Periodo_inicio = Column(DateTime, primary_key=True)
+    Conteo = Column(Integer, nullable=False)
+
+    FC_conteo = Column(Integer, nullable=False)
+    FC_suma = Column(Float, nullable=False)
+    FC_suma_cuadrados = Column(Float, nullable=False)
+    FC_min = Column(Integer, nullable=True)
+    FC_max = Column(Integer, nullable=True)
+
+    Sistolica_conteo = Column(Integer, nullable=False)
+    Sistolica_suma = Column(Float, nullable=False)
+    Sistolica_suma_cuadrados = Column(Float, nullable=False)
+    Sistolica_min = Column(Integer, nullable=True)
+    Sistolica_max = Column(Integer, nullable=True)
+
+    Diastolica_conteo = Column(Integer, nullable=False)
+    Diastolica_suma = Column(Float, nullable=False)
+    Diastolica_suma_cuadrados = Column(Float, nullable=False)
+    Diastolica_min = Column(Integer, nullable=True)
+    Diastolica_max = Column(Integer, nullable=True)
+
+    SpO2_conteo = Column(Integer, nullable=False)
+    SpO2_suma = Column(Float, nullable=False)
+    SpO2_suma_cuadrados = Column(Float, nullable=False)
+    SpO2_min = Column(Numeric(4, 1), nullable=True)
+    SpO2_max = Column(Numeric(4, 1), nullable=True)
+
+    Temperatura_conteo = Column(Integer, nullable=False)
+    Temperatura_suma = Column(Float, nullable=False)
+    Temperatura_suma_cuadrados = Column(Float, nullable=False)
+    Temperatura_min = Column(Numeric(3, 1), nullable=True)
+    Temperatura_max = Column(Numeric(3, 1), nullable=True)
+
+    Estres_conteo = Column(Integer, nullable=False)
+    Estres_suma = Column(Float, nullable=False)
+    Estres_suma_cuadrados = Column(Float, nullable=False)
+    Estres_min = Column(Integer, nullable=True)
+    Estres_max = Column(Integer, nullable=True)
+
+    VFC_conteo = Column(Integer, nullable=False)
+    VFC_suma = Column(Float, nullable=False)
+    VFC_suma_cuadrados = Column(Float, nullable=False)
+    VFC_min = Column(Numeric(5, 2), nullable=True)
+    VFC_max = Column(Numeric(5, 2), nullable=True)
+
+    # Episodios de frecuencia cardiaca alta (> 100) y baja (< 60), usados por el modelo de riesgo
+    Episodios_taquicardia = Column(Integer, nullable=False)
+    Episodios_bradicardia = Column(Integer, nullable=False)
+
+    Fecha_Actualizacion = Column(DateTime, nullable=False, default=func.now())
+
+class VitalsHourlyRollup(VitalsRollupMixin, Base):
+    __tablename__ = "tbb_resumen_vitales_hora"
+
+    __table_args__ = (
+        Index('ix_resumen_hora_smartwatch_periodo', 'Smartwatch_ID', 'Periodo_inicio'),
+        Index('ix_resumen_hora_usuario_periodo', 'Usuario_ID', 'Periodo_inicio'),
+    )
+
+class VitalsDailyRollup(VitalsRollupMixin, Base):
+    __tablename__ = "tbb_resumen_vitales_dia"
+
+    __table_args__ = (
+        Index('ix_resumen_dia_smartwatch_periodo', 'Smartwatch_ID', 'Periodo_inicio'),
+        Index('ix_resumen_dia_usuario_periodo', 'Usuario_ID', 'Periodo_inicio'),
+        # Cambios desde la ultima corrida de jobs.refresh_risk_features
+        Index('ix_resumen_dia_actualizacion', 'Fecha_Actualizacion'),
+    )
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
+from dependencies.time_range import TimeRange, get_time_range
 from crud import alert as crud_alert
 from schemas.alert import AlertCreate, AlertUpdate, AlertResponse
-from typing import List
+from schemas.pagination import Page
+from services.serialization import page_response
+from typing import Optional
 
 router = APIRouter(
     prefix="/alerts",
@@ -15,10 +19,11 @@ router = APIRouter(
 def create_alert(alert: AlertCreate, db: Session = Depends(get_db)):
     return crud_alert.create_alert(db=db, alert_data=alert.dict())
 
-@router.get("/", response_model=List[AlertResponse])
-def read_alerts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    alerts = crud_alert.get_alerts(db, skip=skip, limit=limit)
-    return alerts
+@router.get("/", response_model=Page[AlertResponse])
+def read_alerts(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    """Alertas de la mas reciente a la mas antigua (mayor ID primero), como todos los historiales"""
+    alerts = crud_alert.get_alerts(db, cursor=cursor, limit=limit)
+    return page_response(alerts, AlertResponse)
 
 @router.get("/{alert_id}", response_model=AlertResponse)
 def read_alert(alert_id: int, db: Session = Depends(get_db)):
@@ -27,20 +32,20 @@ def read_alert(alert_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Alerta no encontrada")
     return db_alert
 
-@router.get("/user/{user_id}", response_model=List[AlertResponse])
-def read_alerts_by_user(user_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    alerts = crud_alert.get_alerts_by_user(db, user_id=user_id, skip=skip, limit=limit)
-    return alerts
+@router.get("/user/{user_id}", response_model=Page[AlertResponse])
+def read_alerts_by_user(user_id: int, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), time_range: TimeRange = Depends(get_time_range), db: Session = Depends(get_db)):
+    alerts = crud_alert.get_alerts_by_user(db, user_id=user_id, cursor=cursor, limit=limit, start=time_range.start, end=time_range.end)
+    return page_response(alerts, AlertResponse)
 
-@router.get("/smartwatch/{smartwatch_id}", response_model=List[AlertResponse])
-def read_alerts_by_smartwatch(smartwatch_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    alerts = crud_alert.get_alerts_by_smartwatch(db, smartwatch_id=smartwatch_id, skip=skip, limit=limit)
-    return alerts
+@router.get("/smartwatch/{smartwatch_id}", response_model=Page[AlertResponse])
+def read_alerts_by_smartwatch(smartwatch_id: int, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), time_range: TimeRange = Depends(get_time_range), db: Session = Depends(get_db)):
+    alerts = crud_alert.get_alerts_by_smartwatch(db, smartwatch_id=smartwatch_id, cursor=cursor, limit=limit, start=time_range.start, end=time_range.end)
+    return page_response(alerts, AlertResponse)
 
-@router.get("/priority/{priority}", response_model=List[AlertResponse])
-def read_alerts_by_priority(priority: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    alerts = crud_alert.get_alerts_by_priority(db, priority=priority, skip=skip, limit=limit)
-    return alerts
+@router.get("/priority/{priority}", response_model=Page[AlertResponse])
+def read_alerts_by_priority(priority: str, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    alerts = crud_alert.get_alerts_by_priority(db, priority=priority, cursor=cursor, limit=limit)
+    return page_response(alerts, AlertResponse)
 
 @router.put("/{alert_id}", response_model=AlertResponse)
 def update_alert(alert_id: int, alert: AlertUpdate, db: Session = Depends(get_db)):
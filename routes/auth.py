@@ -1,12 +1,17 @@
 # routes/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
+from typing import Optional
 from config.database import get_db
+from config.settings import settings
 from schemas.auth import (
     UserRegister, EmailVerification, UserLogin, 
     RegistrationResponse, VerificationResponse, Token
 )
+from schemas.pagination import Page
+from schemas.user import UserResponse
+from services.serialization import page_response
 from email_service import send_verification_email, generate_verification_code
 from token_verification import (
     store_pending_registration, verify_code_only, 
@@ -232,17 +237,17 @@ async def logout(current_user = Depends(get_current_active_user)):
     return {"message": "Sesión cerrada exitosamente"}
 
 # Endpoints administrativos
-@router.get("/users", dependencies=[Depends(require_admin())])
+@router.get("/users", response_model=Page[UserResponse], dependencies=[Depends(require_admin())])
 async def get_all_users(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT),
     db: Session = Depends(get_db)
 ):
     """
-    Obtiene todos los usuarios (solo ADMIN)
+    Obtiene todos los usuarios (solo ADMIN), paginados por cursor de menor a mayor ID
     """
-    users = user_crud.get_users(db, skip=skip, limit=limit)
-    return users
+    users = user_crud.get_users(db, cursor=cursor, limit=limit)
+    return page_response(users, UserResponse)
 
 @router.put("/users/{user_id}/deactivate", dependencies=[Depends(require_admin())])
 async def deactivate_user(
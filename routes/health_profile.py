@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
 from crud import health_profile as crud_health_profile
 from schemas.health_profile import HealthProfileCreate, HealthProfileUpdate, HealthProfileResponse
-from typing import List
+from schemas.pagination import Page
+from services.serialization import page_response
+from typing import Optional
 
 router = APIRouter(
     prefix="/health-profiles",
@@ -21,10 +24,11 @@ def create_health_profile(profile: HealthProfileCreate, db: Session = Depends(ge
         )
     return crud_health_profile.create_health_profile(db=db, profile_data=profile.dict())
 
-@router.get("/", response_model=List[HealthProfileResponse])
-def read_health_profiles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    profiles = crud_health_profile.get_health_profiles(db, skip=skip, limit=limit)
-    return profiles
+@router.get("/", response_model=Page[HealthProfileResponse])
+def read_health_profiles(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    """Perfiles de salud de menor a mayor ID (orden de alta), como todos los catalogos"""
+    profiles = crud_health_profile.get_health_profiles(db, cursor=cursor, limit=limit)
+    return page_response(profiles, HealthProfileResponse)
 
 @router.get("/{profile_id}", response_model=HealthProfileResponse)
 def read_health_profile(profile_id: int, db: Session = Depends(get_db)):
@@ -1,9 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
+from dependencies.time_range import TimeRange, get_time_range
 from crud import heart_measurement as crud_heart_measurement
-from schemas.heart_measurement import HeartMeasurementCreate, HeartMeasurementUpdate, HeartMeasurementResponse
-from typing import List
+from crud import vitals_rollup as crud_vitals_rollup
+from services import heart_measurement_ingestion, measurement_export
+from services.anomaly_detection import anomaly_scoring, AnomalyModelUnavailableError
+from services.ingestion_buffer import write_buffer, BufferFullError, DURABILITY_COMMIT
+from schemas.heart_measurement import (
+    HeartMeasurementCreate,
+    HeartMeasurementUpdate,
+    HeartMeasurementResponse,
+    HeartMeasurementBatchResponse,
+    HeartMeasurementColumnarPage,
+    HeartMeasurementSeriesResponse,
+    HeartMeasurementQueuedResponse,
+    HeartMeasurementAnomalyResponse
+)
+from schemas.pagination import Page
+from services.serialization import json_response, page_response
+from datetime import datetime, timedelta
+from typing import Any, List, Literal, Optional, Union
 
 router = APIRouter(
     prefix="/heart-measurements",
@@ -11,14 +30,118 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@router.post("/", response_model=HeartMeasurementResponse, status_code=status.HTTP_201_CREATED)
+# Tiempo maximo que una peticion espera a que su grupo se confirme en modo "commit"
+BUFFER_COMMIT_TIMEOUT_SECONDS = 10
+
+@router.post(
+    "/",
+    response_model=HeartMeasurementResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": HeartMeasurementQueuedResponse}}
+)
 def create_heart_measurement(measurement: HeartMeasurementCreate, db: Session = Depends(get_db)):
-    return crud_heart_measurement.create_heart_measurement(db=db, measurement_data=measurement.dict())
+    """
+    Guarda una medicion (201 con la medicion guardada). Con el buffer de escritura en modo
+    "commit" se espera el commit del grupo y tambien se regresa 201 con la medicion; en modo
+    "enqueue" se responde 202 en cuanto la medicion queda encolada.
+    Con o sin buffer se aplica la validacion del lote (validate_measurements, por ejemplo que el
+    smartwatch pertenezca al usuario): 400 si se rechaza; en modo "enqueue" el rechazo solo se registra.
+    """
+    if not write_buffer.is_running:
+        error = heart_measurement_ingestion.validate_measurement(db, measurement.dict())
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+        return crud_heart_measurement.create_heart_measurement(db=db, measurement_data=measurement.dict())
+
+    try:
+        pending = write_buffer.submit(measurement.dict(), timeout=1)
+    except BufferFullError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="El buffer de mediciones esta lleno")
+
+    if write_buffer.durability == DURABILITY_COMMIT:
+        if not pending.wait(BUFFER_COMMIT_TIMEOUT_SECONDS):
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Tiempo de espera agotado guardando la medicion")
+        if pending.error:
+            raise HTTPException(status_code=400, detail=pending.error)
+        return crud_heart_measurement.get_heart_measurement_by_natural_key(
+            db, measurement.Smartwatch_ID, measurement.Timestamp_medicion
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"status": "queued", "durability": write_buffer.durability}
+    )
 
-@router.get("/", response_model=List[HeartMeasurementResponse])
-def read_heart_measurements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    measurements = crud_heart_measurement.get_heart_measurements(db, skip=skip, limit=limit)
-    return measurements
+@router.post("/batch", response_model=HeartMeasurementBatchResponse)
+def create_heart_measurements_batch(
+    measurements: List[Any] = Body(...),
+    chunk_size: Optional[int] = Query(None, ge=1, le=settings.HEART_MEASUREMENT_BATCH_MAX_ITEMS),
+    on_conflict: Literal["ignore", "update"] = Query(crud_heart_measurement.ON_CONFLICT_IGNORE),
+    db: Session = Depends(get_db)
+):
+    if not measurements:
+        raise HTTPException(status_code=400, detail="El lote de mediciones esta vacio")
+    if len(measurements) > settings.HEART_MEASUREMENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote excede el maximo de {settings.HEART_MEASUREMENT_BATCH_MAX_ITEMS} mediciones"
+        )
+    return heart_measurement_ingestion.ingest_measurements(db, measurements, chunk_size=chunk_size, on_conflict=on_conflict)
+
+@router.post("/anomalies", response_model=HeartMeasurementAnomalyResponse)
+def score_heart_measurement_anomalies(measurements: List[Any] = Body(...)):
+    """
+    Evalua un lote con el modelo de deteccion de anomalias sin guardarlo.
+    scores tiene un valor por medicion (negativo = anomala); anomalies detalla las anomalas
+    con los signos fuera de los rangos medicos normales. Las mediciones invalidas se reportan
+    en rejected (indice y error) con score null.
+    """
+    if not measurements:
+        raise HTTPException(status_code=400, detail="El lote de mediciones esta vacio")
+    if len(measurements) > settings.HEART_MEASUREMENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote excede el maximo de {settings.HEART_MEASUREMENT_BATCH_MAX_ITEMS} mediciones"
+        )
+    try:
+        return json_response(anomaly_scoring.score_measurements(measurements))
+    except AnomalyModelUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+# ?format=columnar regresa {columns: {campo: [valores]}, count, next_cursor, limit} sin un objeto por fila
+ListFormat = Literal["rows", "columnar"]
+ListResponse = Union[Page[HeartMeasurementResponse], HeartMeasurementColumnarPage]
+
+def _list_response(page: dict, format: str):
+    return json_response(page) if format == "columnar" else page_response(page, HeartMeasurementResponse)
+
+@router.get("/", response_model=ListResponse)
+def read_heart_measurements(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), format: ListFormat = "rows", db: Session = Depends(get_db)):
+    """Mediciones de la mas reciente a la mas antigua (mayor ID primero), como todos los historiales"""
+    measurements = crud_heart_measurement.get_heart_measurements(db, cursor=cursor, limit=limit, columnar=format == "columnar")
+    return _list_response(measurements, format)
+
+@router.get("/export", response_class=StreamingResponse)
+def export_heart_measurements(
+    user_id: List[int] = Query(..., description="Usuario(s) a exportar, repetir el parametro para una cohorte"),
+    format: Literal["csv", "ndjson"] = Query(measurement_export.FORMAT_CSV),
+    time_range: TimeRange = Depends(get_time_range)
+):
+    """
+    Exporta el historial de mediciones de un usuario o cohorte en CSV o NDJSON.
+    La respuesta se envia conforme se lee la base de datos, sin cargar el historial en memoria.
+    """
+    if len(user_id) > settings.HEART_MEASUREMENT_EXPORT_MAX_USERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"La cohorte excede el maximo de {settings.HEART_MEASUREMENT_EXPORT_MAX_USERS} usuarios"
+        )
+    filename = f"mediciones_cardiacas.{format}"
+    return StreamingResponse(
+        measurement_export.iter_measurement_export(format, user_id, time_range.start, time_range.end),
+        media_type=measurement_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 @router.get("/{measurement_id}", response_model=HeartMeasurementResponse)
 def read_heart_measurement(measurement_id: int, db: Session = Depends(get_db)):
@@ -27,21 +150,52 @@ def read_heart_measurement(measurement_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Medicion cardiaca no encontrada")
     return db_measurement
 
-@router.get("/user/{user_id}", response_model=List[HeartMeasurementResponse])
-def read_heart_measurements_by_user(user_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    measurements = crud_heart_measurement.get_heart_measurements_by_user(db, user_id=user_id, skip=skip, limit=limit)
-    return measurements
+@router.get("/user/{user_id}", response_model=ListResponse)
+def read_heart_measurements_by_user(user_id: int, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), format: ListFormat = "rows", time_range: TimeRange = Depends(get_time_range), db: Session = Depends(get_db)):
+    measurements = crud_heart_measurement.get_heart_measurements_by_user(db, user_id=user_id, cursor=cursor, limit=limit, start=time_range.start, end=time_range.end, columnar=format == "columnar")
+    return _list_response(measurements, format)
+
+@router.get("/user/{user_id}/series", response_model=HeartMeasurementSeriesResponse)
+def read_heart_measurement_series(
+    user_id: int,
+    interval: Literal["5m", "1h", "1d"] = Query("1h"),
+    time_range: TimeRange = Depends(get_time_range),
+    db: Session = Depends(get_db)
+):
+    """
+    Serie agregada para graficas: min/promedio/max de frecuencia cardiaca y promedios
+    de presion, SpO2 y estres por intervalo. Sin rango se usan los ultimos dias configurados.
+    Los intervalos 1h y 1d se leen de los resumenes por hora/dia.
+    """
+    end = time_range.end or datetime.now()
+    start = time_range.start or end - timedelta(days=settings.HEART_MEASUREMENT_SERIES_DEFAULT_DAYS)
+    if start > end:
+        raise HTTPException(status_code=400, detail="El inicio del rango (from) debe ser anterior al fin (to)")
+    buckets = (end - start).total_seconds() / crud_heart_measurement.INTERVALS[interval]
+    if buckets > settings.HEART_MEASUREMENT_SERIES_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El rango solicitado excede el maximo de {settings.HEART_MEASUREMENT_SERIES_MAX_POINTS} puntos, use un intervalo mayor"
+        )
+    if interval in crud_vitals_rollup.ROLLUP_TABLES:
+        points = crud_vitals_rollup.get_vitals_series(db, user_id=user_id, interval=interval, start=start, end=end)
+    else:
+        points = crud_heart_measurement.get_heart_measurement_series(db, user_id=user_id, interval=interval, start=start, end=end)
+    return {"user_id": user_id, "interval": interval, "start": start, "end": end, "points": points}
 
-@router.get("/smartwatch/{smartwatch_id}", response_model=List[HeartMeasurementResponse])
-def read_heart_measurements_by_smartwatch(smartwatch_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    measurements = crud_heart_measurement.get_heart_measurements_by_smartwatch(db, smartwatch_id=smartwatch_id, skip=skip, limit=limit)
-    return measurements
+@router.get("/smartwatch/{smartwatch_id}", response_model=ListResponse)
+def read_heart_measurements_by_smartwatch(smartwatch_id: int, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), format: ListFormat = "rows", time_range: TimeRange = Depends(get_time_range), db: Session = Depends(get_db)):
+    measurements = crud_heart_measurement.get_heart_measurements_by_smartwatch(db, smartwatch_id=smartwatch_id, cursor=cursor, limit=limit, start=time_range.start, end=time_range.end, columnar=format == "columnar")
+    return _list_response(measurements, format)
 
 @router.put("/{measurement_id}", response_model=HeartMeasurementResponse)
 def update_heart_measurement(measurement_id: int, measurement: HeartMeasurementUpdate, db: Session = Depends(get_db)):
     db_measurement = crud_heart_measurement.get_heart_measurement(db, measurement_id=measurement_id)
     if db_measurement is None:
         raise HTTPException(status_code=404, detail="Medicion cardiaca no encontrada")
+    cutoff = heart_measurement_ingestion.archived_before()
+    if cutoff is not None and measurement.Timestamp_medicion is not None and measurement.Timestamp_medicion < cutoff:
+        raise HTTPException(status_code=400, detail=heart_measurement_ingestion.ARCHIVED_PERIOD_ERROR)
     return crud_heart_measurement.update_heart_measurement(db=db, measurement_id=measurement_id, measurement_data=measurement.dict(exclude_unset=True))
 
 @router.delete("/{measurement_id}", response_model=HeartMeasurementResponse)
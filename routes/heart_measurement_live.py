@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from config.database import get_db
+from crud import user as crud_user
+from services.live_vitals import iter_live_vitals, live_vitals_broker
+
+router = APIRouter(
+    prefix="/heart-measurements",
+    tags=["heart-measurements"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/user/{user_id}/live", response_class=StreamingResponse)
+def stream_live_vitals(user_id: int, db: Session = Depends(get_db)):
+    """
+    Server-Sent Events con las mediciones del usuario conforme se ingresan, en lugar de
+    consultar el historial cada pocos segundos. Solo se consulta la base de datos al conectar.
+    """
+    if crud_user.get_user(db, user_id=user_id) is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    if live_vitals_broker.is_full():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Se alcanzo el maximo de conexiones en vivo")
+    return StreamingResponse(
+        iter_live_vitals(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
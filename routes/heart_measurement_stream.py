@@ -0,0 +1,147 @@
+import json
+import logging
+import zlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from config.database import get_db
+from config.settings import settings
+from crud.heart_measurement import ON_CONFLICT_IGNORE
+from services import heart_measurement_ingestion
+from schemas.heart_measurement import HeartMeasurementStreamResponse
+from typing import Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/heart-measurements",
+    tags=["heart-measurements"],
+    responses={404: {"description": "Not found"}},
+)
+
+# Limite de bytes descomprimidos por llamada, evita que un bloque gzip pequeno se expanda sin control en memoria
+DECOMPRESS_STEP_BYTES = 1024 * 1024
+
+def _decompress(decoder, data: bytes):
+    while data:
+        piece = decoder.decompress(data, DECOMPRESS_STEP_BYTES)
+        if piece:
+            yield piece
+        data = decoder.unconsumed_tail
+
+async def _iter_ndjson_lines(request: Request, compressed: bool, report: dict):
+    """
+    Lee el cuerpo de la peticion de forma incremental y produce (numero_linea, bytes).
+    Las lineas que exceden el limite se producen como (numero_linea, None) y se descartan.
+    """
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+    max_line_bytes = settings.HEART_MEASUREMENT_STREAM_MAX_LINE_BYTES
+    pending = b""
+    skipping = False
+    line_number = 0
+
+    async def split(data: bytes):
+        """Un solo split por pieza; solo la ultima linea incompleta pasa a la siguiente pieza"""
+        nonlocal pending, skipping, line_number
+        *lines, pending = (pending + data).split(b"\n")
+        for line in lines:
+            line_number += 1
+            if skipping or len(line) > max_line_bytes:
+                skipping = False
+                yield line_number, None
+            else:
+                yield line_number, line
+        if len(pending) > max_line_bytes:
+            pending = b""
+            skipping = True
+
+    try:
+        async for chunk in request.stream():
+            report["bytes_received"] += len(chunk)
+            pieces = _decompress(decoder, chunk) if decoder is not None else (chunk,)
+            for piece in pieces:
+                async for item in split(piece):
+                    yield item
+        if decoder is not None:
+            async for item in split(decoder.flush()):
+                yield item
+    except zlib.error:
+        raise HTTPException(status_code=400, detail="El contenido gzip no es valido")
+
+    if skipping or pending.strip():
+        line_number += 1
+        yield line_number, None if skipping else pending
+
+@router.post("/stream", response_model=HeartMeasurementStreamResponse)
+async def stream_heart_measurements(
+    request: Request,
+    chunk_size: Optional[int] = Query(None, ge=1, le=settings.HEART_MEASUREMENT_BATCH_MAX_ITEMS),
+    on_conflict: Literal["ignore", "update"] = Query(ON_CONFLICT_IGNORE),
+    db: Session = Depends(get_db)
+):
+    """
+    Ingesta de mediciones en formato NDJSON (una medicion por linea), opcionalmente con
+    Content-Encoding: gzip. Las mediciones se validan conforme llegan y se guardan en bloques
+    de chunk_size, por lo que la memoria usada no depende del tamano de la carga.
+    """
+    chunk_size = chunk_size or settings.HEART_MEASUREMENT_BATCH_CHUNK_SIZE
+    compressed = "gzip" in request.headers.get("content-encoding", "").lower()
+    report = {
+        "lines_read": 0,
+        "accepted": 0,
+        "rejected": 0,
+        "duplicates": 0,
+        "chunks_flushed": 0,
+        "bytes_received": 0,
+        "errors": [],
+        "errors_truncated": False
+    }
+    pending = []
+    pending_lines = []
+
+    def add_error(line: int, error: str):
+        report["rejected"] += 1
+        if len(report["errors"]) < settings.HEART_MEASUREMENT_STREAM_MAX_ERRORS:
+            report["errors"].append({"line": line, "error": error})
+        else:
+            report["errors_truncated"] = True
+
+    async def flush():
+        summary = await run_in_threadpool(
+            heart_measurement_ingestion.ingest_measurements, db, pending, chunk_size, on_conflict
+        )
+        report["accepted"] += summary["accepted"]
+        report["duplicates"] += summary["duplicates"]
+        report["chunks_flushed"] += 1
+        for result in summary["results"]:
+            if not result["accepted"]:
+                add_error(pending_lines[result["index"]], result["error"])
+        logger.info(
+            f"Stream de mediciones: {report['lines_read']} lineas, "
+            f"{report['accepted']} aceptadas, {report['rejected']} rechazadas"
+        )
+        pending.clear()
+        pending_lines.clear()
+
+    async for line_number, line in _iter_ndjson_lines(request, compressed, report):
+        if line is None:
+            report["lines_read"] += 1
+            add_error(line_number, f"La linea excede el maximo de {settings.HEART_MEASUREMENT_STREAM_MAX_LINE_BYTES} bytes")
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        report["lines_read"] += 1
+        try:
+            pending.append(json.loads(line))
+        except ValueError as e:
+            add_error(line_number, f"JSON invalido: {e}")
+            continue
+        pending_lines.append(line_number)
+        if len(pending) >= chunk_size:
+            await flush()
+
+    if pending:
+        await flush()
+
+    return report
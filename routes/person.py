@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
 from crud import person as crud_person
 from schemas.person import PersonCreate, PersonUpdate, PersonResponse
-from typing import List
+from schemas.pagination import Page
+from services.serialization import page_response
+from typing import Optional
 
 router = APIRouter(
     prefix="/persons",
@@ -15,10 +18,11 @@ router = APIRouter(
 def create_person(person: PersonCreate, db: Session = Depends(get_db)):
     return crud_person.create_person(db=db, person_data=person.dict())
 
-@router.get("/", response_model=List[PersonResponse])
-def read_persons(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    persons = crud_person.get_persons(db, skip=skip, limit=limit)
-    return persons
+@router.get("/", response_model=Page[PersonResponse])
+def read_persons(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    """Personas de menor a mayor ID (orden de alta), como todos los catalogos"""
+    persons = crud_person.get_persons(db, cursor=cursor, limit=limit)
+    return page_response(persons, PersonResponse)
 
 @router.get("/{person_id}", response_model=PersonResponse)
 def read_person(person_id: int, db: Session = Depends(get_db)):
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
 from crud import physical_activity as crud_physical_activity
 from schemas.physical_activity import PhysicalActivityCreate, PhysicalActivityUpdate, PhysicalActivityResponse
-from typing import List
+from schemas.pagination import Page
+from services.serialization import page_response
+from typing import Optional
 
 router = APIRouter(
     prefix="/physical-activities",
@@ -15,10 +18,11 @@ router = APIRouter(
 def create_physical_activity(activity: PhysicalActivityCreate, db: Session = Depends(get_db)):
     return crud_physical_activity.create_physical_activity(db=db, activity_data=activity.dict())
 
-@router.get("/", response_model=List[PhysicalActivityResponse])
-def read_physical_activities(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    activities = crud_physical_activity.get_physical_activities(db, skip=skip, limit=limit)
-    return activities
+@router.get("/", response_model=Page[PhysicalActivityResponse])
+def read_physical_activities(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    """Actividades fisicas de la mas reciente a la mas antigua (mayor ID primero), como todos los historiales"""
+    activities = crud_physical_activity.get_physical_activities(db, cursor=cursor, limit=limit)
+    return page_response(activities, PhysicalActivityResponse)
 
 @router.get("/{activity_id}", response_model=PhysicalActivityResponse)
 def read_physical_activity(activity_id: int, db: Session = Depends(get_db)):
@@ -27,15 +31,15 @@ def read_physical_activity(activity_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Actividad fisica no encontrada")
     return db_activity
 
-@router.get("/user/{user_id}", response_model=List[PhysicalActivityResponse])
-def read_physical_activities_by_user(user_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    activities = crud_physical_activity.get_physical_activities_by_user(db, user_id=user_id, skip=skip, limit=limit)
-    return activities
+@router.get("/user/{user_id}", response_model=Page[PhysicalActivityResponse])
+def read_physical_activities_by_user(user_id: int, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    activities = crud_physical_activity.get_physical_activities_by_user(db, user_id=user_id, cursor=cursor, limit=limit)
+    return page_response(activities, PhysicalActivityResponse)
 
-@router.get("/smartwatch/{smartwatch_id}", response_model=List[PhysicalActivityResponse])
-def read_physical_activities_by_smartwatch(smartwatch_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    activities = crud_physical_activity.get_physical_activities_by_smartwatch(db, smartwatch_id=smartwatch_id, skip=skip, limit=limit)
-    return activities
+@router.get("/smartwatch/{smartwatch_id}", response_model=Page[PhysicalActivityResponse])
+def read_physical_activities_by_smartwatch(smartwatch_id: int, cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    activities = crud_physical_activity.get_physical_activities_by_smartwatch(db, smartwatch_id=smartwatch_id, cursor=cursor, limit=limit)
+    return page_response(activities, PhysicalActivityResponse)
 
 @router.put("/{activity_id}", response_model=PhysicalActivityResponse)
 def update_physical_activity(activity_id: int, activity: PhysicalActivityUpdate, db: Session = Depends(get_db)):
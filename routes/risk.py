@@ -0,0 +1,49 @@
+import numpy as np
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from config.settings import settings
+from schemas.risk import RiskBatchRequest, RiskBatchResponse, RiskPrediction
+from services.risk_inference import (
+    RiskFeaturesError,
+    RiskModelUnavailableError,
+    RiskUserNotFoundError,
+    risk_inference
+)
+
+router = APIRouter(
+    prefix="/risk",
+    tags=["risk"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/{user_id}", response_model=RiskPrediction)
+async def read_user_risk(user_id: int):
+    """
+    Riesgo cardiovascular del usuario (HIGH/MEDIUM/LOW) con las probabilidades de cada nivel.
+    Las caracteristicas se calculan en el threadpool y la prediccion se agrupa con las peticiones concurrentes.
+    """
+    try:
+        X = await run_in_threadpool(risk_inference.user_features, user_id)
+        return (await risk_inference.predict_features([user_id], X))[0]
+    except RiskModelUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except RiskUserNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RiskFeaturesError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+@router.post("/batch", response_model=RiskBatchResponse)
+async def predict_risk_batch(request: RiskBatchRequest):
+    if not request.user_ids:
+        raise HTTPException(status_code=400, detail="La lista de usuarios esta vacia")
+    if len(request.user_ids) > settings.RISK_BATCH_MAX_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote excede el maximo de {settings.RISK_BATCH_MAX_USERS} usuarios"
+        )
+    try:
+        user_ids, rows, errors = await run_in_threadpool(risk_inference.batch_features, request.user_ids)
+        results = await risk_inference.predict_features(user_ids, np.vstack(rows)) if rows else []
+    except RiskModelUnavailableError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return {"results": results, "errors": errors}
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
 from crud import role as crud_role
 from schemas.role import RoleCreate, RoleUpdate, RoleResponse
-from typing import List
+from schemas.pagination import Page
+from services.serialization import page_response
+from typing import Optional
 
 router = APIRouter(
     prefix="/roles",
@@ -21,10 +24,11 @@ def create_role(role: RoleCreate, db: Session = Depends(get_db)):
         )
     return crud_role.create_role(db=db, role_data=role.dict())
 
-@router.get("/", response_model=List[RoleResponse])
-def read_roles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    roles = crud_role.get_roles(db, skip=skip, limit=limit)
-    return roles
+@router.get("/", response_model=Page[RoleResponse])
+def read_roles(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    """Roles de menor a mayor ID (orden de alta), como todos los catalogos"""
+    roles = crud_role.get_roles(db, cursor=cursor, limit=limit)
+    return page_response(roles, RoleResponse)
 
 @router.get("/{role_id}", response_model=RoleResponse)
 def read_role(role_id: int, db: Session = Depends(get_db)):
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
 from crud import smartwatch as crud_smartwatch
-from schemas.smartwatch import SmartwatchCreate, SmartwatchUpdate, SmartwatchResponse
-from typing import List
+from schemas.smartwatch import SmartwatchCreate, SmartwatchUpdate, SmartwatchResponse, SmartwatchStatsResponse
+from schemas.pagination import Page
+from services.device_stats import device_stats_engine
+from services.serialization import list_response, page_response
+from typing import List, Optional
 
 router = APIRouter(
     prefix="/smartwatches",
@@ -21,10 +25,11 @@ def create_smartwatch(smartwatch: SmartwatchCreate, db: Session = Depends(get_db
         )
     return crud_smartwatch.create_smartwatch(db=db, smartwatch_data=smartwatch.dict())
 
-@router.get("/", response_model=List[SmartwatchResponse])
-def read_smartwatches(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    smartwatches = crud_smartwatch.get_smartwatches(db, skip=skip, limit=limit)
-    return smartwatches
+@router.get("/", response_model=Page[SmartwatchResponse])
+def read_smartwatches(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    """Smartwatches de menor a mayor ID (orden de alta), como todos los catalogos"""
+    smartwatches = crud_smartwatch.get_smartwatches(db, cursor=cursor, limit=limit)
+    return page_response(smartwatches, SmartwatchResponse)
 
 @router.get("/{smartwatch_id}", response_model=SmartwatchResponse)
 def read_smartwatch(smartwatch_id: int, db: Session = Depends(get_db)):
@@ -33,10 +38,31 @@ def read_smartwatch(smartwatch_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Smartwatch no encontrado")
     return db_smartwatch
 
+@router.get("/{smartwatch_id}/stats", response_model=SmartwatchStatsResponse)
+def read_smartwatch_stats(
+    smartwatch_id: int,
+    minutes: Optional[int] = Query(None, ge=1, le=settings.DEVICE_STATS_MINUTE_SLOTS),
+    hours: Optional[int] = Query(None, ge=1, le=settings.DEVICE_STATS_HOUR_SLOTS),
+    db: Session = Depends(get_db)
+):
+    """
+    Media y varianza moviles de frecuencia cardiaca y presion de los ultimos N minutos u horas
+    (por defecto 15 minutos), calculadas en memoria sin consultar las mediciones.
+    """
+    if not settings.DEVICE_STATS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Las estadisticas por dispositivo estan deshabilitadas")
+    if minutes is not None and hours is not None:
+        raise HTTPException(status_code=400, detail="Indique minutes u hours, no ambos")
+    if not device_stats_engine.tracks(smartwatch_id) and crud_smartwatch.get_smartwatch(db, smartwatch_id=smartwatch_id) is None:
+        raise HTTPException(status_code=404, detail="Smartwatch no encontrado")
+    if minutes is None and hours is None:
+        minutes = min(15, settings.DEVICE_STATS_MINUTE_SLOTS)
+    return device_stats_engine.stats(smartwatch_id, minutes=minutes, hours=hours)
+
 @router.get("/user/{user_id}", response_model=List[SmartwatchResponse])
 def read_smartwatches_by_user(user_id: int, db: Session = Depends(get_db)):
     smartwatches = crud_smartwatch.get_smartwatches_by_user(db, user_id=user_id)
-    return smartwatches
+    return list_response(smartwatches, SmartwatchResponse)
 
 @router.put("/{smartwatch_id}", response_model=SmartwatchResponse)
 def update_smartwatch(smartwatch_id: int, smartwatch: SmartwatchUpdate, db: Session = Depends(get_db)):
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from config.database import get_db
+from config.settings import settings
 from crud import user as crud_user
 from schemas.user import UserCreate, UserUpdate, UserResponse
-from typing import List
+from schemas.heart_measurement import LatestVitalsResponse
+from schemas.pagination import Page
+from services import latest_vitals
+from services.serialization import page_response
+from typing import Optional
 
 router = APIRouter(
     prefix="/users",
@@ -29,10 +34,11 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     
     return crud_user.create_user(db=db, user_data=user.dict())
 
-@router.get("/", response_model=List[UserResponse])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = crud_user.get_users(db, skip=skip, limit=limit)
-    return users
+@router.get("/", response_model=Page[UserResponse])
+def read_users(cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=settings.PAGINATION_MAX_LIMIT), db: Session = Depends(get_db)):
+    """Usuarios activos de menor a mayor ID (orden de alta), como todos los catalogos"""
+    users = crud_user.get_users(db, cursor=cursor, limit=limit)
+    return page_response(users, UserResponse)
 
 @router.get("/{user_id}", response_model=UserResponse)
 def read_user(user_id: int, db: Session = Depends(get_db)):
@@ -41,6 +47,14 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return db_user
 
+@router.get("/{user_id}/vitals/latest", response_model=LatestVitalsResponse)
+def read_latest_vitals(user_id: int, db: Session = Depends(get_db)):
+    """Ultimos signos vitales del usuario, servidos desde memoria"""
+    vitals = latest_vitals.get_latest_vitals(db, user_id=user_id)
+    if vitals is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return vitals
+
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db)):
     db_user = crud_user.get_user(db, user_id=user_id)
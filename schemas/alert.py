@@ -47,6 +47,8 @@ class AlertUpdate(BaseModel):
 
 class AlertResponse(AlertBase):
     ID: int
+    Conteo_disparos: int = 1
+    Timestamp_ultimo_disparo: Optional[datetime] = None
     Fecha_Registro: datetime
     Fecha_Actualizacion: Optional[datetime] = None
 
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from decimal import Decimal
+from crud.time_bucket import to_naive_local
 
 class HeartMeasurementBase(BaseModel):
     Usuario_ID: int
@@ -16,6 +17,11 @@ class HeartMeasurementBase(BaseModel):
     Variabilidad_ritmo: Optional[Decimal] = None
     Estatus: Optional[bool] = True
 
+    @validator('Timestamp_medicion')
+    def timestamp_must_be_naive_local(cls, v):
+        # Se guarda como DATETIME sin zona: ...Z o -06:00 se convierten a la hora local del servidor
+        return to_naive_local(v)
+
 class HeartMeasurementCreate(HeartMeasurementBase):
     pass
 
@@ -32,10 +38,129 @@ class HeartMeasurementUpdate(BaseModel):
     Variabilidad_ritmo: Optional[Decimal] = None
     Estatus: Optional[bool] = None
 
+    @validator('Timestamp_medicion')
+    def timestamp_must_be_naive_local(cls, v):
+        return to_naive_local(v)
+
 class HeartMeasurementResponse(HeartMeasurementBase):
     ID: int
     Fecha_Registro: datetime
     Fecha_Actualizacion: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class HeartMeasurementBatchItemResult(BaseModel):
+    index: int
+    accepted: bool
+    status: str
+    error: Optional[str] = None
+
+class HeartMeasurementBatchResponse(BaseModel):
+    total: int
+    accepted: int
+    rejected: int
+    duplicates: int
+    chunk_size: int
+    results: List[HeartMeasurementBatchItemResult]
+
+class HeartMeasurementSeriesPoint(BaseModel):
+    bucket: datetime
+    count: int
+    heart_rate_min: int
+    heart_rate_avg: float
+    heart_rate_max: int
+    systolic_avg: Optional[float] = None
+    diastolic_avg: Optional[float] = None
+    spo2_avg: Optional[float] = None
+    stress_avg: Optional[float] = None
+
+class HeartMeasurementSeriesResponse(BaseModel):
+    user_id: int
+    interval: str
+    start: datetime = Field(..., serialization_alias="from")
+    end: datetime = Field(..., serialization_alias="to")
+    points: List[HeartMeasurementSeriesPoint]
+
+class HeartMeasurementStreamError(BaseModel):
+    line: int
+    error: str
+
+class HeartMeasurementStreamResponse(BaseModel):
+    lines_read: int
+    accepted: int
+    rejected: int
+    duplicates: int
+    chunks_flushed: int
+    bytes_received: int
+    errors: List[HeartMeasurementStreamError]
+    errors_truncated: bool
+
+class HeartMeasurementColumns(BaseModel):
+    """Un arreglo por campo, alineados por posicion (formato columnar de los listados)"""
+    ID: List[int]
+    Usuario_ID: List[int]
+    Smartwatch_ID: List[int]
+    Timestamp_medicion: List[datetime]
+    Frecuencia_cardiaca: List[int]
+    Presion_sistolica: List[Optional[int]]
+    Presion_diastolica: List[Optional[int]]
+    Saturacion_oxigeno: List[Optional[float]]
+    Temperatura: List[Optional[float]]
+    Nivel_estres: List[Optional[int]]
+    Variabilidad_ritmo: List[Optional[float]]
+
+class HeartMeasurementColumnarPage(BaseModel):
+    """Pagina de ?format=columnar"""
+    columns: HeartMeasurementColumns
+    count: int
+    next_cursor: Optional[str] = None
+    limit: int
+
+class HeartMeasurementQueuedResponse(BaseModel):
+    status: str
+    durability: str
+
+class HeartMeasurementVitals(BaseModel):
+    """Signos vitales que evalua el modelo de anomalias; los opcionales faltantes se imputan"""
+    Frecuencia_cardiaca: int
+    Presion_sistolica: Optional[int] = None
+    Presion_diastolica: Optional[int] = None
+    Saturacion_oxigeno: Optional[Decimal] = None
+    Temperatura: Optional[Decimal] = None
+    Nivel_estres: Optional[int] = Field(None, ge=0, le=100)
+    Variabilidad_ritmo: Optional[Decimal] = None
+
+class HeartMeasurementAnomaly(BaseModel):
+    index: int
+    score: float
+    out_of_range: List[str]
+
+class HeartMeasurementAnomalyRejection(BaseModel):
+    index: int
+    error: str
+
+class HeartMeasurementAnomalyResponse(BaseModel):
+    model: str
+    count: int
+    anomaly_count: int
+    scores: List[Optional[float]]
+    anomalies: List[HeartMeasurementAnomaly]
+    rejected: List[HeartMeasurementAnomalyRejection]
+
+class LatestVitals(BaseModel):
+    Smartwatch_ID: int
+    Timestamp_medicion: datetime
+    Frecuencia_cardiaca: int
+    Presion_sistolica: Optional[int] = None
+    Presion_diastolica: Optional[int] = None
+    Saturacion_oxigeno: Optional[Decimal] = None
+    Temperatura: Optional[Decimal] = None
+    Nivel_estres: Optional[int] = None
+    Variabilidad_ritmo: Optional[Decimal] = None
+
+class LatestVitalsResponse(BaseModel):
+    """Lectura mas reciente del usuario (latest) y la ultima de cada smartwatch"""
+    user_id: int
+    latest: Optional[LatestVitals] = None
+    smartwatches: List[LatestVitals]
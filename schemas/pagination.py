@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """Pagina de resultados; next_cursor es None cuando no hay mas resultados"""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    limit: int
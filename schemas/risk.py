@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+class RiskPrediction(BaseModel):
+    user_id: int
+    risk_level: str
+    confidence: float
+    probabilities: Dict[str, float]
+
+class RiskBatchRequest(BaseModel):
+    user_ids: List[int]
+
+class RiskBatchError(BaseModel):
+    user_id: int
+    error: str
+
+class RiskBatchResponse(BaseModel):
+    results: List[RiskPrediction]
+    errors: List[RiskBatchError]
@@ -29,4 +29,18 @@ class SmartwatchResponse(SmartwatchBase):
     Fecha_Actualizacion: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class VitalWindowStats(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    variance: Optional[float] = None
+    std: Optional[float] = None
+
+class SmartwatchStatsResponse(BaseModel):
+    """Estadisticas moviles de los ultimos window_seconds segundos"""
+    smartwatch_id: int
+    window_seconds: int
+    heart_rate: VitalWindowStats
+    systolic: VitalWindowStats
+    diastolic: VitalWindowStats
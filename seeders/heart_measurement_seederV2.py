@@ -728,6 +728,7 @@ class HeartMeasurementSeeder(BaseSeeder):
             # Variables para mantener coherencia a lo largo del día
             fc_base_dia = None
             nivel_estres_base = None
+            timestamps_dia = set()  # (Smartwatch_ID, Timestamp_medicion) es clave unica
             
             for medicion_num in range(num_mediciones):
                 # Distribución más realista de horas (más mediciones durante el día)
@@ -742,6 +743,9 @@ class HeartMeasurementSeeder(BaseSeeder):
                 timestamp = datetime.combine(fecha_dia, datetime.min.time().replace(
                     hour=hora, minute=minuto, second=segundo
                 ))
+                if timestamp in timestamps_dia:
+                    continue
+                timestamps_dia.add(timestamp)
                 
                 # Generar FC realista (variable base para el día)
                 if fc_base_dia is None:
@@ -0,0 +1,220 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from config.database import SessionLocal
+from config.settings import settings
+from models.alert import Alert
+
+logger = logging.getLogger(__name__)
+
+PRUNE_MIN_ENTRIES = 1024
+# Espera maxima por las claves reservadas por otra escritura (plan -> commit -> remember)
+RESERVATION_TIMEOUT_SECONDS = 10
+
+@dataclass
+class OpenAlert:
+    """Alerta abierta de un (usuario, tipo): ultimo disparo y conteo acumulado"""
+    alert_id: int
+    last_trigger: datetime
+    count: int
+
+@dataclass
+class AlertPlan:
+    """
+    Resultado de agrupar un lote de alertas:
+      new_alerts  filas de tbb_alertas a insertar (ya con Conteo_disparos y ultimo disparo)
+      updates     disparos a sumar a alertas abiertas existentes
+      keys        (usuario, tipo) reservados por el plan hasta remember() o release()
+    """
+    new_alerts: List[dict] = field(default_factory=list)
+    updates: List[dict] = field(default_factory=list)
+    keys: set = field(default_factory=set)
+
+def _key(alert) -> Tuple[int, str]:
+    if isinstance(alert, dict):
+        user_id, alert_type = alert["Usuario_ID"], alert["Tipo_alerta"]
+    else:
+        user_id, alert_type = alert.Usuario_ID, alert.Tipo_alerta
+    return user_id, getattr(alert_type, "value", alert_type)
+
+class OpenAlertIndex:
+    """
+    Indice en memoria de la alerta abierta por (usuario, tipo de alerta).
+    Un disparo que cae dentro de la ventana del ultimo disparo de la alerta abierta suma al
+    contador y actualiza Valor_detectado en lugar de insertar otra fila; la ventana se mide con
+    los timestamps de las mediciones y se extiende con cada disparo. plan() no modifica el indice:
+    remember() se llama despues del commit para que un rollback no deje alertas inexistentes.
+    Entre plan() y remember() (o release() si hubo rollback) las claves (usuario, tipo) del lote
+    quedan reservadas: otra escritura de la misma clave espera, si no ambas abririan una alerta.
+    Con varios procesos cada uno tiene su indice, a lo mas una alerta abierta por proceso.
+    """
+
+    def __init__(self, window_minutes: int):
+        self.window = timedelta(minutes=window_minutes)
+        self._open: Dict[Tuple[int, str], OpenAlert] = {}
+        self._by_id: Dict[int, Tuple[int, str]] = {}
+        self._prune_at = PRUNE_MIN_ENTRIES
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        self._reserved: Dict[Tuple[int, str], int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > timedelta(0)
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def _within(self, timestamp: datetime, last_trigger: datetime) -> bool:
+        return abs(timestamp - last_trigger) <= self.window
+
+    def plan(self, alerts: List[dict]) -> AlertPlan:
+        """Agrupa las alertas del lote por (usuario, tipo) contra las alertas abiertas del indice"""
+        plan = AlertPlan()
+        if not self.enabled:
+            plan.new_alerts = list(alerts)
+            return plan
+        groups: Dict[Tuple[int, str], List[dict]] = {}
+        for alert in alerts:
+            groups.setdefault(_key(alert), []).append(alert)
+        with self._released:
+            self._reserve(groups)
+            plan.keys = set(groups)
+            existing = {key: self._open.get(key) for key in groups}
+
+        for key, group in groups.items():
+            group.sort(key=lambda alert: alert["Timestamp_alerta"])
+            # Candidatas: la alerta abierta del indice y las nuevas del lote, la mas reciente primero
+            candidates = []
+            current = existing[key]
+            if current is not None:
+                update = {
+                    "alert_id": current.alert_id,
+                    "added": 0,
+                    "Timestamp_ultimo_disparo": current.last_trigger,
+                    "Valor_detectado": None
+                }
+                candidates.append(update)
+            for alert in group:
+                timestamp = alert["Timestamp_alerta"]
+                target = next((candidate for candidate in reversed(candidates)
+                               if self._within(timestamp, candidate["Timestamp_ultimo_disparo"])), None)
+                if target is None:
+                    target = {**alert, "Conteo_disparos": 1, "Timestamp_ultimo_disparo": timestamp}
+                    candidates.append(target)
+                    plan.new_alerts.append(target)
+                    continue
+                if "alert_id" in target:
+                    target["added"] += 1
+                else:
+                    target["Conteo_disparos"] += 1
+                if timestamp >= target["Timestamp_ultimo_disparo"]:
+                    target["Timestamp_ultimo_disparo"] = timestamp
+                    target["Valor_detectado"] = alert["Valor_detectado"]
+            if current is not None and candidates[0]["added"]:
+                plan.updates.append(candidates[0])
+        return plan
+
+    def _reserve(self, keys):
+        """Espera a que otra escritura libere las claves y las reserva (con self._lock tomado)"""
+        deadline = time.monotonic() + RESERVATION_TIMEOUT_SECONDS
+        while any(key in self._reserved for key in keys):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Tiempo de espera agotado por alertas reservadas; se agrupan {len(keys)} claves sin esperar")
+                break
+            self._released.wait(remaining)
+        for key in keys:
+            self._reserved[key] = self._reserved.get(key, 0) + 1
+
+    def release(self, plan: AlertPlan):
+        """Libera las claves reservadas por el plan (rollback o despues de remember)"""
+        if not plan.keys:
+            return
+        with self._released:
+            for key in plan.keys:
+                count = self._reserved.pop(key, 0) - 1
+                if count > 0:
+                    self._reserved[key] = count
+            plan.keys = set()
+            self._released.notify_all()
+
+    def remember(self, plan: AlertPlan, created: list):
+        """Registra el resultado ya confirmado: created son las alertas insertadas (con ID) del plan"""
+        if not self.enabled:
+            return
+        try:
+            self._remember(plan, created)
+        finally:
+            self.release(plan)
+
+    def _remember(self, plan: AlertPlan, created: list):
+        with self._lock:
+            for update in plan.updates:
+                key = self._by_id.get(update["alert_id"])
+                entry = self._open.get(key) if key is not None else None
+                if entry is not None and entry.alert_id == update["alert_id"]:
+                    entry.count += update["added"]
+                    entry.last_trigger = max(entry.last_trigger, update["Timestamp_ultimo_disparo"])
+            for alert in created:
+                self._track(_key(alert), OpenAlert(alert.ID, alert.Timestamp_ultimo_disparo, alert.Conteo_disparos))
+            if len(self._open) > self._prune_at:
+                self._prune(datetime.now())
+
+    def _track(self, key: Tuple[int, str], candidate: OpenAlert):
+        current = self._open.get(key)
+        if current is not None and current.last_trigger > candidate.last_trigger:
+            return
+        if current is not None:
+            self._by_id.pop(current.alert_id, None)
+        self._open[key] = candidate
+        self._by_id[candidate.alert_id] = key
+
+    def _prune(self, now: datetime):
+        """Descarta las alertas cuyo ultimo disparo ya salio de la ventana"""
+        expired = [key for key, entry in self._open.items() if entry.last_trigger < now - self.window]
+        for key in expired:
+            self._by_id.pop(self._open.pop(key).alert_id, None)
+        self._prune_at = max(PRUNE_MIN_ENTRIES, 2 * len(self._open))
+
+    def forget(self, alert_id: int):
+        """La alerta se edito o desactivo: el siguiente disparo abre una alerta nueva"""
+        with self._lock:
+            key = self._by_id.pop(alert_id, None)
+            if key is not None:
+                self._open.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._open.clear()
+            self._by_id.clear()
+
+    def load_from_db(self, now: Optional[datetime] = None) -> int:
+        """
+        Carga las alertas activas con un disparo dentro de la ventana (una sola consulta al arrancar,
+        acotada por el indice de Timestamp_ultimo_disparo). Regresa las alertas abiertas cargadas.
+        """
+        if not self.enabled:
+            return 0
+        since = (now or datetime.now()) - self.window
+        db = SessionLocal()
+        try:
+            alerts = db.execute(
+                select(Alert.ID, Alert.Usuario_ID, Alert.Tipo_alerta, Alert.Timestamp_ultimo_disparo, Alert.Conteo_disparos)
+                .where(Alert.Timestamp_ultimo_disparo >= since, Alert.Estatus == True)
+            ).all()
+        finally:
+            db.close()
+        with self._lock:
+            self._open.clear()
+            self._by_id.clear()
+            for alert in alerts:
+                self._track(_key(alert), OpenAlert(alert.ID, alert.Timestamp_ultimo_disparo, alert.Conteo_disparos))
+        logger.info(f"Indice de alertas abiertas cargado: {len(self._open)} alertas")
+        return len(self._open)
+
+open_alerts = OpenAlertIndex(window_minutes=settings.ALERT_COALESCE_WINDOW_MINUTES)
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from config.settings import settings
+from models.alert import AlertTypeEnum, PriorityEnum
+
+@dataclass(frozen=True)
+class ThresholdRule:
+    """Genera una alerta cuando la columna supera (above=True) o queda debajo del umbral"""
+    alert_type: AlertTypeEnum
+    column: str
+    above: bool
+    threshold: float
+    priority: PriorityEnum
+    message: str
+
+def default_rules() -> List[ThresholdRule]:
+    return [
+        ThresholdRule(AlertTypeEnum.FRECUENCIA_ALTA, "Frecuencia_cardiaca", True, settings.ALERT_HEART_RATE_HIGH,
+                      PriorityEnum.ALTA, "Frecuencia cardíaca elevada detectada: {valor} BPM"),
+        ThresholdRule(AlertTypeEnum.FRECUENCIA_BAJA, "Frecuencia_cardiaca", False, settings.ALERT_HEART_RATE_LOW,
+                      PriorityEnum.MEDIA, "Frecuencia cardíaca baja detectada: {valor} BPM"),
+        ThresholdRule(AlertTypeEnum.PRESION_ALTA, "Presion_sistolica", True, settings.ALERT_SYSTOLIC_HIGH,
+                      PriorityEnum.ALTA, "Presión arterial elevada: {valor} mmHg"),
+        ThresholdRule(AlertTypeEnum.SATURACION_BAJA, "Saturacion_oxigeno", False, settings.ALERT_SPO2_LOW,
+                      PriorityEnum.CRITICA, "Saturación de oxígeno baja: {valor}%")
+    ]
+
+def _format_value(value: float) -> str:
+    return f"{value:g}"
+
+class _AlertRowBuilder:
+    """Arma las filas de tbb_alertas de una regla; mensaje y Decimal se calculan una vez por valor distinto"""
+
+    def __init__(self, rule: ThresholdRule, registered_at: datetime):
+        self.rule = rule
+        self.registered_at = registered_at
+        self.threshold = Decimal(_format_value(rule.threshold))
+        self._details = {}
+
+    def build(self, row: dict, value: float) -> dict:
+        detail = self._details.get(value)
+        if detail is None:
+            text = _format_value(value)
+            detail = self._details[value] = (self.rule.message.format(valor=text), Decimal(text))
+        return {
+            "Usuario_ID": row["Usuario_ID"],
+            "Smartwatch_ID": row["Smartwatch_ID"],
+            "Tipo_alerta": self.rule.alert_type,
+            "Mensaje": detail[0],
+            "Valor_detectado": detail[1],
+            "Valor_umbral": self.threshold,
+            "Prioridad": self.rule.priority,
+            "Timestamp_alerta": row["Timestamp_medicion"],
+            "Estatus": True,
+            "Fecha_Registro": self.registered_at
+        }
+
+def evaluate_measurements(rows: list, rules: Optional[List[ThresholdRule]] = None,
+                          registered_at: Optional[datetime] = None) -> List[dict]:
+    """
+    Evalua un lote de mediciones (dicts con las columnas de tbb_mediciones_cardiacas) contra las reglas.
+    Un solo recorrido del lote: cada columna se lee una vez por fila y se compara con todas sus
+    reglas; los valores nulos nunca disparan. Solo las filas que disparan se convierten en filas
+    de tbb_alertas (agrupadas por regla), listas para un INSERT multi-fila.
+    """
+    if not rows:
+        return []
+    rules = default_rules() if rules is None else rules
+    registered_at = registered_at or datetime.now()
+    triggered = [[] for _ in rules]
+    checks = {}
+    for position, rule in enumerate(rules):
+        checks.setdefault(rule.column, []).append((triggered[position], rule.above, rule.threshold))
+    checks = list(checks.items())
+    for row in rows:
+        if row.get("Estatus") is False:
+            continue
+        for column, column_checks in checks:
+            value = row.get(column)
+            if value is None:
+                continue
+            value = float(value)
+            for matches, above, threshold in column_checks:
+                if (value > threshold) if above else (value < threshold):
+                    matches.append((row, value))
+    alerts = []
+    for rule, matches in zip(rules, triggered):
+        builder = _AlertRowBuilder(rule, registered_at)
+        alerts.extend(builder.build(row, value) for row, value in matches)
+    return alerts
@@ -0,0 +1,37 @@
+import logging
+from typing import List
+from sqlalchemy.orm import Session
+from config.settings import settings
+from email_service import send_alert_email
+from models.alert import PriorityEnum
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = [PriorityEnum.BAJA, PriorityEnum.MEDIA, PriorityEnum.ALTA, PriorityEnum.CRITICA]
+
+def _priority_rank(priority) -> int:
+    return PRIORITY_ORDER.index(PriorityEnum(getattr(priority, "value", priority)))
+
+def notify_new_alerts(db: Session, alerts: List[dict]) -> int:
+    """
+    Encola un correo por alerta nueva con prioridad >= ALERT_EMAIL_MIN_PRIORITY.
+    Una sola consulta por lote para los correos de los usuarios; el envio es de fondo.
+    Regresa los correos encolados.
+    """
+    if not settings.ALERT_EMAIL_ENABLED or not alerts:
+        return 0
+    minimum = _priority_rank(settings.ALERT_EMAIL_MIN_PRIORITY)
+    selected = [alert for alert in alerts if _priority_rank(alert["Prioridad"]) >= minimum]
+    if not selected:
+        return 0
+    user_ids = {alert["Usuario_ID"] for alert in selected}
+    emails = dict(db.query(User.ID, User.Correo_Electronico).filter(User.ID.in_(user_ids), User.Estatus == True).all())
+    queued = 0
+    for alert in selected:
+        email = emails.get(alert["Usuario_ID"])
+        if email and send_alert_email(email, alert)["success"]:
+            queued += 1
+    if queued < len(selected):
+        logger.warning(f"{len(selected) - queued} notificaciones de alerta no encoladas")
+    return queued
@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+from typing import Any, List, Optional
+import numpy as np
+from pydantic import ValidationError
+from config.settings import settings
+from ml_algorithms.anomaly_detection.model import FEATURE_COLUMNS, AnomalyDetector, rows_to_matrix
+from schemas.heart_measurement import HeartMeasurementVitals
+from services.heart_measurement_ingestion import format_validation_error
+
+logger = logging.getLogger(__name__)
+
+class AnomalyModelUnavailableError(Exception):
+    """No hay un modelo de deteccion de anomalias cargado"""
+
+class AnomalyScoringService:
+    """
+    Modelo de deteccion de anomalias cargado una sola vez (al arrancar la aplicacion) desde
+    el artefacto de ml_algorithms.anomaly_detection.train. Cada lote se evalua con una sola
+    llamada vectorizada al modelo, sin una llamada de Python por medicion.
+    """
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self.detector: Optional[AnomalyDetector] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.detector is not None
+
+    def load(self) -> bool:
+        with self._lock:
+            if self.detector is not None:
+                return True
+            if not os.path.exists(self.model_path):
+                logger.warning(f"Modelo de anomalias no encontrado en {self.model_path}; deteccion deshabilitada")
+                return False
+            self.detector = AnomalyDetector.load(self.model_path)
+        logger.info(f"Modelo de anomalias cargado ({self.detector.algorithm}) desde {self.model_path}")
+        return True
+
+    def score_batch(self, X: np.ndarray) -> np.ndarray:
+        if self.detector is None:
+            raise AnomalyModelUnavailableError("El modelo de deteccion de anomalias no esta disponible")
+        return self.detector.score_batch(X)
+
+    def score_measurements(self, measurements: List[Any]) -> dict:
+        """
+        Evalua un lote de mediciones (dicts con las columnas de tbb_mediciones_cardiacas).
+        Cada medicion se valida como en la ingesta por lote: las que no son objeto o tienen signos
+        no numericos se reportan en rejected y no se evaluan (no se imputan como una fila normal).
+        Regresa el score de cada medicion (negativo = anomala, None si se rechazo) y el detalle de las anomalas.
+        """
+        if self.detector is None:
+            raise AnomalyModelUnavailableError("El modelo de deteccion de anomalias no esta disponible")
+        positions, rows, rejected = [], [], []
+        for index, raw in enumerate(measurements):
+            try:
+                if not isinstance(raw, dict):
+                    raise TypeError("La medicion debe ser un objeto JSON")
+                rows.append(HeartMeasurementVitals(**raw).dict())
+            except ValidationError as e:
+                rejected.append({"index": index, "error": format_validation_error(e)})
+                continue
+            except TypeError as e:
+                rejected.append({"index": index, "error": str(e)})
+                continue
+            positions.append(index)
+
+        scores = [None] * len(measurements)
+        anomalies = []
+        if rows:
+            X = rows_to_matrix(rows)
+            scored = self.score_batch(X)
+            violations = AnomalyDetector.range_violations(X)
+            for position, score in zip(positions, np.round(scored, 4).tolist()):
+                scores[position] = score
+            anomalies = [
+                {
+                    "index": positions[row],
+                    "score": round(float(scored[row]), 4),
+                    "out_of_range": [FEATURE_COLUMNS[column] for column in np.flatnonzero(violations[row])]
+                }
+                for row in np.flatnonzero(scored < 0).tolist()
+            ]
+        return {
+            "model": self.detector.algorithm,
+            "count": len(rows),
+            "anomaly_count": len(anomalies),
+            "scores": scores,
+            "anomalies": anomalies,
+            "rejected": rejected
+        }
+
+anomaly_scoring = AnomalyScoringService(model_path=settings.ANOMALY_MODEL_PATH)
@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+import numpy as np
+from ml_algorithms.anomaly_detection.model import FEATURE_COLUMNS, NORMAL_RANGES, AnomalyDetector
+from models.alert import AlertTypeEnum, PriorityEnum
+
+# Categorias de anomalia del notebook: nombre -> tipo de alerta en tbb_alertas
+ANOMALY_CATEGORIES = {
+    "FRECUENCIA_ALTA": AlertTypeEnum.FRECUENCIA_ALTA,
+    "FRECUENCIA_BAJA": AlertTypeEnum.FRECUENCIA_BAJA,
+    "PRESION_ALTA": AlertTypeEnum.PRESION_ALTA,
+    "SATURACION_BAJA": AlertTypeEnum.SATURACION_BAJA,
+    "TEMPERATURA_ALTA": AlertTypeEnum.PERSONALIZADA,
+    "ESTRES_ALTO": AlertTypeEnum.PERSONALIZADA,
+    "VARIABILIDAD_BAJA": AlertTypeEnum.PERSONALIZADA
+}
+VITAL_CATEGORIES = ["FRECUENCIA_ALTA", "FRECUENCIA_BAJA", "PRESION_ALTA", "SATURACION_BAJA"]
+ANOMALY_THRESHOLD_PERCENT = 10.0
+CRITICAL_VIOLATIONS = 3
+# Inicio del mensaje de las alertas consolidadas: identifica las alertas del barrido en tbb_alertas
+SWEEP_MESSAGE_PREFIX = "Análisis de anomalías:"
+
+_COLUMN = {column: index for index, column in enumerate(FEATURE_COLUMNS)}
+
+@dataclass
+class UserChunk:
+    """
+    Mediciones de varios usuarios ordenadas por usuario: las filas de user_ids[i] son
+    features[starts[i]:starts[i + 1]]. Solo arreglos NumPy para enviarlo barato a otro proceso.
+    """
+    user_ids: np.ndarray
+    starts: np.ndarray
+    smartwatch_ids: np.ndarray
+    days: np.ndarray
+    features: np.ndarray
+
+    @property
+    def rows(self) -> int:
+        return len(self.features)
+
+_detector: Optional[AnomalyDetector] = None
+
+def init_worker(model_path: str):
+    """Initializer del pool: cada proceso carga el modelo una sola vez"""
+    global _detector
+    _detector = AnomalyDetector.load(model_path)
+
+def _category_counts(X: np.ndarray, violations: np.ndarray) -> dict:
+    """Conteo por fila de cada categoria del notebook (presion sistolica y diastolica suman por separado)"""
+    heart_rate = _COLUMN["Frecuencia_cardiaca"]
+    with np.errstate(invalid="ignore"):
+        high_rate = violations[:, heart_rate] & (X[:, heart_rate] > NORMAL_RANGES["Frecuencia_cardiaca"][1])
+    return {
+        "FRECUENCIA_ALTA": high_rate,
+        "FRECUENCIA_BAJA": violations[:, heart_rate] & ~high_rate,
+        "PRESION_ALTA": violations[:, _COLUMN["Presion_sistolica"]].astype(np.int64) + violations[:, _COLUMN["Presion_diastolica"]],
+        "SATURACION_BAJA": violations[:, _COLUMN["Saturacion_oxigeno"]],
+        "TEMPERATURA_ALTA": violations[:, _COLUMN["Temperatura"]],
+        "ESTRES_ALTO": violations[:, _COLUMN["Nivel_estres"]],
+        "VARIABILIDAD_BAJA": violations[:, _COLUMN["Variabilidad_ritmo"]]
+    }
+
+def _priority(anomaly_percent: float, critical_percent: float, counts: dict) -> Optional[PriorityEnum]:
+    """Mismos criterios que determinar_prioridad_anomalias del notebook"""
+    if anomaly_percent < 5:
+        return None
+    if critical_percent > 5 or anomaly_percent > 30:
+        return PriorityEnum.CRITICA
+    vital_anomalies = sum(counts[name] for name in VITAL_CATEGORIES)
+    if vital_anomalies > 0 and anomaly_percent > 20:
+        return PriorityEnum.ALTA
+    if anomaly_percent > 15 or vital_anomalies > 0:
+        return PriorityEnum.MEDIA
+    if anomaly_percent > 5:
+        return PriorityEnum.BAJA
+    return None
+
+def _temporal_pattern(anomalous_days: int, total_days: int) -> str:
+    if total_days == 0:
+        return "Sin datos temporales"
+    if anomalous_days / total_days > 0.7:
+        return "Anomalías persistentes"
+    if anomalous_days / total_days > 0.3:
+        return "Anomalías frecuentes"
+    return "Anomalías esporádicas"
+
+def _message(total: int, anomalies: int, anomaly_percent: float, critical: int, critical_percent: float,
+             counts: dict, pattern: str) -> str:
+    message = f"{SWEEP_MESSAGE_PREFIX} {total} mediciones. Anomalías detectadas: {anomalies} ({anomaly_percent:.1f}%). "
+    if critical:
+        message += f"Críticas: {critical} ({critical_percent:.1f}%). "
+    main_types = [(name, count) for name, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:3] if count > 0]
+    if main_types:
+        message += "Principales: " + ", ".join(f"{name}({count})" for name, count in main_types) + ". "
+    return message + f"Patrón: {pattern}"
+
+def analyze_chunk(chunk: UserChunk, registered_at: datetime, detector: Optional[AnomalyDetector] = None) -> List[dict]:
+    """
+    Analiza todas las mediciones del bloque con una sola llamada al modelo y agrega por usuario
+    con reduceat; regresa las filas consolidadas de tbb_alertas (una por usuario que la requiere).
+    Una medicion es anomala si el modelo la marca o si sale de los rangos medicos; es critica con
+    CRITICAL_VIOLATIONS o mas signos fuera de rango.
+    """
+    detector = detector or _detector
+    if chunk.rows == 0:
+        return []
+    X = chunk.features
+    violations = AnomalyDetector.range_violations(X)
+    violation_counts = violations.sum(axis=1)
+    anomalous = (detector.score_batch(X) < 0) | (violation_counts > 0)
+    critical = violation_counts >= CRITICAL_VIOLATIONS
+    starts = chunk.starts[:-1]
+
+    totals = np.diff(chunk.starts)
+    anomaly_totals = np.add.reduceat(anomalous.astype(np.int64), starts)
+    critical_totals = np.add.reduceat(critical.astype(np.int64), starts)
+    category_totals = {
+        name: np.add.reduceat(np.asarray(values, dtype=np.int64), starts)
+        for name, values in _category_counts(X, violations).items()
+    }
+    # Dias con mediciones y dias con alguna anomalia por usuario
+    owner = np.repeat(np.arange(len(totals)), totals)
+    day_keys, day_index = np.unique(np.stack([owner, chunk.days]), axis=1, return_inverse=True)
+    day_anomalous = np.zeros(day_keys.shape[1], dtype=bool)
+    np.logical_or.at(day_anomalous, day_index.ravel(), anomalous)
+    total_days = np.bincount(day_keys[0], minlength=len(totals))
+    anomalous_days = np.bincount(day_keys[0], weights=day_anomalous, minlength=len(totals)).astype(np.int64)
+
+    alerts = []
+    for i, user_id in enumerate(chunk.user_ids.tolist()):
+        total = int(totals[i])
+        anomaly_percent = anomaly_totals[i] / total * 100
+        critical_percent = critical_totals[i] / total * 100
+        counts = {name: int(values[i]) for name, values in category_totals.items()}
+        priority = _priority(anomaly_percent, critical_percent, counts)
+        if priority is None:
+            continue
+        main_category = max((name for name in counts if counts[name] > 0), key=counts.get, default=None)
+        smartwatches, frequency = np.unique(chunk.smartwatch_ids[chunk.starts[i]:chunk.starts[i + 1]], return_counts=True)
+        alerts.append({
+            "Usuario_ID": int(user_id),
+            "Smartwatch_ID": int(smartwatches[np.argmax(frequency)]),
+            "Tipo_alerta": ANOMALY_CATEGORIES[main_category] if main_category else AlertTypeEnum.PERSONALIZADA,
+            "Mensaje": _message(total, int(anomaly_totals[i]), anomaly_percent, int(critical_totals[i]), critical_percent,
+                                counts, _temporal_pattern(int(anomalous_days[i]), int(total_days[i]))),
+            "Valor_detectado": Decimal(f"{anomaly_percent:.2f}"),
+            "Valor_umbral": Decimal(f"{ANOMALY_THRESHOLD_PERCENT:.2f}"),
+            "Prioridad": priority,
+            "Timestamp_alerta": registered_at,
+            "Estatus": True,
+            "Fecha_Registro": registered_at
+        })
+    return alerts
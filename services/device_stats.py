@@ -0,0 +1,257 @@
+import logging
+import math
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from config.database import SessionLocal
+from config.settings import settings
+from crud.time_bucket import EPOCH
+from models.heart_measurement import HeartMeasurement
+from services import measurement_events
+
+logger = logging.getLogger(__name__)
+
+# Signos vitales con estadisticas por ventana: nombre en la respuesta -> columna
+DEVICE_STATS_VITALS = {
+    "heart_rate": "Frecuencia_cardiaca",
+    "systolic": "Presion_sistolica",
+    "diastolic": "Presion_diastolica"
+}
+VITAL_COLUMNS = list(DEVICE_STATS_VITALS.values())
+
+MINUTE = 60
+HOUR = 60 * 60
+INITIAL_CAPACITY = 1024
+REBUILD_BLOCK_ROWS = 100000
+
+def _epoch(timestamp: datetime) -> int:
+    return int((timestamp - EPOCH).total_seconds())
+
+class SlotRing:
+    """
+    Anillo de `slots` intervalos de `slot_seconds` para todos los dispositivos.
+    Cada intervalo guarda conteo, media y M2 (Welford) por signo vital en arreglos compactos
+    de forma (dispositivos, slots, signos); un intervalo se reinicia cuando el anillo da la vuelta.
+    """
+
+    def __init__(self, slot_seconds: int, slots: int, capacity: int):
+        self.slot_seconds = slot_seconds
+        self.slots = slots
+        shape = (capacity, slots, len(VITAL_COLUMNS))
+        self.counts = np.zeros(shape, dtype=np.int32)
+        self.means = np.zeros(shape, dtype=np.float32)
+        self.m2 = np.zeros(shape, dtype=np.float32)
+        self.slot_ids = np.full((capacity, slots), -1, dtype=np.int64)
+        self.latest = np.full(capacity, -1, dtype=np.int64)
+
+    def grow(self, capacity: int):
+        for name in ("counts", "means", "m2", "slot_ids", "latest"):
+            current = getattr(self, name)
+            fill = -1 if name in ("slot_ids", "latest") else 0
+            grown = np.full((capacity, *current.shape[1:]), fill, dtype=current.dtype)
+            grown[:len(current)] = current
+            setattr(self, name, grown)
+
+    def add(self, row: int, epoch: int, values: list):
+        slot_id = epoch // self.slot_seconds
+        if slot_id <= self.latest[row] - self.slots:
+            return  # mas antigua que todo el anillo
+        if slot_id > self.latest[row]:
+            self.latest[row] = slot_id
+        index = slot_id % self.slots
+        if self.slot_ids[row, index] != slot_id:
+            self.slot_ids[row, index] = slot_id
+            self.counts[row, index] = 0
+            self.means[row, index] = 0
+            self.m2[row, index] = 0
+        for vital, value in enumerate(values):
+            if value is None:
+                continue
+            value = float(value)
+            count = int(self.counts[row, index, vital]) + 1
+            mean = float(self.means[row, index, vital])
+            delta = value - mean
+            mean += delta / count
+            self.counts[row, index, vital] = count
+            self.means[row, index, vital] = mean
+            self.m2[row, index, vital] += delta * (value - mean)
+
+    def window(self, row: int, epoch: int, slots: int):
+        """Conteo, media y M2 por signo vital de los ultimos `slots` intervalos (combinacion de Chan)"""
+        current = epoch // self.slot_seconds
+        ids = self.slot_ids[row]
+        selected = (ids > current - slots) & (ids <= current)
+        counts = self.counts[row][selected].astype(np.float64)
+        means = self.means[row][selected].astype(np.float64)
+        total = counts.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(total > 0, (counts * means).sum(axis=0) / total, np.nan)
+        m2 = self.m2[row][selected].astype(np.float64).sum(axis=0) + (counts * (means - np.nan_to_num(mean)) ** 2).sum(axis=0)
+        return total, mean, m2
+
+class DeviceStatsEngine:
+    """
+    Estadisticas moviles por smartwatch (ultimos N minutos u horas) en memoria.
+    Cada medicion ingresada actualiza en O(1) un anillo de minutos y uno de horas; una consulta
+    combina a lo mas `slots` intervalos, sin recorrer mediciones. Las ventanas se alinean a
+    minutos/horas completos e incluyen el intervalo en curso. Las mediciones editadas o
+    desactivadas salen de las estadisticas cuando su intervalo sale de la ventana.
+    Las mediciones con timestamp mas de max_skew_seconds en el futuro se ignoran: moverian el
+    intervalo mas reciente del anillo y las lecturas reales se descartarian como antiguas.
+    """
+
+    def __init__(self, minute_slots: int, hour_slots: int, capacity: int = INITIAL_CAPACITY,
+                 max_skew_seconds: int = 300):
+        self.minute_slots = minute_slots
+        self.hour_slots = hour_slots
+        self.max_skew_seconds = max_skew_seconds
+        self._capacity = capacity
+        self._rings = {MINUTE: SlotRing(MINUTE, minute_slots, capacity), HOUR: SlotRing(HOUR, hour_slots, capacity)}
+        self._rows: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def tracks(self, smartwatch_id: int) -> bool:
+        return smartwatch_id in self._rows
+
+    def _row(self, smartwatch_id: int) -> int:
+        row = self._rows.get(smartwatch_id)
+        if row is None:
+            row = len(self._rows)
+            if row >= self._capacity:
+                self._capacity *= 2
+                for ring in self._rings.values():
+                    ring.grow(self._capacity)
+            self._rows[smartwatch_id] = row
+        return row
+
+    def update(self, smartwatch_id: int, timestamp: datetime, values: list, now: Optional[datetime] = None):
+        epoch = _epoch(timestamp)
+        if epoch > _epoch(now or datetime.now()) + self.max_skew_seconds:
+            logger.debug(f"Medicion futura del smartwatch {smartwatch_id} ({timestamp}) ignorada en estadisticas")
+            return
+        with self._lock:
+            row = self._row(smartwatch_id)
+            for ring in self._rings.values():
+                ring.add(row, epoch, values)
+
+    def on_saved(self, measurements: List[dict]):
+        for measurement in measurements:
+            if measurement["Estatus"]:
+                self.update(
+                    measurement["Smartwatch_ID"],
+                    measurement["Timestamp_medicion"],
+                    [measurement[column] for column in VITAL_COLUMNS]
+                )
+
+    def stats(self, smartwatch_id: int, minutes: Optional[int] = None, hours: Optional[int] = None,
+              now: Optional[datetime] = None) -> dict:
+        if (minutes is None) == (hours is None):
+            raise ValueError("Indique minutes u hours")
+        slot_seconds, slots = (MINUTE, minutes) if minutes is not None else (HOUR, hours)
+        epoch = _epoch(now or datetime.now())
+        result = {"smartwatch_id": smartwatch_id, "window_seconds": slot_seconds * slots}
+        with self._lock:
+            row = self._rows.get(smartwatch_id)
+            if row is None:
+                total = np.zeros(len(VITAL_COLUMNS))
+                mean = m2 = np.full(len(VITAL_COLUMNS), np.nan)
+            else:
+                total, mean, m2 = self._rings[slot_seconds].window(row, epoch, slots)
+        for vital, name in enumerate(DEVICE_STATS_VITALS):
+            count = int(total[vital])
+            variance = float(m2[vital]) / (count - 1) if count > 1 else None
+            result[name] = {
+                "count": count,
+                "mean": round(float(mean[vital]), 2) if count else None,
+                "variance": round(max(variance, 0.0), 2) if variance is not None else None,
+                "std": round(math.sqrt(max(variance, 0.0)), 2) if variance is not None else None
+            }
+        return result
+
+    def _load_ring(self, ring: SlotRing, partials: pd.DataFrame, rows: np.ndarray):
+        """Escribe en el anillo los agregados (conteo, suma, suma de cuadrados) por dispositivo e intervalo"""
+        index = (partials["slot"].to_numpy() % ring.slots).astype(np.int64)
+        ring.slot_ids[rows, index] = partials["slot"].to_numpy()
+        np.maximum.at(ring.latest, rows, partials["slot"].to_numpy())
+        for vital, column in enumerate(VITAL_COLUMNS):
+            counts = partials[f"{column}_count"].to_numpy()
+            sums = partials[f"{column}_sum"].to_numpy()
+            squares = partials[f"{column}_sq"].to_numpy()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = np.where(counts > 0, sums / counts, 0.0)
+                m2 = np.where(counts > 0, np.maximum(squares - sums * means, 0.0), 0.0)
+            ring.counts[rows, index, vital] = counts
+            ring.means[rows, index, vital] = means
+            ring.m2[rows, index, vital] = m2
+
+    def rebuild_from_db(self, now: Optional[datetime] = None) -> int:
+        """
+        Reconstruye los anillos con las mediciones activas de la ventana mas larga (un solo recorrido,
+        acotado por el indice de Fecha_Registro) y reemplaza el estado actual. Regresa las filas leidas.
+        """
+        now = now or datetime.now()
+        since = now - timedelta(seconds=max(MINUTE * self.minute_slots, HOUR * self.hour_slots))
+        columns = ["Smartwatch_ID", "Timestamp_medicion", *VITAL_COLUMNS]
+        db = SessionLocal()
+        partials = {MINUTE: [], HOUR: []}
+        rows_read = 0
+        try:
+            result = db.execute(
+                select(*[getattr(HeartMeasurement, column) for column in columns])
+                .where(
+                    HeartMeasurement.Estatus == True,
+                    HeartMeasurement.Fecha_Registro >= since,
+                    HeartMeasurement.Timestamp_medicion >= since,
+                    HeartMeasurement.Timestamp_medicion <= now
+                )
+                .execution_options(stream_results=True, yield_per=REBUILD_BLOCK_ROWS)
+            )
+            for block in result.partitions(REBUILD_BLOCK_ROWS):
+                frame = pd.DataFrame(block, columns=columns)
+                epochs = (frame["Timestamp_medicion"] - EPOCH).dt.total_seconds().astype(np.int64)
+                for column in VITAL_COLUMNS:
+                    values = pd.to_numeric(frame[column], errors="coerce").astype(float)
+                    frame[f"{column}_count"] = values.notna().astype(np.int64)
+                    frame[f"{column}_sum"] = values.fillna(0)
+                    frame[f"{column}_sq"] = (values * values).fillna(0)
+                aggregates = [name for column in VITAL_COLUMNS for name in (f"{column}_count", f"{column}_sum", f"{column}_sq")]
+                for slot_seconds in partials:
+                    frame["slot"] = epochs // slot_seconds
+                    partials[slot_seconds].append(frame.groupby(["Smartwatch_ID", "slot"], as_index=False)[aggregates].sum())
+                rows_read += len(frame)
+        finally:
+            db.close()
+
+        engine = DeviceStatsEngine(self.minute_slots, self.hour_slots, self._capacity, self.max_skew_seconds)
+        current = _epoch(now)
+        for slot_seconds, frames in partials.items():
+            if not frames:
+                continue
+            ring = engine._rings[slot_seconds]
+            merged = pd.concat(frames).groupby(["Smartwatch_ID", "slot"], as_index=False).sum()
+            merged = merged[merged["slot"] > current // slot_seconds - ring.slots]
+            for smartwatch_id in merged["Smartwatch_ID"].unique():
+                engine._row(int(smartwatch_id))
+            ring = engine._rings[slot_seconds]
+            rows = merged["Smartwatch_ID"].map(engine._rows).to_numpy()
+            engine._load_ring(ring, merged, rows)
+
+        with self._lock:
+            self._rows, self._rings, self._capacity = engine._rows, engine._rings, engine._capacity
+        logger.info(f"Estadisticas por dispositivo reconstruidas: {len(self._rows)} smartwatches, {rows_read} mediciones")
+        return rows_read
+
+    def attach(self):
+        measurement_events.subscribe(measurement_events.EVENT_SAVED, self.on_saved)
+
+    def detach(self):
+        measurement_events.unsubscribe(measurement_events.EVENT_SAVED, self.on_saved)
+
+device_stats_engine = DeviceStatsEngine(
+    minute_slots=settings.DEVICE_STATS_MINUTE_SLOTS,
+    hour_slots=settings.DEVICE_STATS_HOUR_SLOTS,
+    max_skew_seconds=settings.DEVICE_STATS_MAX_CLOCK_SKEW_SECONDS
+)
@@ -0,0 +1,126 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from config.settings import settings
+from crud import heart_measurement as crud_heart_measurement
+from models.smartwatch import Smartwatch
+from services import measurement_archive
+from schemas.heart_measurement import HeartMeasurementCreate
+
+STATUS_INSERTED = "inserted"
+STATUS_UPDATED = "updated"
+STATUS_DUPLICATE = "duplicate"
+STATUS_REJECTED = "rejected"
+
+ARCHIVED_PERIOD_ERROR = "La medicion es anterior a la ventana caliente y ese periodo ya esta en el archivo frio"
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+def archived_before() -> Optional[datetime]:
+    """
+    Inicio de la ventana caliente si hay archivo frio. Las mediciones anteriores ya no se escriben:
+    la clave natural no se puede verificar contra el archivo y sus resumenes no se recalculan.
+    """
+    return measurement_archive.hot_window_start() if measurement_archive.has_archive() else None
+
+def validate_measurements(db: Session, raw_measurements: List[Any]) -> Tuple[List[Tuple[int, dict]], List[dict]]:
+    """
+    Valida cada medicion de forma independiente.
+    Regresa las filas aceptadas (con su posicion) y el resultado por fila (indice, aceptada, estado, error).
+    Los smartwatches se verifican con una sola consulta para todo el lote.
+    """
+    results = []
+    candidates = []
+    cutoff = archived_before()
+    for index, raw in enumerate(raw_measurements):
+        try:
+            if not isinstance(raw, dict):
+                raise TypeError("La medicion debe ser un objeto JSON")
+            measurement = HeartMeasurementCreate(**raw)
+        except ValidationError as e:
+            results.append({"index": index, "accepted": False, "status": STATUS_REJECTED, "error": format_validation_error(e)})
+            continue
+        except TypeError as e:
+            results.append({"index": index, "accepted": False, "status": STATUS_REJECTED, "error": str(e)})
+            continue
+        if cutoff is not None and measurement.Timestamp_medicion < cutoff:
+            results.append({"index": index, "accepted": False, "status": STATUS_REJECTED, "error": ARCHIVED_PERIOD_ERROR})
+            continue
+        results.append({"index": index, "accepted": True, "status": STATUS_INSERTED, "error": None})
+        candidates.append((len(results) - 1, measurement.dict()))
+
+    smartwatch_ids = {data["Smartwatch_ID"] for _, data in candidates}
+    owners = {}
+    if smartwatch_ids:
+        owners = dict(
+            db.query(Smartwatch.ID, Smartwatch.Usuario_ID)
+            .filter(Smartwatch.ID.in_(smartwatch_ids), Smartwatch.Estatus == True)
+            .all()
+        )
+
+    accepted = []
+    for position, data in candidates:
+        owner = owners.get(data["Smartwatch_ID"])
+        if owner is None:
+            results[position].update(accepted=False, status=STATUS_REJECTED, error="Smartwatch no encontrado")
+        elif owner != data["Usuario_ID"]:
+            results[position].update(accepted=False, status=STATUS_REJECTED, error="El smartwatch no pertenece al usuario")
+        else:
+            accepted.append((position, data))
+    return accepted, results
+
+def validate_measurement(db: Session, measurement_data: dict) -> Optional[str]:
+    """Error de una sola medicion (None si es valida), con las mismas reglas que validate_measurements"""
+    _, results = validate_measurements(db, [measurement_data])
+    return results[0]["error"]
+
+def _split_duplicates(db: Session, accepted: List[Tuple[int, dict]], results: List[dict],
+                      on_conflict: str) -> Tuple[List[dict], set]:
+    """
+    Marca las mediciones repetidas, dentro del lote o ya guardadas, para reportarlas por fila.
+    Regresa las filas a escribir y las claves ya guardadas, que se pasan al INSERT para no repetir la consulta.
+    """
+    existing = crud_heart_measurement.get_existing_natural_keys(db, [data for _, data in accepted])
+    seen = set()
+    rows = []
+    for position, data in accepted:
+        key = (data["Smartwatch_ID"], data["Timestamp_medicion"])
+        if key in seen:
+            results[position]["status"] = STATUS_DUPLICATE
+            continue
+        seen.add(key)
+        if key in existing:
+            if on_conflict != crud_heart_measurement.ON_CONFLICT_UPDATE:
+                results[position]["status"] = STATUS_DUPLICATE
+                continue
+            results[position]["status"] = STATUS_UPDATED
+        rows.append(data)
+    return rows, existing
+
+def ingest_measurements(db: Session, raw_measurements: List[Any], chunk_size: Optional[int] = None,
+                        on_conflict: str = crud_heart_measurement.ON_CONFLICT_IGNORE) -> dict:
+    """
+    Valida un lote de mediciones y guarda las validas en una sola transaccion.
+    accepted cuenta las filas escritas (insertadas o actualizadas); las repetidas van en duplicates.
+    """
+    chunk_size = chunk_size or settings.HEART_MEASUREMENT_BATCH_CHUNK_SIZE
+    accepted, results = validate_measurements(db, raw_measurements)
+    rows, existing = _split_duplicates(db, accepted, results, on_conflict)
+    written = 0
+    if rows:
+        written = crud_heart_measurement.create_heart_measurements_batch(
+            db, rows, chunk_size=chunk_size, on_conflict=on_conflict, existing=existing
+        )
+    return {
+        "total": len(results),
+        "accepted": written,
+        "rejected": sum(1 for result in results if result["status"] == STATUS_REJECTED),
+        "duplicates": sum(1 for result in results if result["status"] == STATUS_DUPLICATE),
+        "chunk_size": chunk_size,
+        "results": results
+    }
@@ -0,0 +1,129 @@
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional
+from config.database import SessionLocal
+from config.settings import settings
+from services import heart_measurement_ingestion
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_COMMIT = "commit"
+DURABILITY_ENQUEUE = "enqueue"
+
+class BufferFullError(Exception):
+    """La cola de escritura esta llena"""
+
+class PendingWrite:
+    """Medicion encolada; permite esperar a que su grupo se confirme en la base de datos"""
+
+    def __init__(self, measurement_data: dict):
+        self.measurement_data = measurement_data
+        self.error: Optional[str] = None
+        self._done = threading.Event()
+
+    def resolve(self, error: Optional[str] = None):
+        self.error = error
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+class MeasurementWriteBuffer:
+    """
+    Buffer de escritura diferida para mediciones individuales.
+    Un hilo de fondo agrupa las mediciones encoladas y las guarda con un solo commit
+    cada max_rows filas o cada max_wait_ms milisegundos, lo que ocurra primero.
+    """
+
+    def __init__(self, max_rows: int, max_wait_ms: int, queue_size: int, durability: str):
+        if durability not in (DURABILITY_COMMIT, DURABILITY_ENQUEUE):
+            raise ValueError(f"Modo de durabilidad no soportado: {durability}")
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.durability = durability
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="measurement-write-buffer", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Buffer de mediciones iniciado (max_rows={self.max_rows}, "
+            f"max_wait_ms={int(self.max_wait * 1000)}, durability={self.durability})"
+        )
+
+    def stop(self, timeout: Optional[float] = None):
+        """Detiene el hilo de fondo despues de guardar todo lo que quede en la cola"""
+        if not self.is_running:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("Buffer de mediciones detenido")
+
+    def submit(self, measurement_data: dict, timeout: Optional[float] = None) -> PendingWrite:
+        pending = PendingWrite(measurement_data)
+        try:
+            self._queue.put(pending, timeout=timeout)
+        except queue.Full:
+            raise BufferFullError("La cola de mediciones esta llena")
+        return pending
+
+    def _collect(self) -> List[PendingWrite]:
+        try:
+            first = self._queue.get(timeout=self.max_wait)
+        except queue.Empty:
+            return []
+        group = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(group) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                group.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return group
+
+    def _flush(self, group: List[PendingWrite]):
+        db = SessionLocal()
+        try:
+            summary = heart_measurement_ingestion.ingest_measurements(
+                db, [pending.measurement_data for pending in group], chunk_size=self.max_rows
+            )
+        except Exception as e:
+            logger.error(f"Error guardando grupo de {len(group)} mediciones: {e}")
+            for pending in group:
+                pending.resolve("Error al guardar la medicion")
+            return
+        finally:
+            db.close()
+
+        for pending, result in zip(group, summary["results"]):
+            if not result["accepted"]:
+                logger.warning(f"Medicion rechazada por el buffer: {result['error']}")
+            pending.resolve(result["error"])
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            group = self._collect()
+            if group:
+                self._flush(group)
+
+write_buffer = MeasurementWriteBuffer(
+    max_rows=settings.HEART_MEASUREMENT_BUFFER_MAX_ROWS,
+    max_wait_ms=settings.HEART_MEASUREMENT_BUFFER_MAX_WAIT_MS,
+    queue_size=settings.HEART_MEASUREMENT_BUFFER_QUEUE_SIZE,
+    durability=settings.HEART_MEASUREMENT_BUFFER_DURABILITY
+)
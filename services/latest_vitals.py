@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from config.settings import settings
+from crud import heart_measurement as crud_heart_measurement
+from crud import smartwatch as crud_smartwatch
+from crud import user as crud_user
+from services import measurement_events
+
+VITALS_FIELDS = [
+    "Smartwatch_ID",
+    "Timestamp_medicion",
+    "Frecuencia_cardiaca",
+    "Presion_sistolica",
+    "Presion_diastolica",
+    "Saturacion_oxigeno",
+    "Temperatura",
+    "Nivel_estres",
+    "Variabilidad_ritmo"
+]
+
+def _vitals(measurement) -> dict:
+    if isinstance(measurement, dict):
+        return {field: measurement[field] for field in VITALS_FIELDS}
+    return {field: getattr(measurement, field) for field in VITALS_FIELDS}
+
+def _keep_latest(smartwatches: Dict[int, dict], smartwatch_id: int, reading: dict):
+    current = smartwatches.get(smartwatch_id)
+    if current is None or reading["Timestamp_medicion"] >= current["Timestamp_medicion"]:
+        smartwatches[smartwatch_id] = reading
+
+class LatestVitalsCache:
+    """
+    Ultimos signos vitales de cada usuario, por smartwatch, con limite LRU de usuarios.
+    Las entradas se cargan de la base de datos en el primer acceso y despues las mantiene
+    la ingesta (listener de measurement_events) para los usuarios que ya estan en memoria.
+    ttl_seconds acota lo desactualizado de una entrada si otro proceso escribe mediciones (0 = sin limite).
+    Un fallo en get deja al usuario "en carga" hasta el put: las mediciones guardadas mientras tanto
+    se juntan con la lectura de la base de datos y un cambio descarta esa lectura en lugar de guardarla.
+    """
+
+    def __init__(self, max_users: int, ttl_seconds: int):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        # usuario -> mediciones guardadas durante la carga por smartwatch (None = cambio, no guardar la carga)
+        self._loading: Dict[int, Optional[Dict[int, dict]]] = {}
+        self._lock = threading.Lock()
+
+    def _expired(self, loaded_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - loaded_at > self.ttl_seconds
+
+    def get(self, user_id: int) -> Optional[Dict[int, dict]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or self._expired(entry[0]):
+                self._entries.pop(user_id, None)
+                self._loading.setdefault(user_id, {})
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, user_id: int, measurements: list) -> Dict[int, dict]:
+        """
+        Guarda lo leido de la base de datos despues de un fallo en get. Por smartwatch se queda la
+        medicion mas reciente entre la lectura, lo guardado durante la carga y la entrada de otra carga.
+        """
+        smartwatches = {measurement.Smartwatch_ID: _vitals(measurement) for measurement in measurements}
+        with self._lock:
+            pending = self._loading.pop(user_id, {})
+            if pending is None:
+                self._entries.pop(user_id, None)
+                return dict(smartwatches)
+            entry = self._entries.get(user_id)
+            for newer in [pending, entry[1] if entry is not None else {}]:
+                for smartwatch_id, reading in newer.items():
+                    _keep_latest(smartwatches, smartwatch_id, reading)
+            self._entries[user_id] = (time.monotonic(), smartwatches)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return dict(smartwatches)
+
+    def on_saved(self, measurements: List[dict]):
+        """Actualiza los usuarios en memoria con las mediciones mas recientes que su ultima lectura"""
+        with self._lock:
+            for measurement in measurements:
+                if not measurement["Estatus"]:
+                    continue
+                entry = self._entries.get(measurement["Usuario_ID"])
+                if entry is not None:
+                    _keep_latest(entry[1], measurement["Smartwatch_ID"], _vitals(measurement))
+                pending = self._loading.get(measurement["Usuario_ID"])
+                if pending is not None:
+                    _keep_latest(pending, measurement["Smartwatch_ID"], _vitals(measurement))
+
+    def on_changed(self, measurements: List[dict]):
+        """Una medicion editada o desactivada puede ser la ultima: se descarta la entrada del usuario"""
+        with self._lock:
+            for measurement in measurements:
+                self._entries.pop(measurement["Usuario_ID"], None)
+                if measurement["Usuario_ID"] in self._loading:
+                    self._loading[measurement["Usuario_ID"]] = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for user_id in self._loading:
+                self._loading[user_id] = None
+
+    def attach(self):
+        measurement_events.subscribe(measurement_events.EVENT_SAVED, self.on_saved)
+        measurement_events.subscribe(measurement_events.EVENT_CHANGED, self.on_changed)
+
+    def detach(self):
+        measurement_events.unsubscribe(measurement_events.EVENT_SAVED, self.on_saved)
+        measurement_events.unsubscribe(measurement_events.EVENT_CHANGED, self.on_changed)
+        self.clear()
+
+latest_vitals_cache = LatestVitalsCache(
+    max_users=settings.LATEST_VITALS_CACHE_MAX_USERS,
+    ttl_seconds=settings.LATEST_VITALS_CACHE_TTL_SECONDS
+)
+
+def get_latest_vitals(db: Session, user_id: int) -> Optional[dict]:
+    """
+    Ultimos signos vitales del usuario: la lectura mas reciente y la de cada smartwatch.
+    En memoria no se consulta la base de datos; en un fallo se lee la ultima medicion de cada
+    smartwatch activo del usuario. Regresa None si el usuario no existe.
+    """
+    smartwatches = latest_vitals_cache.get(user_id)
+    if smartwatches is None:
+        if crud_user.get_user(db, user_id) is None:
+            return None
+        smartwatch_ids = [smartwatch.ID for smartwatch in crud_smartwatch.get_smartwatches_by_user(db, user_id)]
+        measurements = crud_heart_measurement.get_latest_heart_measurements_by_user(db, user_id, smartwatch_ids)
+        smartwatches = latest_vitals_cache.put(user_id, measurements)
+
+    readings = sorted(smartwatches.values(), key=lambda reading: reading["Timestamp_medicion"], reverse=True)
+    return {"user_id": user_id, "latest": readings[0] if readings else None, "smartwatches": readings}
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+from config.settings import settings
+from services import measurement_events
+from services.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+class SubscriberLimitError(Exception):
+    """Se alcanzo el maximo de suscriptores en vivo"""
+
+class LiveSubscription:
+    """
+    Cola acotada de un cliente conectado. Si el cliente no lee a tiempo se descartan las lecturas
+    mas antiguas (dropped cuenta cuantas) en lugar de bloquear la ingesta o crecer sin limite.
+    """
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, message: bytes):
+        """Se ejecuta en el event loop del cliente"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+class LiveVitalsBroker:
+    """
+    Pub/sub en memoria de mediciones nuevas por usuario.
+    La ingesta publica desde cualquier hilo (listener de measurement_events) y cada lectura se
+    entrega al event loop de los suscriptores con call_soon_threadsafe, serializada una sola vez.
+    Los dashboards abiertos no consultan la base de datos.
+    """
+
+    def __init__(self, max_subscribers: int, queue_size: int):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[LiveSubscription]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._count
+
+    def is_full(self) -> bool:
+        return self._count >= self.max_subscribers
+
+    def subscribe(self, user_id: int) -> LiveSubscription:
+        """Debe llamarse desde el event loop que va a leer la cola"""
+        subscription = LiveSubscription(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise SubscriberLimitError("Se alcanzo el maximo de conexiones en vivo")
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.user_id]
+            self._count -= 1
+
+    def on_saved(self, measurements: List[dict]):
+        if not self._subscribers:
+            return
+        for measurement in measurements:
+            if not measurement["Estatus"]:
+                continue
+            with self._lock:
+                subscriptions = list(self._subscribers.get(measurement["Usuario_ID"], ()))
+            if not subscriptions:
+                continue
+            message = dumps(measurement)
+            for subscription in subscriptions:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.offer, message)
+                except RuntimeError:
+                    # El event loop del cliente ya se cerro
+                    self.unsubscribe(subscription)
+
+    def attach(self):
+        measurement_events.subscribe(measurement_events.EVENT_SAVED, self.on_saved)
+
+    def detach(self):
+        measurement_events.unsubscribe(measurement_events.EVENT_SAVED, self.on_saved)
+
+live_vitals_broker = LiveVitalsBroker(
+    max_subscribers=settings.LIVE_VITALS_MAX_SUBSCRIBERS,
+    queue_size=settings.LIVE_VITALS_QUEUE_SIZE
+)
+
+def _sse(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+async def iter_live_vitals(user_id: int, heartbeat_seconds: Optional[float] = None):
+    """
+    Eventos SSE con las mediciones nuevas del usuario (event: measurement).
+    Si el cliente se atrasa y se descartan lecturas se envia antes un event: dropped con el conteo.
+    Cada heartbeat_seconds sin datos se envia un comentario para mantener viva la conexion.
+    """
+    heartbeat = heartbeat_seconds or settings.LIVE_VITALS_HEARTBEAT_SECONDS
+    try:
+        subscription = live_vitals_broker.subscribe(user_id)
+    except SubscriberLimitError as e:
+        yield _sse("error", dumps({"detail": str(e)}))
+        return
+
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            dropped = subscription.take_dropped()
+            if dropped:
+                yield _sse("dropped", dumps({"count": dropped}))
+            yield _sse("measurement", message)
+    finally:
+        live_vitals_broker.unsubscribe(subscription)
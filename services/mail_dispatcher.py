@@ -0,0 +1,170 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import Callable, List, Optional
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+class MailQueueFullError(Exception):
+    """La cola de correos esta llena"""
+
+def smtp_connect() -> smtplib.SMTP:
+    """Conexion SMTP con la configuracion de settings (STARTTLS y login opcionales)"""
+    connection = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+    try:
+        if settings.SMTP_USE_TLS:
+            connection.starttls()
+        if settings.EMAIL_PASSWORD:
+            connection.login(settings.EMAIL_FROM, settings.EMAIL_PASSWORD)
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+def _is_permanent(error: Exception) -> bool:
+    """Rechazos 5xx del servidor: reintentar no cambia el resultado"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+class MailDispatcher:
+    """
+    Envio de correos fuera del event loop.
+    Los correos se encolan (cola acotada) y `workers` hilos de fondo los envian por lotes de hasta
+    batch_size, cada hilo con su propia conexion SMTP persistente: STARTTLS y login una vez por
+    conexion, no por correo. Las conexiones sin uso por idle_seconds se cierran. Los errores
+    temporales se reintentan con backoff exponencial reconectando; los rechazos 5xx no se reintentan.
+    `connect` permite usar otro servidor (por ejemplo un SMTP local de pruebas).
+    """
+
+    def __init__(self, workers: int, queue_size: int, batch_size: int, max_wait_ms: int, max_retries: int,
+                 backoff_seconds: float, idle_seconds: float, connect: Optional[Callable[[], smtplib.SMTP]] = None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.idle_seconds = idle_seconds
+        self.connect = connect or smtp_connect
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        with self._lock:
+            if self.is_running:
+                return
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"mail-dispatcher-{index}", daemon=True)
+                for index in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"Despachador de correos iniciado (workers={self.workers}, batch_size={self.batch_size})")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Detiene los hilos de fondo despues de enviar lo que quede en la cola"""
+        if not self.is_running:
+            return
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info("Despachador de correos detenido")
+
+    def submit(self, message: Message):
+        """No bloquea: se puede llamar desde el event loop"""
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            raise MailQueueFullError("La cola de correos esta llena")
+
+    def _collect(self) -> List[Message]:
+        try:
+            first = self._queue.get(timeout=self.max_wait)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _deliver(self, connection: Optional[smtplib.SMTP], message: Message) -> Optional[smtplib.SMTP]:
+        """Envia un correo con reintentos; regresa la conexion a reutilizar (None si se cerro)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                if connection is None:
+                    connection = self.connect()
+                connection.send_message(message)
+                self.sent += 1
+                return connection
+            except Exception as e:
+                if _is_permanent(e):
+                    logger.error(f"Correo a {message['To']} rechazado: {e}")
+                    self.failed += 1
+                    return connection
+                self._close(connection)
+                connection = None
+                if attempt < self.max_retries:
+                    delay = self.backoff_seconds * 2 ** attempt
+                    logger.warning(f"Error enviando correo a {message['To']} ({e}), reintento en {delay:g}s")
+                    time.sleep(delay)
+                else:
+                    logger.error(f"Correo a {message['To']} descartado despues de {self.max_retries + 1} intentos: {e}")
+        self.failed += 1
+        return None
+
+    @staticmethod
+    def _close(connection: Optional[smtplib.SMTP]):
+        if connection is None:
+            return
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _run(self):
+        connection = None
+        last_used = time.monotonic()
+        try:
+            while not (self._stopping.is_set() and self._queue.empty()):
+                batch = self._collect()
+                if not batch:
+                    if connection is not None and time.monotonic() - last_used > self.idle_seconds:
+                        self._close(connection)
+                        connection = None
+                    continue
+                for message in batch:
+                    connection = self._deliver(connection, message)
+                last_used = time.monotonic()
+        finally:
+            self._close(connection)
+
+mail_dispatcher = MailDispatcher(
+    workers=settings.MAIL_DISPATCHER_WORKERS,
+    queue_size=settings.MAIL_QUEUE_SIZE,
+    batch_size=settings.MAIL_BATCH_SIZE,
+    max_wait_ms=settings.MAIL_BATCH_MAX_WAIT_MS,
+    max_retries=settings.MAIL_MAX_RETRIES,
+    backoff_seconds=settings.MAIL_RETRY_BACKOFF_SECONDS,
+    idle_seconds=settings.MAIL_CONNECTION_IDLE_SECONDS
+)
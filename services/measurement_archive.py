@@ -0,0 +1,302 @@
+import glob
+import logging
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import Numeric, delete, func, select, text
+from sqlalchemy.orm import Session
+from config.settings import settings
+from models.heart_measurement import HeartMeasurement
+from services.parquet_export import arrow_schema, rows_to_arrow
+
+logger = logging.getLogger(__name__)
+
+# Archivo frio: {MEASUREMENT_ARCHIVE_DIR}/mediciones_cardiacas/usuario={id}/mes=YYYY-MM.parquet
+ARCHIVE_TABLE = "mediciones_cardiacas"
+# Indice smartwatch -> usuarios del archivo: {MEASUREMENT_ARCHIVE_DIR}/indice_smartwatch/smartwatch={id}/usuario={id}
+# (archivos vacios), para leer por smartwatch solo los archivos de sus usuarios
+SMARTWATCH_INDEX = "indice_smartwatch"
+
+_missing_index_logged = False
+FETCH_SIZE = 5000
+BLOCK_ROWS = 100000
+DELETE_CHUNK = 1000
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+def hot_window_start(now: Optional[datetime] = None) -> datetime:
+    """Primer instante de la ventana caliente: lo anterior puede estar en el archivo"""
+    now = now or datetime.now()
+    return datetime(now.year, now.month, now.day) - timedelta(days=settings.MEASUREMENT_HOT_DAYS)
+
+def archive_root(archive_dir: str = None) -> str:
+    return os.path.join(archive_dir or settings.MEASUREMENT_ARCHIVE_DIR, ARCHIVE_TABLE)
+
+def archive_file_path(user_id: int, month: date, archive_dir: str = None) -> str:
+    return os.path.join(archive_root(archive_dir), f"usuario={user_id}", f"mes={month:%Y-%m}.parquet")
+
+def smartwatch_index_root(archive_dir: str = None) -> str:
+    return os.path.join(archive_dir or settings.MEASUREMENT_ARCHIVE_DIR, SMARTWATCH_INDEX)
+
+def index_smartwatches(user_id: int, smartwatch_ids, archive_dir: str = None):
+    """Registra que el archivo del usuario tiene mediciones de esos smartwatches"""
+    for smartwatch_id in smartwatch_ids:
+        directory = os.path.join(smartwatch_index_root(archive_dir), f"smartwatch={smartwatch_id}")
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, f"usuario={user_id}"), "a").close()
+
+def archived_smartwatch_users(smartwatch_id: int, archive_dir: str = None) -> Optional[List[int]]:
+    """Usuarios con mediciones archivadas del smartwatch; None si el archivo no tiene indice (anterior al indice)"""
+    index_root = smartwatch_index_root(archive_dir)
+    if not os.path.isdir(index_root):
+        return None
+    directory = os.path.join(index_root, f"smartwatch={smartwatch_id}")
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[len("usuario="):]) for name in os.listdir(directory) if name.startswith("usuario="))
+
+def rebuild_smartwatch_index(archive_dir: str = None) -> int:
+    """Crea el indice smartwatch -> usuarios leyendo la columna Smartwatch_ID de todos los archivos"""
+    files = 0
+    for path in glob.glob(os.path.join(archive_root(archive_dir), "usuario=*", "mes=*.parquet")):
+        user_id = int(os.path.basename(os.path.dirname(path))[len("usuario="):])
+        smartwatch_ids = pq.read_table(path, columns=["Smartwatch_ID"]).column("Smartwatch_ID").unique().to_pylist()
+        index_smartwatches(user_id, smartwatch_ids, archive_dir)
+        files += 1
+    os.makedirs(smartwatch_index_root(archive_dir), exist_ok=True)
+    return files
+
+def has_archive(user_id: Optional[int] = None, archive_dir: str = None, smartwatch_id: Optional[int] = None) -> bool:
+    root = archive_root(archive_dir)
+    if user_id is None and smartwatch_id is not None:
+        users = archived_smartwatch_users(smartwatch_id, archive_dir)
+        if users is not None:
+            return bool(users)
+    if user_id is None:
+        return os.path.isdir(root) and any(name.startswith("usuario=") for name in os.listdir(root))
+    return os.path.isdir(os.path.join(root, f"usuario={user_id}"))
+
+def write_archive_month(user_id: int, month: date, table: pa.Table, archive_dir: str = None) -> int:
+    """
+    Agrega filas al archivo mensual de un usuario. El archivo se reescribe completo (un mes
+    de un usuario cabe en memoria), sin IDs repetidos, ordenado por tiempo y comprimido con zstd.
+    Se escribe a un temporal y se renombra, asi un corte no deja un archivo a medias y repetir
+    un mes ya archivado no duplica filas.
+    """
+    path = archive_file_path(user_id, month, archive_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        table = pa.concat_tables([pq.read_table(path, schema=table.schema), table])
+
+    ids = table.column("ID").to_numpy()
+    # np.unique sobre el arreglo invertido conserva la ultima version de cada ID
+    _, last_positions = np.unique(ids[::-1], return_index=True)
+    table = table.take(len(ids) - 1 - last_positions).sort_by([("Timestamp_medicion", "ascending"), ("ID", "ascending")])
+
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    index_smartwatches(user_id, table.column("Smartwatch_ID").unique().to_pylist(), archive_dir)
+    return table.num_rows
+
+def _write_user_blocks(rows: list, month: date, schema: pa.Schema, user_index: int, archive_dir: str = None):
+    by_user = {}
+    for row in rows:
+        by_user.setdefault(row[user_index], []).append(row)
+    for user_id, user_rows in by_user.items():
+        write_archive_month(user_id, month, rows_to_arrow(user_rows, schema), archive_dir)
+
+def archive_partition(connection, partition_name: str, month: date, archive_dir: str = None) -> int:
+    """Copia las filas de una particion mensual (MySQL) al archivo por usuario antes de eliminarla"""
+    schema = arrow_schema(HeartMeasurement)
+    user_index = schema.get_field_index("Usuario_ID")
+    columns = ", ".join(f"`{field.name}`" for field in schema)
+    result = connection.execution_options(stream_results=True, yield_per=FETCH_SIZE).execute(
+        text(f"SELECT {columns} FROM {HeartMeasurement.__tablename__} PARTITION ({partition_name}) ORDER BY Usuario_ID, ID")
+    )
+    rows_written = 0
+    for rows in result.partitions(BLOCK_ROWS):
+        _write_user_blocks(rows, month, schema, user_index, archive_dir)
+        rows_written += len(rows)
+    logger.info(f"Particion {partition_name} archivada ({rows_written} filas)")
+    return rows_written
+
+def users_with_measurements_before(db: Session, before: datetime) -> List[int]:
+    return list(db.execute(
+        select(HeartMeasurement.Usuario_ID).where(HeartMeasurement.Timestamp_medicion < before).distinct()
+    ).scalars())
+
+def archive_user_measurements(db: Session, user_id: int, before: datetime, archive_dir: str = None) -> int:
+    """
+    Mueve al archivo las mediciones de un usuario anteriores a `before`, un mes por transaccion.
+    Primero se escribe el archivo y despues se borran las filas por ID: si el borrado falla, la
+    siguiente corrida reescribe el mismo mes sin duplicar y las lecturas descartan IDs repetidos.
+    Los resumenes por hora/dia no se tocan.
+    """
+    schema = arrow_schema(HeartMeasurement)
+    columns = list(HeartMeasurement.__table__.columns)
+    id_index = schema.get_field_index("ID")
+    first = db.execute(
+        select(func.min(HeartMeasurement.Timestamp_medicion))
+        .where(HeartMeasurement.Usuario_ID == user_id, HeartMeasurement.Timestamp_medicion < before)
+    ).scalar()
+    if first is None:
+        return 0
+
+    archived = 0
+    month = month_start(first)
+    while month < before.date():
+        upper = min(datetime.combine(add_months(month, 1), datetime.min.time()), before)
+        rows = db.execute(
+            select(*columns)
+            .where(
+                HeartMeasurement.Usuario_ID == user_id,
+                HeartMeasurement.Timestamp_medicion >= datetime.combine(month, datetime.min.time()),
+                HeartMeasurement.Timestamp_medicion < upper
+            )
+            .order_by(HeartMeasurement.Timestamp_medicion, HeartMeasurement.ID)
+        ).all()
+        if rows:
+            write_archive_month(user_id, month, rows_to_arrow(rows, schema), archive_dir)
+            ids = [row[id_index] for row in rows]
+            try:
+                for start in range(0, len(ids), DELETE_CHUNK):
+                    db.execute(delete(HeartMeasurement).where(HeartMeasurement.ID.in_(ids[start:start + DELETE_CHUNK])))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            archived += len(rows)
+        month = add_months(month, 1)
+    return archived
+
+def _archive_files(user_id: Optional[int], start: Optional[datetime], end: Optional[datetime],
+                   archive_dir: str = None, smartwatch_id: Optional[int] = None) -> Dict[date, List[str]]:
+    """
+    Archivos mensuales que se cruzan con [start, end], agrupados por mes. Por smartwatch solo los
+    de los usuarios del indice; sin indice (archivo anterior) los de todos los usuarios.
+    """
+    user_ids = [user_id] if user_id is not None else None
+    if user_ids is None and smartwatch_id is not None:
+        user_ids = archived_smartwatch_users(smartwatch_id, archive_dir)
+        global _missing_index_logged
+        if user_ids is None and not _missing_index_logged:
+            _missing_index_logged = True
+            logger.warning("Archivo sin indice de smartwatches, se revisan todos los usuarios; "
+                           "ejecutar python -m jobs.archive_measurements --rebuild-index")
+    patterns = [f"usuario={user}" for user in user_ids] if user_ids is not None else ["usuario=*"]
+    paths = [
+        path
+        for pattern in patterns
+        for path in glob.glob(os.path.join(archive_root(archive_dir), pattern, "mes=*.parquet"))
+    ]
+    files = {}
+    for path in paths:
+        month = datetime.strptime(os.path.basename(path)[len("mes="):-len(".parquet")], "%Y-%m").date()
+        if start is not None and add_months(month, 1) <= start.date():
+            continue
+        if end is not None and month > end.date():
+            continue
+        files.setdefault(month, []).append(path)
+    return files
+
+def read_archived_measurements(user_id: Optional[int] = None, smartwatch_id: Optional[int] = None,
+                               start: Optional[datetime] = None, end: Optional[datetime] = None,
+                               before: Optional[Tuple[datetime, int]] = None, limit: Optional[int] = None,
+                               columns: Optional[List[str]] = None, archive_dir: str = None) -> pa.Table:
+    """
+    Mediciones activas del archivo en orden de historial (mas reciente primero).
+    `before` es la posicion (Timestamp_medicion, ID) de un cursor: solo se leen filas anteriores.
+    Los meses se recorren del mas reciente al mas antiguo y la lectura se detiene al juntar `limit` filas.
+    Por smartwatch solo se abren los archivos de los usuarios que tuvieron ese smartwatch (indice).
+    """
+    schema = arrow_schema(HeartMeasurement)
+    timestamp, measurement_id = ds.field("Timestamp_medicion"), ds.field("ID")
+    expression = ds.field("Estatus") == True
+    if smartwatch_id is not None:
+        expression &= ds.field("Smartwatch_ID") == smartwatch_id
+    if start is not None:
+        expression &= timestamp >= start
+    if end is not None:
+        expression &= timestamp <= end
+    if before is not None:
+        expression &= (timestamp < before[0]) | ((timestamp == before[0]) & (measurement_id < before[1]))
+    if before is not None and (end is None or before[0] < end):
+        end = before[0]
+
+    read_columns = None if columns is None else list(dict.fromkeys([*columns, "Timestamp_medicion", "ID"]))
+    tables = []
+    rows_read = 0
+    for month, paths in sorted(_archive_files(user_id, start, end, archive_dir, smartwatch_id).items(), reverse=True):
+        table = ds.dataset(paths, schema=schema, format="parquet").to_table(columns=read_columns, filter=expression)
+        tables.append(table)
+        rows_read += table.num_rows
+        if limit is not None and rows_read >= limit:
+            break
+    if not tables:
+        table = schema.empty_table() if read_columns is None else schema.empty_table().select(read_columns)
+    else:
+        table = pa.concat_tables(tables)
+    table = table.sort_by([("Timestamp_medicion", "descending"), ("ID", "descending")])
+    if limit is not None:
+        table = table.slice(0, limit)
+    return table if columns is None else table.select(columns)
+
+def _archive_value(column, value):
+    # Parquet guarda los NUMERIC como float64: se regresan como Decimal con la escala de la columna
+    if value is not None and isinstance(column.type, Numeric):
+        return Decimal(f"{value:.{column.type.scale}f}")
+    return value
+
+def archived_user_ids(archive_dir: str = None) -> List[int]:
+    """Usuarios con mediciones en el archivo, en orden"""
+    root = archive_root(archive_dir)
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(name[len("usuario="):]) for name in os.listdir(root) if name.startswith("usuario="))
+
+def iter_archived_rows(columns: List[str], user_ids: Optional[List[int]] = None, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None, archive_dir: str = None) -> Iterator[tuple]:
+    """
+    Mediciones activas del archivo como tuplas de `columns`, por usuario y en orden cronologico
+    (Timestamp_medicion, ID), leyendo un archivo mensual a la vez. Es el orden de las exportaciones,
+    para mezclarlas con las filas de la tabla caliente sin cargar todo el historial.
+    """
+    if user_ids is None:
+        users = archived_user_ids(archive_dir)
+    else:
+        users = sorted(user_id for user_id in set(user_ids) if has_archive(user_id, archive_dir))
+    schema = arrow_schema(HeartMeasurement)
+    model_columns = HeartMeasurement.__table__.columns
+    expression = ds.field("Estatus") == True
+    if start is not None:
+        expression &= ds.field("Timestamp_medicion") >= start
+    if end is not None:
+        expression &= ds.field("Timestamp_medicion") <= end
+    for user_id in users:
+        for month, paths in sorted(_archive_files(user_id, start, end, archive_dir).items()):
+            table = ds.dataset(paths, schema=schema, format="parquet").to_table(columns=columns, filter=expression)
+            table = table.sort_by([("Timestamp_medicion", "ascending"), ("ID", "ascending")])
+            values = [
+                [_archive_value(model_columns[column], value) for value in table.column(column).to_pylist()]
+                for column in columns
+            ]
+            yield from zip(*values)
+
+def archived_records(table: pa.Table) -> List[dict]:
+    """Filas del archivo como dicts con los mismos tipos que las columnas del modelo"""
+    columns = HeartMeasurement.__table__.columns
+    return [
+        {name: _archive_value(columns[name], value) for name, value in record.items()}
+        for record in table.to_pylist()
+    ]
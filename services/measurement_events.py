@@ -0,0 +1,58 @@
+import logging
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Mediciones nuevas (o reescritas por un upsert) ya confirmadas en la base de datos
+EVENT_SAVED = "saved"
+# Mediciones editadas o desactivadas: las copias en memoria de esos usuarios dejan de ser validas
+EVENT_CHANGED = "changed"
+
+_listeners: Dict[str, List[Callable[[List[dict]], None]]] = {EVENT_SAVED: [], EVENT_CHANGED: []}
+
+MEASUREMENT_FIELDS = [
+    "ID",
+    "Usuario_ID",
+    "Smartwatch_ID",
+    "Timestamp_medicion",
+    "Frecuencia_cardiaca",
+    "Presion_sistolica",
+    "Presion_diastolica",
+    "Saturacion_oxigeno",
+    "Temperatura",
+    "Nivel_estres",
+    "Variabilidad_ritmo",
+    "Estatus"
+]
+
+def subscribe(event: str, listener: Callable[[List[dict]], None]):
+    if listener not in _listeners[event]:
+        _listeners[event].append(listener)
+
+def unsubscribe(event: str, listener: Callable[[List[dict]], None]):
+    if listener in _listeners[event]:
+        _listeners[event].remove(listener)
+
+def has_listeners(event: str) -> bool:
+    return bool(_listeners[event])
+
+def _as_dict(measurement) -> dict:
+    if isinstance(measurement, dict):
+        return {field: measurement.get(field) for field in MEASUREMENT_FIELDS}
+    return {field: getattr(measurement, field) for field in MEASUREMENT_FIELDS}
+
+def publish(event: str, measurements: list):
+    """
+    Avisa a los listeners despues del commit (dicts con MEASUREMENT_FIELDS de las filas guardadas).
+    Se ejecuta en el hilo de quien escribio: los listeners deben ser rapidos y no usar la base de datos.
+    Un error en un listener se registra y no afecta la escritura.
+    """
+    listeners = _listeners[event]
+    if not listeners or not measurements:
+        return
+    payload = [_as_dict(measurement) for measurement in measurements]
+    for listener in list(listeners):
+        try:
+            listener(payload)
+        except Exception as e:
+            logger.error(f"Error en listener de mediciones ({event}): {e}")
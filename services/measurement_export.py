@@ -0,0 +1,117 @@
+import csv
+import heapq
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional
+from sqlalchemy import select
+from config.database import SessionLocal
+from models.heart_measurement import HeartMeasurement
+from services import measurement_archive
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_NDJSON: "application/x-ndjson"
+}
+
+EXPORT_COLUMNS = [
+    HeartMeasurement.ID,
+    HeartMeasurement.Usuario_ID,
+    HeartMeasurement.Smartwatch_ID,
+    HeartMeasurement.Timestamp_medicion,
+    HeartMeasurement.Frecuencia_cardiaca,
+    HeartMeasurement.Presion_sistolica,
+    HeartMeasurement.Presion_diastolica,
+    HeartMeasurement.Saturacion_oxigeno,
+    HeartMeasurement.Temperatura,
+    HeartMeasurement.Nivel_estres,
+    HeartMeasurement.Variabilidad_ritmo,
+    HeartMeasurement.Fecha_Registro
+]
+
+# Filas leidas del cursor del servidor por viaje y filas serializadas por bloque enviado
+FETCH_SIZE = 5000
+WRITE_ROWS = 1000
+
+def export_query(user_ids: Optional[List[int]] = None, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    query = select(*EXPORT_COLUMNS).where(HeartMeasurement.Estatus == True)
+    if user_ids:
+        query = query.where(HeartMeasurement.Usuario_ID.in_(user_ids))
+    if start is not None:
+        query = query.where(HeartMeasurement.Timestamp_medicion >= start)
+    if end is not None:
+        query = query.where(HeartMeasurement.Timestamp_medicion <= end)
+    return query.order_by(HeartMeasurement.Usuario_ID, HeartMeasurement.Timestamp_medicion, HeartMeasurement.ID)
+
+def _export_key(row):
+    # Orden de export_query: (Usuario_ID, Timestamp_medicion, ID)
+    return row[1], row[3], row[0]
+
+def _with_archive(rows, user_ids: Optional[List[int]], start: Optional[datetime], end: Optional[datetime]):
+    """
+    Mezcla las filas de la tabla caliente con las del archivo frio (que ya no estan en la tabla) en el
+    mismo orden; el archivo solo se lee si el rango empieza antes de la ventana caliente.
+    """
+    if start is not None and start >= measurement_archive.hot_window_start():
+        return rows
+    if not measurement_archive.has_archive():
+        return rows
+    archived = measurement_archive.iter_archived_rows(
+        [column.key for column in EXPORT_COLUMNS], user_ids or None, start, end
+    )
+    return heapq.merge(rows, archived, key=_export_key)
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _iter_csv(rows) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in EXPORT_COLUMNS])
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if value is None else _json_value(value) for value in row])
+        pending += 1
+        if pending >= WRITE_ROWS:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+def _iter_ndjson(rows) -> Iterator[bytes]:
+    keys = [column.key for column in EXPORT_COLUMNS]
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({key: _json_value(value) for key, value in zip(keys, row)}, separators=(",", ":")))
+        if len(lines) >= WRITE_ROWS:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+def iter_measurement_export(export_format: str, user_ids: Optional[List[int]] = None,
+                            start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[bytes]:
+    """
+    Genera el historial de mediciones en CSV o NDJSON por bloques de bytes, incluidas las archivadas.
+    Abre su propia sesion (el generador se consume despues de cerrar la peticion) y lee con
+    cursor del lado del servidor (stream_results/yield_per) y un archivo mensual a la vez, por lo
+    que la memoria no depende del tamano del historial.
+    """
+    serializer = _iter_csv if export_format == FORMAT_CSV else _iter_ndjson
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            export_query(user_ids, start, end).execution_options(stream_results=True, yield_per=FETCH_SIZE)
+        )
+        yield from serializer(_with_archive(result, user_ids, start, end))
+    finally:
+        db.close()
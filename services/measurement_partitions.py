@@ -0,0 +1,60 @@
+import logging
+from typing import List
+from sqlalchemy import inspect, text
+from config.settings import settings
+from models.heart_measurement import HeartMeasurement, PARTITIONED_PRIMARY_KEY
+
+logger = logging.getLogger(__name__)
+
+TABLE = HeartMeasurement.__tablename__
+MAX_PARTITION = "pmax"
+
+def existing_partitions(connection) -> list:
+    """Particiones mensuales actuales ordenadas (sin pmax); lista vacia si la tabla no esta particionada"""
+    names = connection.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": TABLE}).scalars().all()
+    return [name for name in names if name != MAX_PARTITION]
+
+def partitioned_schema_problems(connection) -> List[str]:
+    """
+    Diferencias entre la tabla particionada y el esquema que deja --convert: llave primaria
+    PARTITIONED_PRIMARY_KEY, sin llaves foraneas y con la llave natural unica. Por ejemplo si
+    una migracion generada desde el modelo vuelve a agregar las FK o la llave primaria (ID).
+    """
+    inspector = inspect(connection)
+    problems = []
+    primary_key = inspector.get_pk_constraint(TABLE).get("constrained_columns") or []
+    if list(primary_key) != PARTITIONED_PRIMARY_KEY:
+        problems.append(f"llave primaria {tuple(primary_key)}, se esperaba {tuple(PARTITIONED_PRIMARY_KEY)}")
+    for foreign_key in inspector.get_foreign_keys(TABLE):
+        problems.append(f"llave foranea {foreign_key.get('name')} ({', '.join(foreign_key['constrained_columns'])})")
+    if not any(
+        index.get("unique") and index["column_names"] == ["Smartwatch_ID", "Timestamp_medicion"]
+        for index in inspector.get_indexes(TABLE)
+    ):
+        problems.append("falta la llave natural unica (Smartwatch_ID, Timestamp_medicion)")
+    return problems
+
+def check_measurement_partitioning(engine):
+    """
+    Revision al arrancar con MEASUREMENT_PARTITIONING_ENABLED (MySQL): create_all crea la tabla con
+    el esquema del modelo, sin particiones; se registra un error si falta --convert o si el
+    esquema convertido no es el esperado. No modifica la base de datos.
+    """
+    if not settings.MEASUREMENT_PARTITIONING_ENABLED or engine.dialect.name != "mysql":
+        return
+    try:
+        with engine.connect() as connection:
+            if not existing_partitions(connection):
+                logger.error(
+                    f"{TABLE} no esta particionada (creada desde el modelo); "
+                    f"ejecutar python -m jobs.manage_measurement_partitions --convert"
+                )
+                return
+            for problem in partitioned_schema_problems(connection):
+                logger.error(f"Esquema de {TABLE} particionada distinto al esperado: {problem}")
+    except Exception as e:
+        logger.error(f"No se pudo revisar el particionado de {TABLE}: {e}")
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, Numeric, and_, or_, select
+from config.database import SessionLocal
+from config.settings import settings
+from models.heart_measurement import HeartMeasurement
+from models.physical_activity import PhysicalActivity
+
+logger = logging.getLogger(__name__)
+
+# Tabla exportada -> (modelo, columna que define la particion por fecha)
+EXPORT_TABLES = {
+    "mediciones_cardiacas": (HeartMeasurement, HeartMeasurement.Timestamp_medicion),
+    "actividad_fisica": (PhysicalActivity, PhysicalActivity.Fecha_Registro)
+}
+
+PARTITION_COLUMN = "fecha"
+WATERMARK_FILE = "_watermark.json"
+FETCH_SIZE = 5000
+
+def _arrow_type(column):
+    if isinstance(column.type, BigInteger):
+        return pa.int64()
+    if isinstance(column.type, Integer):
+        return pa.int32()
+    if isinstance(column.type, Numeric):
+        return pa.float64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+def arrow_schema(model) -> pa.Schema:
+    """Esquema fijo por tabla: todos los archivos tienen los mismos tipos aunque un bloque traiga solo nulos"""
+    return pa.schema([pa.field(column.name, _arrow_type(column)) for column in model.__table__.columns])
+
+def _watermark_path(output_dir: str) -> str:
+    return os.path.join(output_dir, WATERMARK_FILE)
+
+def read_watermarks(output_dir: str) -> dict:
+    path = _watermark_path(output_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_watermarks(output_dir: str, watermarks: dict):
+    """Escritura atomica: un corte a medias deja el watermark anterior"""
+    path = _watermark_path(output_dir)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(watermarks, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _pending_query(model, watermark: Optional[dict], upper_bound: datetime):
+    """Filas con (Fecha_Registro, ID) posterior al watermark y registradas antes del margen de seguridad"""
+    query = select(*model.__table__.columns).where(model.Fecha_Registro < upper_bound)
+    if watermark:
+        registered_at = datetime.fromisoformat(watermark["Fecha_Registro"])
+        query = query.where(or_(
+            model.Fecha_Registro > registered_at,
+            and_(model.Fecha_Registro == registered_at, model.ID > watermark["ID"])
+        ))
+    return query.order_by(model.Fecha_Registro, model.ID)
+
+def _parquet_value(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+def rows_to_arrow(rows: List[tuple], schema: pa.Schema) -> pa.Table:
+    """Convierte tuplas con el orden de columnas del esquema a una tabla Arrow"""
+    columns = list(zip(*rows))
+    return pa.Table.from_arrays(
+        [pa.array([_parquet_value(v) for v in values], type=field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+def _write_block(table_dir: str, schema: pa.Schema, rows: List[tuple], partition_index: int, file_prefix: str) -> int:
+    """Escribe un bloque de filas, un archivo por particion de fecha. Regresa el numero de archivos"""
+    partitions = {}
+    for row in rows:
+        partition_value = row[partition_index]
+        partitions.setdefault(partition_value.date() if isinstance(partition_value, datetime) else partition_value, []).append(row)
+
+    for partition_date, partition_rows in partitions.items():
+        table = rows_to_arrow(partition_rows, schema)
+        partition_dir = os.path.join(table_dir, f"{PARTITION_COLUMN}={partition_date.isoformat()}")
+        os.makedirs(partition_dir, exist_ok=True)
+        pq.write_table(table, os.path.join(partition_dir, f"{file_prefix}.parquet"))
+    return len(partitions)
+
+def export_table(name: str, output_dir: str, watermark: Optional[dict], upper_bound: datetime,
+                 block_rows: int) -> Optional[dict]:
+    """
+    Exporta las filas nuevas de una tabla y regresa el nuevo watermark (None si no hubo filas).
+    Los nombres de archivo dependen del watermark inicial y del numero de bloque, asi que repetir
+    una corrida interrumpida sobrescribe los mismos archivos en lugar de duplicar filas.
+    """
+    model, partition_column = EXPORT_TABLES[name]
+    schema = arrow_schema(model)
+    columns = [column.name for column in model.__table__.columns]
+    partition_index = columns.index(partition_column.key)
+    id_index = columns.index("ID")
+    registered_index = columns.index("Fecha_Registro")
+    run_token = "inicio" if not watermark else f"{watermark['Fecha_Registro'].replace(':', '').replace('-', '')}-{watermark['ID']}"
+    table_dir = os.path.join(output_dir, name)
+
+    db = SessionLocal()
+    rows_written = 0
+    files_written = 0
+    block = 0
+    last_row = None
+    try:
+        result = db.execute(
+            _pending_query(model, watermark, upper_bound).execution_options(stream_results=True, yield_per=FETCH_SIZE)
+        )
+        for rows in result.partitions(block_rows):
+            files_written += _write_block(table_dir, schema, rows, partition_index, f"part-{run_token}-{block:05d}")
+            rows_written += len(rows)
+            last_row = rows[-1]
+            block += 1
+    finally:
+        db.close()
+
+    logger.info(f"{name}: {rows_written} filas exportadas en {files_written} archivos")
+    if last_row is None:
+        return None
+    return {"Fecha_Registro": last_row[registered_index].isoformat(), "ID": last_row[id_index]}
+
+def export_incremental(tables: Optional[List[str]] = None, output_dir: Optional[str] = None,
+                       safety_lag_seconds: Optional[int] = None, block_rows: Optional[int] = None) -> dict:
+    """
+    Exporta a Parquet particionado por fecha solo las filas registradas despues del ultimo watermark.
+    El margen de seguridad deja fuera las filas mas recientes, cuyas transacciones podrian seguir abiertas.
+    """
+    output_dir = output_dir or settings.PARQUET_EXPORT_DIR
+    safety_lag = settings.PARQUET_EXPORT_SAFETY_LAG_SECONDS if safety_lag_seconds is None else safety_lag_seconds
+    block_rows = block_rows or settings.PARQUET_EXPORT_BLOCK_ROWS
+    upper_bound = datetime.now() - timedelta(seconds=safety_lag)
+    os.makedirs(output_dir, exist_ok=True)
+
+    watermarks = read_watermarks(output_dir)
+    for name in tables or list(EXPORT_TABLES):
+        new_watermark = export_table(name, output_dir, watermarks.get(name), upper_bound, block_rows)
+        if new_watermark:
+            watermarks[name] = new_watermark
+            write_watermarks(output_dir, watermarks)
+    return watermarks
+
+def load_parquet_table(name: str, start: Optional[date] = None, end: Optional[date] = None,
+                       columns: Optional[List[str]] = None, user_ids: Optional[List[int]] = None,
+                       active_only: bool = True, output_dir: Optional[str] = None):
+    """
+    Carga una tabla exportada como DataFrame de pandas, leyendo solo las particiones de fecha
+    del rango [start, end]. Pensado para notebooks y entrenamiento de modelos.
+    """
+    table_dir = os.path.join(output_dir or settings.PARQUET_EXPORT_DIR, name)
+    model, _ = EXPORT_TABLES[name]
+    dataset = ds.dataset(
+        table_dir,
+        format="parquet",
+        schema=arrow_schema(model).append(pa.field(PARTITION_COLUMN, pa.string())),
+        partitioning="hive"
+    )
+    conditions = []
+    if start is not None:
+        conditions.append(ds.field(PARTITION_COLUMN) >= start.isoformat())
+    if end is not None:
+        conditions.append(ds.field(PARTITION_COLUMN) <= end.isoformat())
+    if user_ids:
+        conditions.append(ds.field("Usuario_ID").isin(user_ids))
+    if active_only:
+        conditions.append(ds.field("Estatus") == True)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    read_columns = None if columns is None else list(dict.fromkeys(["ID", *columns]))
+    frame = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+    frame = frame.drop_duplicates(subset="ID", keep="last")
+    return frame if columns is None else frame[columns]
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from crud import risk_features as crud_risk_features
+from ml_algorithms.cardiovascular_risk.preprocessing import SQL_IN_LIMIT, CardiovascularRiskPreprocessor
+
+def compute_feature_rows(db: Session, window_days: int, user_ids: Optional[List[int]], computed_at: datetime) -> list:
+    """Filas de tbb_caracteristicas_riesgo con la extraccion en una sola consulta del preprocesador"""
+    preprocessor = CardiovascularRiskPreprocessor()
+    aggregates = preprocessor.fetch_dataset_aggregates(user_ids, days_back=window_days, db=db)
+    if aggregates.empty:
+        return []
+    features, labels = preprocessor.build_features(aggregates)
+    frame = features.astype(float)
+    frame.insert(0, "Usuario_ID", aggregates["user_id"].astype(int).to_numpy())
+    frame["Ventana_dias"] = window_days
+    frame["Etiqueta_riesgo"] = labels.to_numpy()
+    frame["Fecha_calculo"] = computed_at
+    return frame.to_dict("records")
+
+def refresh_risk_features(db: Session, window_days: int, full: bool = False,
+                          max_age_hours: Optional[int] = None, chunk_users: int = SQL_IN_LIMIT) -> dict:
+    """
+    Actualiza el almacen de caracteristicas de la ventana y hace commit.
+    La primera corrida (o full=True) recalcula a todos los usuarios con una sola consulta; las
+    siguientes solo a los usuarios con cambios desde la corrida anterior (changed_user_ids), por
+    bloques de chunk_users. Con max_age_hours tambien se recalculan los vectores mas viejos.
+    """
+    started = datetime.now()
+    last_refresh = None if full else crud_risk_features.get_last_refresh(db, window_days)
+    try:
+        if last_refresh is None:
+            rows = compute_feature_rows(db, window_days, None, started)
+            crud_risk_features.replace_feature_vectors(db, window_days, rows)
+            users, written = len(rows), len(rows)
+        else:
+            stale_before = started - timedelta(hours=max_age_hours) if max_age_hours else None
+            user_ids = sorted(crud_risk_features.changed_user_ids(db, window_days, last_refresh, started, stale_before))
+            users, written = len(user_ids), 0
+            for start in range(0, len(user_ids), chunk_users):
+                chunk = user_ids[start:start + chunk_users]
+                rows = compute_feature_rows(db, window_days, chunk, started)
+                written += crud_risk_features.replace_feature_vectors(db, window_days, rows, chunk)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {
+        "mode": "full" if last_refresh is None else "incremental",
+        "since": last_refresh,
+        "users": users,
+        "vectors": written,
+        "seconds": (datetime.now() - started).total_seconds()
+    }
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import joblib
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from config.database import SessionLocal
+from config.settings import settings
+from crud import risk_features as crud_risk_features
+from models.user import User
+from services.risk_feature_store import compute_feature_rows
+
+logger = logging.getLogger(__name__)
+
+class RiskModelUnavailableError(Exception):
+    """El modelo de riesgo cardiovascular no esta cargado"""
+
+class RiskUserNotFoundError(Exception):
+    """El usuario no existe"""
+
+class RiskFeaturesError(Exception):
+    """No se pueden calcular las caracteristicas del usuario (por ejemplo sin perfil de salud)"""
+
+class _MicroBatcher:
+    """
+    Junta las peticiones concurrentes en una sola llamada a predict.
+    Un lote se cierra con max_batch filas o max_wait segundos despues de la primera; mientras
+    el executor evalua un lote, las peticiones nuevas se acumulan para el siguiente.
+    """
+
+    def __init__(self, predict, executor: ThreadPoolExecutor, max_batch: int, max_wait: float):
+        self.predict = predict
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, X: np.ndarray) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        rows = len(items[0][0])
+        deadline = loop.time() + self.max_wait
+        while rows < self.max_batch:
+            if not self._queue.empty():
+                item = self._queue.get_nowait()
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            items.append(item)
+            rows += len(item[0])
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            try:
+                probabilities = await loop.run_in_executor(self.executor, self.predict, np.vstack([X for X, _ in items]))
+            except Exception as e:
+                logger.error(f"Error en la inferencia de riesgo ({len(items)} peticiones): {e}")
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            offset = 0
+            for X, future in items:
+                if not future.done():
+                    future.set_result(probabilities[offset:offset + len(X)])
+                offset += len(X)
+
+class RiskInferenceService:
+    """
+    Inferencia del modelo de riesgo cardiovascular (CardiovascularRiskNeuralNetwork + el
+    CardiovascularRiskPreprocessor guardado por train.py), cargados una vez al arrancar.
+    TensorFlow se importa solo al cargar; si no esta instalado o faltan los artefactos el
+    servicio queda deshabilitado. Las predicciones corren en un executor dedicado de un hilo,
+    nunca en el event loop, y las peticiones concurrentes se agrupan en un solo predict.
+    """
+
+    def __init__(self, model_path: str, preprocessor_path: str, max_batch: int, max_wait_ms: int, days_back: int,
+                 use_feature_store: bool = True, feature_max_age_hours: int = 0):
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        self.days_back = days_back
+        self.use_feature_store = use_feature_store
+        self.feature_max_age_hours = feature_max_age_hours
+        self.network = None
+        self.preprocessor = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="risk-inference")
+        self._batcher = _MicroBatcher(self._predict, self._executor, max_batch, max_wait_ms / 1000.0)
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.network is not None and self.preprocessor is not None
+
+    @property
+    def labels(self) -> List[str]:
+        return [str(label) for label in self.preprocessor.label_encoder.classes_]
+
+    def load(self) -> bool:
+        with self._lock:
+            if self.is_loaded:
+                return True
+            missing = [path for path in (self.model_path, self.preprocessor_path) if not os.path.exists(path)]
+            if missing:
+                logger.warning(f"Modelo de riesgo no encontrado ({', '.join(missing)}); inferencia deshabilitada")
+                return False
+            try:
+                from ml_algorithms.cardiovascular_risk.model import CardiovascularRiskNeuralNetwork
+            except ImportError as e:
+                logger.warning(f"TensorFlow no disponible ({e}); inferencia de riesgo deshabilitada")
+                return False
+            preprocessor = joblib.load(self.preprocessor_path)
+            network = CardiovascularRiskNeuralNetwork(input_dim=len(preprocessor.feature_names))
+            network.load_model(self.model_path)
+            self.preprocessor, self.network = preprocessor, network
+        logger.info(f"Modelo de riesgo cargado desde {self.model_path} ({len(self.preprocessor.feature_names)} caracteristicas)")
+        return True
+
+    async def start(self):
+        if self.is_loaded and not self._batcher.is_running:
+            self._batcher.start()
+
+    async def stop(self):
+        await self._batcher.stop()
+
+    def _predict(self, X: np.ndarray) -> np.ndarray:
+        """Se ejecuta en el executor dedicado"""
+        return np.asarray(self.network.model.predict_on_batch(self.preprocessor.transform(
+            pd.DataFrame(X, columns=self.preprocessor.feature_names)
+        )))
+
+    def stored_features(self, user_ids: List[int]) -> Dict[int, np.ndarray]:
+        """
+        Vectores precalculados del almacen de caracteristicas (usuario -> fila (1, n)) en una sola
+        consulta; los usuarios sin vector o con uno mas viejo que feature_max_age_hours no aparecen.
+        """
+        if not self.is_loaded:
+            raise RiskModelUnavailableError("El modelo de riesgo cardiovascular no esta disponible")
+        if not self.use_feature_store:
+            return {}
+        computed_since = datetime.now() - timedelta(hours=self.feature_max_age_hours) if self.feature_max_age_hours else None
+        db = SessionLocal()
+        try:
+            vectors = crud_risk_features.get_feature_vectors(db, user_ids, self.days_back, computed_since)
+        finally:
+            db.close()
+        names = self.preprocessor.feature_names
+        return {
+            user_id: np.array([[float(getattr(vector, name)) for name in names]])
+            for user_id, vector in vectors.items()
+        }
+
+    def user_features(self, user_id: int) -> np.ndarray:
+        """
+        Vector de caracteristicas del usuario en el orden del entrenamiento: el del almacen si esta
+        vigente, si no se calcula de las tablas de origen.
+        """
+        stored = self.stored_features([user_id])
+        if user_id in stored:
+            return stored[user_id]
+        return self.compute_user_features(user_id)
+
+    def compute_user_features(self, user_id: int) -> np.ndarray:
+        """Vector de caracteristicas calculado de las tablas de origen (fetch_user_data)"""
+        if not self.is_loaded:
+            raise RiskModelUnavailableError("El modelo de riesgo cardiovascular no esta disponible")
+        user_data = self.preprocessor.fetch_user_data(user_id, days_back=self.days_back)
+        if user_data is None:
+            raise RiskUserNotFoundError("Usuario no encontrado")
+        if user_data["health_profile"] is None or user_data["person"] is None:
+            raise RiskFeaturesError("El usuario no tiene perfil de salud")
+        features, _ = self.preprocessor.preprocess_user_data(user_data)
+        return np.array([[float(features.get(name) or 0.0) for name in self.preprocessor.feature_names]])
+
+    def batch_features(self, user_ids: List[int]) -> Tuple[List[int], List[np.ndarray], List[dict]]:
+        """
+        Caracteristicas de varios usuarios: las del almacen en una sola consulta y las faltantes con una
+        sola extraccion agregada (compute_feature_rows), sin una lectura por usuario.
+        Regresa los usuarios evaluables, sus filas (1, n) y los errores de los que no se pueden evaluar.
+        """
+        stored = self.stored_features(user_ids)
+        missing = sorted(set(user_ids) - set(stored))
+        computed, existing = {}, set()
+        if missing:
+            names = self.preprocessor.feature_names
+            db = SessionLocal()
+            try:
+                for row in compute_feature_rows(db, self.days_back, missing, datetime.now()):
+                    computed[row["Usuario_ID"]] = np.array([[float(row[name] or 0.0) for name in names]])
+                unknown = [user_id for user_id in missing if user_id not in computed]
+                if unknown:
+                    existing = set(db.execute(select(User.ID).where(User.ID.in_(unknown))).scalars())
+            finally:
+                db.close()
+        valid, rows, errors = [], [], []
+        for user_id in user_ids:
+            features = stored.get(user_id)
+            if features is None:
+                features = computed.get(user_id)
+            if features is not None:
+                valid.append(user_id)
+                rows.append(features)
+            elif user_id in existing:
+                errors.append({"user_id": user_id, "error": "El usuario no tiene perfil de salud"})
+            else:
+                errors.append({"user_id": user_id, "error": "Usuario no encontrado"})
+        return valid, rows, errors
+
+    def _prediction(self, user_id: int, probabilities: np.ndarray) -> dict:
+        labels = self.labels
+        best = int(np.argmax(probabilities))
+        return {
+            "user_id": user_id,
+            "risk_level": labels[best],
+            "confidence": round(float(probabilities[best]), 4),
+            "probabilities": {label: round(float(value), 4) for label, value in zip(labels, probabilities)}
+        }
+
+    async def predict_features(self, user_ids: List[int], X: np.ndarray) -> List[dict]:
+        """Evalua filas ya calculadas (una por usuario) por medio del micro-batcher"""
+        if not self.is_loaded or not self._batcher.is_running:
+            raise RiskModelUnavailableError("El modelo de riesgo cardiovascular no esta disponible")
+        probabilities = await self._batcher.submit(X)
+        return [self._prediction(user_id, row) for user_id, row in zip(user_ids, probabilities)]
+
+risk_inference = RiskInferenceService(
+    model_path=settings.RISK_MODEL_PATH,
+    preprocessor_path=settings.RISK_PREPROCESSOR_PATH,
+    max_batch=settings.RISK_BATCH_MAX_SIZE,
+    max_wait_ms=settings.RISK_BATCH_MAX_WAIT_MS,
+    days_back=settings.RISK_FEATURE_DAYS,
+    use_feature_store=settings.RISK_FEATURE_STORE_ENABLED,
+    feature_max_age_hours=settings.RISK_FEATURE_STORE_MAX_AGE_HOURS
+)
@@ -0,0 +1,80 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Type
+import pydantic_core
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from config.settings import settings
+from schemas.pagination import Page
+
+try:
+    import orjson
+except ImportError:  # pydantic_core.to_json cubre el mismo caso, un poco mas lento
+    orjson = None
+
+def _orjson_default(value):
+    # Mismo formato que pydantic en modo JSON: Decimal como texto
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return pydantic_core.to_json(content)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que serializa con orjson (o pydantic_core) en lugar de json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def json_response(content: Any, status_code: int = 200) -> JSONResponse:
+    response_class = FastJSONResponse if settings.FAST_JSON_ENABLED else JSONResponse
+    return response_class(content=content, status_code=status_code)
+
+@lru_cache(maxsize=None)
+def _field_names(model: Type[BaseModel]) -> tuple:
+    return tuple(model.model_fields)
+
+@lru_cache(maxsize=None)
+def page_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(Page[model])
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def rows_to_dicts(rows, model: Type[BaseModel]) -> list:
+    """
+    Convierte filas ORM a dicts con los campos del esquema, sin validarlas de nuevo.
+    Solo para datos leidos de la base de datos cuyos esquemas reflejan los tipos de las columnas
+    (Decimal, Enum, datetime): el resultado es el mismo JSON que produce response_model.
+    """
+    names = _field_names(model)
+    return [{name: getattr(row, name) for name in names} for row in rows]
+
+def page_response(page: dict, model: Type[BaseModel], trusted: bool = True):
+    """
+    Respuesta rapida para listados paginados con FAST_JSON_ENABLED.
+    trusted=True omite la validacion del response_model (datos de la base de datos);
+    trusted=False valida con un TypeAdapter y serializa directo a bytes en pydantic_core.
+    Sin FAST_JSON_ENABLED regresa la pagina tal cual para la ruta normal de FastAPI.
+    """
+    if not settings.FAST_JSON_ENABLED:
+        return page
+    if trusted:
+        return FastJSONResponse(content={**page, "items": rows_to_dicts(page["items"], model)})
+    adapter = page_adapter(model)
+    return Response(content=adapter.dump_json(adapter.validate_python(page, from_attributes=True)), media_type="application/json")
+
+def list_response(rows: list, model: Type[BaseModel], trusted: bool = True):
+    """Igual que page_response para rutas que regresan una lista sin paginar"""
+    if not settings.FAST_JSON_ENABLED:
+        return rows
+    if trusted:
+        return FastJSONResponse(content=rows_to_dicts(rows, model))
+    adapter = list_adapter(model)
+    return Response(content=adapter.dump_json(adapter.validate_python(rows, from_attributes=True)), media_type="application/json")
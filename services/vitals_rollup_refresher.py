@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy.exc import IntegrityError, OperationalError
+from config.database import SessionLocal
+from config.settings import settings
+from crud.vitals_rollup import refresh_vitals_rollups
+
+logger = logging.getLogger(__name__)
+
+# Intentos por refresco: dos procesos que refrescan el mismo periodo chocan en la llave primaria
+# del resumen (IntegrityError) o en un deadlock de MySQL (OperationalError)
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 0.05
+
+class VitalsRollupRefresher:
+    """
+    Recalcula en segundo plano los resumenes por hora/dia de los periodos tocados por la ingesta.
+    Las escrituras marcan sus rangos (smartwatch -> (inicio, fin)) despues del commit; un solo hilo
+    los junta y los refresca cada interval_ms en su propia transaccion, de modo que una medicion
+    individual no agrega DELETE + INSERT ... SELECT a su transaccion y dos peticiones del mismo
+    smartwatch y hora no refrescan el mismo periodo a la vez. Si el proceso termina antes de
+    refrescar, jobs.rebuild_vitals_rollups --since-minutes recupera esos periodos.
+    """
+
+    def __init__(self, interval_ms: int):
+        self.interval = interval_ms / 1000.0
+        self._pending: Dict[int, Tuple[datetime, datetime]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="vitals-rollup-refresher", daemon=True)
+        self._thread.start()
+        logger.info(f"Refresco de resumenes en segundo plano iniciado (interval_ms={int(self.interval * 1000)})")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Detiene el hilo de fondo despues de refrescar los rangos pendientes"""
+        if not self.is_running:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("Refresco de resumenes detenido")
+
+    def mark(self, ranges: Dict[int, Tuple[datetime, datetime]]):
+        """Agrega rangos ya confirmados; se juntan con los pendientes del mismo smartwatch"""
+        with self._lock:
+            for smartwatch_id, (start, end) in ranges.items():
+                current = self._pending.get(smartwatch_id)
+                self._pending[smartwatch_id] = (start, end) if current is None else (min(current[0], start), max(current[1], end))
+
+    def flush(self) -> int:
+        """Refresca los rangos pendientes; regresa los smartwatches refrescados"""
+        with self._lock:
+            ranges, self._pending = self._pending, {}
+        if ranges:
+            self._refresh(ranges)
+        return len(ranges)
+
+    def _refresh(self, ranges: dict):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            db = SessionLocal()
+            try:
+                refresh_vitals_rollups(db, ranges)
+                db.commit()
+                return
+            except (IntegrityError, OperationalError) as e:
+                db.rollback()
+                if attempt == MAX_ATTEMPTS:
+                    logger.error(f"Error refrescando resumenes de {len(ranges)} smartwatches tras {attempt} intentos: {e}")
+                    return
+                logger.warning(f"Conflicto refrescando resumenes (intento {attempt}), se reintenta: {e}")
+                time.sleep(RETRY_DELAY_SECONDS * attempt)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error refrescando resumenes de {len(ranges)} smartwatches: {e}")
+                return
+            finally:
+                db.close()
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            self.flush()
+        self.flush()
+
+vitals_rollup_refresher = VitalsRollupRefresher(interval_ms=settings.VITALS_ROLLUP_REFRESH_INTERVAL_MS)